@@ -0,0 +1,22 @@
+# engine/__init__.py
+"""
+Qt-independent dataflow engine: node models, the graph between their ports
+and an evaluator. The editor nodes in nodes/ are views bound to these models;
+the engine alone runs a layout headless.
+
+    graph = Graph.from_layout(json.load(open("layout.json")))
+    evaluator = Evaluator(graph)
+    evaluator.set_source(evaluator.joysticks()[0], 0, 0.5)
+    evaluator.channel_values  # {channel: µs}
+
+CompiledGraph(graph) turns the same graph into one generated function for
+the fastest per-tick evaluation.
+"""
+from .models import (NodeModel, JoystickModel, TelemetryModel, PPMChannelModel, CustomLogicModel,
+                     BoostControlModel, ToggleModel, ThreePositionSwitchModel, ChannelConfigModel,
+                     MixerModel, AxisToButtonsModel, SwitchGateModel, PedalControlModel,
+                     NODE_MODELS, create_node_model, clamp)
+from .formula import compile_formula, FORMULA_HELPERS
+from .graph import Graph, Edge
+from .evaluator import Evaluator
+from .compiler import CompiledGraph
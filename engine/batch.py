@@ -0,0 +1,227 @@
+# engine/batch.py
+"""
+Offline evaluation of a Graph over a whole input trace with NumPy.
+
+Every node type is a kernel over the full time axis: Channel Config, Pedal
+Control, Switch Gate and Axis to Buttons are array math, the Mixer is a
+matrix product, Toggle, 3-Position Switch and Boost Control are scans over
+their input edges, and Custom Logic formulas run on whole arrays where they
+can. A minute of 1 kHz input takes milliseconds, so curves and mixes can be
+swept and layouts regression-tested without flying.
+
+    graph = Graph.from_layout(json.load(open("layout.json")))
+    ports = source_ports(graph)             # column order of `inputs`
+    inputs = np.zeros((60000, len(ports)))  # one minute at 1 kHz
+    traces = evaluate_batch(graph, inputs, sample_rate_hz=1000)
+    traces[1]                               # PPM channel 1 in µs, per sample
+
+Needs numpy, which the app itself does not; import this module directly.
+"""
+import functools
+import numpy as np
+from .formula import compile_formula, expo
+from .models import (PPMChannelModel, CustomLogicModel, BoostControlModel, ToggleModel,
+                     ThreePositionSwitchModel, ChannelConfigModel, MixerModel, AxisToButtonsModel,
+                     SwitchGateModel, PedalControlModel)
+
+# The formula helpers for whole arrays
+ARRAY_HELPERS = {
+    "clamp": lambda x, low=-1.0, high=1.0: np.clip(x, low, high),
+    "abs": np.abs,
+    "min": lambda *values: functools.reduce(np.minimum, values),
+    "max": lambda *values: functools.reduce(np.maximum, values),
+    "expo": expo,
+    "deadband": lambda x, width: np.where(np.abs(x) <= width, 0.0, (x - np.sign(x) * width) / (1.0 - width)),
+    "sign": np.sign,
+}
+
+
+def source_ports(graph):
+    """Returns the (source model, output index) pairs that feed the graph, i.e. the input columns."""
+    return [(model, output_index) for model in graph.nodes.values() if not model.num_inputs
+            for output_index in range(model.num_outputs) if graph.targets(model, output_index)]
+
+
+def _rising_edges(x, last_value):
+    previous = np.empty_like(x)
+    previous[0] = last_value
+    previous[1:] = x[:-1]
+    return (x > 0.5) & (previous < 0.5)
+
+
+def _channel_config(model, ins, sample_rate_hz):
+    x = ins[0]
+    y = (model.expo_amount * x ** 3 + (1 - model.expo_amount) * x) * (model.weight / 100.0)
+    return [np.clip(y + model.offset_us / 500.0, -1.0, 1.0)]
+
+
+def _mixer(model, ins, sample_rate_hz):
+    w = model.weights
+    matrix = np.array([[w['A1'], w['A2']], [w['B1'], w['B2']]]) / 100.0
+    mixed = np.clip(np.column_stack(ins) @ matrix, -1.0, 1.0)
+    return [mixed[:, 0], mixed[:, 1]]
+
+
+def _pedal_control(model, ins, sample_rate_hz):
+    raw_throttle, raw_brake = ins
+    limited_throttle = (raw_throttle + 1.0) / 2.0 * (model.throttle_limit / 100.0)
+    limited_brake = (raw_brake + 1.0) / 2.0 * (model.brake_limit / 100.0)
+    combined = np.where(limited_brake > model.brake_deadzone / 100.0, -limited_brake,
+                        np.where(limited_throttle > 0.01, limited_throttle, 0.0))
+    center = model.center_us
+    output_us = center + np.where(combined > 0, combined * (2000 - center), combined * (center - 1000))
+    return [(output_us - 1500) / 500.0]
+
+
+def _switch_gate(model, ins, sample_rate_hz):
+    switch_state, input_a, input_b = ins
+    return [np.where(switch_state > 0, input_b, input_a)]
+
+
+def _axis_to_buttons(model, ins, sample_rate_hz):
+    x = ins[0]
+    return [np.where(x > model.deadzone, 1.0, -1.0), np.where(x < -model.deadzone, 1.0, -1.0)]
+
+
+def _toggle(model, ins, sample_rate_hz):
+    flips = np.cumsum(_rising_edges(ins[0], model.last_input_state))
+    is_on = (flips + model.is_on) % 2 == 1
+    return [np.where(is_on, 1.0, -1.0)]
+
+
+def _three_position_switch(model, ins, sample_rate_hz):
+    up = _rising_edges(ins[0], model.last_input_states[0])
+    down = _rising_edges(ins[1], model.last_input_states[1])
+    position = np.empty(len(up), dtype=np.intp)
+    current = model.current_position
+    start = 0
+    for index in np.flatnonzero(up | down): # Only the presses, not every sample
+        position[start:index] = current
+        if up[index]:
+            current = min(current + 1, 2)
+        if down[index]:
+            current = max(current - 1, 0)
+        start = index
+    position[start:] = current
+    return [np.asarray(model.POSITION_VALUES)[position]]
+
+
+def _boost_control(model, ins, sample_rate_hz):
+    # From the ready state: boost from a press until the release or the boost
+    # time is up, then ignore the button until the cooldown ends
+    throttle, button = ins
+    count = len(throttle)
+    times = np.arange(count) / sample_rate_hz
+    pressed = np.flatnonzero(button > 0.5)
+    released = np.flatnonzero(button < 0.5)
+    boosting = np.zeros(count, dtype=bool)
+    ready_from = 0
+    while True:
+        k = np.searchsorted(pressed, ready_from)
+        if k == len(pressed):
+            break
+        start = pressed[k]
+        end = np.searchsorted(times, times[start] + model.boost_duration_s)
+        k = np.searchsorted(released, start)
+        if k < len(released):
+            end = min(end, released[k])
+        boosting[start:end] = True
+        if end >= count:
+            break
+        ready_from = np.searchsorted(times, times[end] + model.cooldown_duration_s)
+    output_ppm = np.trunc(1500 + throttle * 500) + np.where(boosting, model.boost_amount_us, 0)
+    return [(np.clip(output_ppm, 1000, 2000) - 1500) / 500.0]
+
+
+def _custom_logic(model, ins, sample_rate_hz):
+    try:
+        function = compile_formula(model.formula, model.num_inputs, ARRAY_HELPERS)
+        with np.errstate(all="ignore"):
+            y = np.broadcast_to(np.asarray(function(*ins), dtype=float), ins[0].shape)
+    except (ValueError, TypeError, ArithmeticError):
+        # A broken formula, or one like "a if X1 > 0 else b" that needs one sample at a time
+        return _per_sample(model, ins, sample_rate_hz)
+    # The model outputs 0 where Python math fails (division by zero, overflow)
+    return [np.where(np.isfinite(y), y, 0.0)]
+
+
+def _per_sample(model, ins, sample_rate_hz):
+    """Fallback: runs the model itself once per sample (the model keeps the state of the last one)."""
+    outputs = np.empty((len(ins[0]), model.num_outputs))
+    inputs = model.inputs
+    for k, row in enumerate(np.column_stack(ins).tolist()):
+        if model.EDGE_TRIGGERED:
+            for i, value in enumerate(row):
+                if inputs[i] != value:
+                    model.set_input(i, value)
+        else:
+            inputs[:] = row
+            model.evaluate()
+        outputs[k] = model.outputs
+    return list(outputs.T)
+
+
+# Model class -> kernel(model, input arrays, sample_rate_hz) returning one array per output
+KERNELS = {
+    ChannelConfigModel: _channel_config,
+    MixerModel: _mixer,
+    PedalControlModel: _pedal_control,
+    SwitchGateModel: _switch_gate,
+    AxisToButtonsModel: _axis_to_buttons,
+    ToggleModel: _toggle,
+    ThreePositionSwitchModel: _three_position_switch,
+    BoostControlModel: _boost_control,
+    CustomLogicModel: _custom_logic,
+}
+
+
+def evaluate_batch(graph, inputs, sample_rate_hz=1000.0, ports=None):
+    """
+    Evaluates the graph for every row of inputs, an array of shape
+    (samples, len(ports)) with one column per source port (default
+    source_ports(graph)); sample_rate_hz gives the time between rows for
+    Boost Control. Source outputs without a column keep their current value;
+    inputs that nothing has passed a value to yet (a source output that has
+    not received one, or a node whose inputs are all like that) keep theirs.
+    Returns {channel number: int array of pulse widths in µs} for every PPM
+    channel in the graph. Models are not changed, except by node types
+    without a kernel, which run per sample.
+    """
+    ports = source_ports(graph) if ports is None else ports
+    inputs = np.asarray(inputs, dtype=float)
+    if inputs.ndim != 2 or inputs.shape[1] != len(ports):
+        raise ValueError(f"inputs must have the shape (samples, {len(ports)}), not {inputs.shape}")
+    count = inputs.shape[0]
+    columns = np.ascontiguousarray(inputs.T) # One contiguous array per port
+    values = {port: columns[column] for column, port in enumerate(ports)}
+    traces = {}
+    for model in graph.topological_order():
+        if not model.num_inputs:
+            continue
+        ins = []
+        connected = False
+        for input_index in range(model.num_inputs):
+            edge = graph.incoming(model, input_index)
+            trace = None if edge is None else values.get((edge.source, edge.output_index))
+            if trace is None and edge is not None and not edge.source.num_inputs and edge.source.received[edge.output_index]:
+                trace = np.full(count, float(edge.source.outputs[edge.output_index]))
+            if trace is None:
+                # Unconnected, or fed by nothing that has passed a value on yet
+                trace = np.full(count, float(model.inputs[input_index]))
+            else:
+                connected = True
+            ins.append(trace)
+
+        if isinstance(model, PPMChannelModel):
+            if not connected:
+                traces[model.channel_number] = np.full(count, model.ppm_value)
+            else:
+                x = -ins[0] if model.inverted else ins[0]
+                traces[model.channel_number] = (1500 + np.clip(x, -1.0, 1.0) * 500).astype(int)
+            continue
+        if not connected:
+            continue # Its outputs cannot change until a source sends something
+        kernel = KERNELS.get(type(model), _per_sample)
+        for output_index, trace in enumerate(kernel(model, ins, sample_rate_hz)):
+            values[(model, output_index)] = trace
+    return traces
@@ -0,0 +1,227 @@
+# engine/compiler.py
+"""
+Compiles a Graph into one generated Python function.
+
+Every connected port becomes a local variable and the nodes run in
+topological order as straight-line code. Channel Config, Mixer, Pedal
+Control, Switch Gate, Axis to Buttons and the PPM channels are inlined
+with their parameters folded into constants; other nodes (Custom Logic,
+Toggle, 3-Position Switch, Boost Control) are called through their model.
+Unconnected inputs are constants as well, and so are inputs that nothing
+has passed a value to yet: those fed by a source output that has not
+received one, or by a node whose inputs are all like that. They keep
+their current value, as they would in the editor. The function has to be
+compiled again whenever the graph or a parameter changes (see
+is_stale()); run() recompiles it by itself once such a source output
+receives a value.
+
+    compiled = CompiledGraph(graph)
+    joystick.set_output(0, 0.5)
+    for sink in compiled.run():  # PPM channel models whose value changed
+        print(sink.channel_number, compiled.channel_values[sink.channel_number])
+"""
+import time
+from .models import (PPMChannelModel, ChannelConfigModel, MixerModel, PedalControlModel,
+                     SwitchGateModel, AxisToButtonsModel)
+
+
+def _clamp(name, low=-1.0, high=1.0):
+    return f"{name} = {low!r} if {name} < {low!r} else {high!r} if {name} > {high!r} else {name}"
+
+
+def _terms(*terms):
+    """Joins (coefficient, expression) pairs into a sum, leaving out zero terms."""
+    parts = []
+    for coefficient, expression in terms:
+        if coefficient == 0:
+            continue
+        if expression is None:
+            parts.append(repr(float(coefficient)))
+        elif coefficient == 1:
+            parts.append(expression)
+        else:
+            parts.append(f"{float(coefficient)!r} * {expression}")
+    return " + ".join(parts) or "0.0"
+
+
+def _inline_channel_config(model, ins, outs):
+    # clamp(((1500 + (e*x³ + (1-e)*x) * w/100 * 500 + offset) - 1500) / 500)
+    x = ins[0]
+    scale = model.weight / 100.0
+    y = outs[0]
+    return [f"{y} = {_terms((model.expo_amount * scale, f'{x} * {x} * {x}'), ((1 - model.expo_amount) * scale, x), (model.offset_us / 500.0, None))}",
+            _clamp(y)]
+
+
+def _inline_mixer(model, ins, outs):
+    a, b = ins
+    w = model.weights
+    return [f"{outs[0]} = {_terms((w['A1'] / 100.0, a), (w['B1'] / 100.0, b))}", _clamp(outs[0]),
+            f"{outs[1]} = {_terms((w['A2'] / 100.0, a), (w['B2'] / 100.0, b))}", _clamp(outs[1])]
+
+
+def _inline_pedal_control(model, ins, outs):
+    throttle, brake = ins
+    y = outs[0]
+    center = (model.center_us - 1500) / 500.0
+    return [
+        f"{y} = ({brake} + 1.0) * {model.brake_limit / 200.0!r}",
+        f"if {y} > {model.brake_deadzone / 100.0!r}:",
+        f"    {y} = {center!r} - {y} * {(model.center_us - 1000) / 500.0!r}",
+        "else:",
+        f"    {y} = ({throttle} + 1.0) * {model.throttle_limit / 200.0!r}",
+        f"    {y} = {center!r} + {y} * {(2000 - model.center_us) / 500.0!r} if {y} > 0.01 else {center!r}",
+    ]
+
+
+def _inline_switch_gate(model, ins, outs):
+    switch_state, input_a, input_b = ins
+    return [f"{outs[0]} = {input_b} if {switch_state} > 0 else {input_a}"]
+
+
+def _inline_axis_to_buttons(model, ins, outs):
+    x = ins[0]
+    return [f"{outs[0]} = 1.0 if {x} > {float(model.deadzone)!r} else -1.0",
+            f"{outs[1]} = 1.0 if {x} < {-float(model.deadzone)!r} else -1.0"]
+
+
+# Model class -> function(model, input expressions, output names) returning lines of code
+INLINERS = {
+    ChannelConfigModel: _inline_channel_config,
+    MixerModel: _inline_mixer,
+    PedalControlModel: _inline_pedal_control,
+    SwitchGateModel: _inline_switch_gate,
+    AxisToButtonsModel: _inline_axis_to_buttons,
+}
+
+
+class CompiledGraph:
+    """
+    A Graph compiled to straight-line code (see the module docstring).
+
+    run() reads the current outputs of the source models (joysticks,
+    telemetry), evaluates everything downstream and returns the models that
+    changed: the PPM channels whose pulse width changed and, with
+    store=True, every other node whose inputs, outputs or state changed, so
+    only their editor views need a refresh. channel_values keeps the latest
+    pulse width per channel. With store=True the generated code also writes
+    every port value back into the models, so editor views can show them;
+    without it only the called-through models and the PPM channels are
+    updated.
+    """
+    def __init__(self, graph, store=True, clock=time.monotonic):
+        self.graph = graph
+        self.store = store
+        self.clock = clock
+        self.channel_values = {}
+        self.version = graph.version
+        self.params_version = graph.params_version
+        self.unreceived = [] # (source model, output index) compiled in as their targets' inputs
+        self._compile()
+        for sink in graph.nodes_of_type(PPMChannelModel):
+            self.channel_values[sink.channel_number] = sink.ppm_value
+
+    def _compile(self):
+        self.unreceived.clear()
+        for model in self.graph.nodes.values():
+            if model.HAS_DEADLINE:
+                model.clock = self.clock # Phases started by an input change are timed like run()'s
+        self.source, namespace = self._generate()
+        exec(compile(self.source, "<compiled layout>", "exec"), namespace)
+        self.function = namespace["evaluate"]
+
+    def is_stale(self):
+        """True once the graph or a node parameter changed since compiling (see Graph.params_changed())."""
+        return self.version != self.graph.version or self.params_version != self.graph.params_version
+
+    def run(self, now=None):
+        if self.unreceived and any(model.received[i] for model, i in self.unreceived):
+            self._compile() # A device sent its first value
+        return self.function(self.clock() if now is None else now)
+
+    def _generate(self):
+        graph = self.graph
+        order = graph.topological_order()
+        names = {model: f"m{i}" for i, model in enumerate(order)}
+        namespace = {name: model for model, name in names.items()}
+        namespace["channel_values"] = self.channel_values
+        store = self.store
+        head = []
+        body = []
+        silent = set() # Nodes that have nothing to pass on yet
+
+        def port(model, output_index):
+            return f"{names[model]}_{output_index}"
+
+        for model in order:
+            m = names[model]
+            if model.HAS_DEADLINE:
+                head.append(f"{m}_advanced = {m}.advance(now)")
+            ins = []
+            connected = []
+            for input_index in range(model.num_inputs):
+                edge = graph.incoming(model, input_index)
+                if edge and not edge.source.num_inputs and not edge.source.received[edge.output_index]:
+                    self.unreceived.append((edge.source, edge.output_index))
+                    edge = None
+                elif edge and edge.source in silent:
+                    edge = None
+                if edge:
+                    ins.append(port(edge.source, edge.output_index))
+                    connected.append(input_index)
+                else:
+                    ins.append(repr(float(model.inputs[input_index])))
+            outs = [port(model, i) for i in range(model.num_outputs)]
+            if model.num_inputs and not connected:
+                silent.add(model) # Its outputs cannot change until a source sends something
+                continue
+
+            if not model.num_inputs:
+                # Source: its outputs are set from outside
+                used = [i for i in range(model.num_outputs) if graph.targets(model, i) and model.received[i]]
+                if used:
+                    body.append(f"o = {m}.outputs")
+                    body.extend(f"{outs[i]} = o[{i}]" for i in used)
+            elif isinstance(model, PPMChannelModel):
+                channel = model.channel_number
+                x = f"-{ins[0]}" if model.inverted else ins[0]
+                body += [f"x = {x}", _clamp("x"), "p = int(1500 + x * 500)"]
+                if store:
+                    body += [f"{m}.inputs[0] = {ins[0]}", f"{m}.current_value = x"]
+                body += [f"if p != {m}.ppm_value:",
+                         f"    {m}.ppm_value = channel_values[{channel}] = p",
+                         f"    changed.append({m})"]
+            elif type(model) in INLINERS:
+                body += INLINERS[type(model)](model, ins, outs)
+                if store:
+                    stored = [(f"i[{i}]", ins[i]) for i in connected]
+                    stored += [(f"o[{i}]", outs[i]) for i in range(model.num_outputs)]
+                    body += [f"i = {m}.inputs", f"o = {m}.outputs",
+                             f"if {' or '.join(f'{name} != {value}' for name, value in stored)}:"]
+                    body += [f"    {name} = {value}" for name, value in stored]
+                    body.append(f"    changed.append({m})")
+            else:
+                # Called through the model, e.g. for state or a formula
+                if model.EDGE_TRIGGERED:
+                    if store:
+                        body.append(f"t = {m}_advanced" if model.HAS_DEADLINE else "t = False")
+                    for i in connected:
+                        body += [f"if {m}.inputs[{i}] != {ins[i]}:", f"    {m}.set_input({i}, {ins[i]})"]
+                        if store:
+                            body.append("    t = True")
+                    if store:
+                        body += ["if t:", f"    changed.append({m})"]
+                else:
+                    # Evaluated only when an input changed, like the editor does
+                    body += [f"i = {m}.inputs", f"if {' or '.join(f'i[{i}] != {ins[i]}' for i in connected)}:"]
+                    body += [f"    i[{i}] = float({ins[i]})" for i in connected]
+                    body.append(f"    {m}.evaluate()")
+                    if store:
+                        body.append(f"    changed.append({m})")
+                if model.num_outputs:
+                    body.append(f"o = {m}.outputs")
+                    body += [f"{outs[i]} = o[{i}]" for i in range(model.num_outputs)]
+
+        lines = ["def evaluate(now):"]
+        lines += [f"    {line}" for line in head + ["changed = []"] + body + ["return changed"]]
+        return "\n".join(lines) + "\n", namespace
@@ -0,0 +1,145 @@
+# engine/evaluator.py
+import time
+from .models import JoystickModel, TelemetryModel
+
+
+class Evaluator:
+    """
+    Runs a Graph without Qt, in one of two modes:
+
+    MODE_IMMEDIATE moves values the way the editor's signals carry them: a
+    source change is delivered to every connected input at once, each node
+    re-evaluates and passes its emitted outputs on, depth first. A node with
+    two changed inputs evaluates twice, the first time half updated.
+
+    MODE_TICK only stores changed inputs and marks their nodes dirty; flush()
+    then evaluates each dirty node once, in topological order, so every node
+    sees all of the tick's changes at once. EDGE_TRIGGERED nodes (toggles,
+    boost) still take every input change as it comes so no press is lost,
+    but pass their outputs on in order during flush().
+
+    on_channel(channel_number, ppm_value) is called whenever a PPM channel
+    sink is re-evaluated; channel_values keeps the latest value per channel.
+    """
+    MODE_IMMEDIATE = "immediate"
+    MODE_TICK = "tick"
+    MODES = (MODE_IMMEDIATE, MODE_TICK)
+
+    def __init__(self, graph, on_channel=None, clock=time.monotonic, mode=MODE_IMMEDIATE):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown evaluation mode '{mode}' (available: {', '.join(self.MODES)})")
+        self.graph = graph
+        self.on_channel = on_channel
+        self.clock = clock
+        self.mode = mode
+        self.channel_values = {}
+        self.evaluations = 0
+        self.timed_nodes = []
+        self._graph_version = None
+        self._dirty = set() # Models with inputs changed since the last flush()
+        self._pending = {} # Model -> output indices to pass on during flush()
+        self._find_timed_nodes()
+
+    def _find_timed_nodes(self):
+        self.timed_nodes = [model for model in self.graph.nodes.values() if model.HAS_DEADLINE]
+        for model in self.timed_nodes:
+            model.clock = self.clock
+        self._graph_version = self.graph.version
+
+    def joysticks(self):
+        return self.graph.nodes_of_type(JoystickModel)
+
+    def set_source(self, source, output_index, value):
+        """Sets one output of a source node (joystick, telemetry) and passes it on."""
+        source.set_output(output_index, value)
+        self.set_outputs(source, (output_index,))
+
+    def apply_changes(self, source, changes):
+        """Applies (output_index, value) pairs to a source, in the order given."""
+        for output_index, value in changes:
+            self.set_source(source, output_index, value)
+
+    def apply_telemetry(self, values):
+        for model in self.graph.nodes_of_type(TelemetryModel):
+            self.set_outputs(model, model.apply_values(values))
+
+    def advance(self, now=None):
+        """Lets time-driven nodes (e.g. Boost Control) end their phases; call this regularly."""
+        now = self.clock() if now is None else now
+        if self._graph_version != self.graph.version:
+            self._find_timed_nodes()
+        for model in self.timed_nodes:
+            self.set_outputs(model, model.advance(now))
+
+    def tick(self, now=None):
+        """advance() and flush() in one call, for driving a MODE_TICK evaluator from a loop."""
+        self.advance(now)
+        return self.flush()
+
+    def set_outputs(self, source, output_indices):
+        """Passes the current value of the given outputs of any node on to its targets."""
+        if self.mode == self.MODE_TICK:
+            self._send(source, output_indices)
+        else:
+            self._propagate(source, output_indices)
+
+    def _propagate(self, source, output_indices):
+        targets = self.graph.targets
+        outputs = source.outputs
+        for output_index in output_indices:
+            value = outputs[output_index]
+            for target, input_index in targets(source, output_index):
+                self.evaluations += 1
+                emitted = target.set_input(input_index, value)
+                if target.IS_SINK:
+                    self._deliver(target)
+                if emitted:
+                    self._propagate(target, emitted)
+
+    def _send(self, source, output_indices):
+        targets = self.graph.targets
+        outputs = source.outputs
+        for output_index in output_indices:
+            value = outputs[output_index]
+            for target, input_index in targets(source, output_index):
+                if target.EDGE_TRIGGERED:
+                    self.evaluations += 1
+                    emitted = target.set_input(input_index, value)
+                    self._pending.setdefault(target, set()).update(emitted)
+                else:
+                    target.inputs[input_index] = float(value)
+                    self._dirty.add(target)
+
+    def flush(self):
+        """
+        Evaluates the dirty nodes once each, upstream first, and passes their
+        outputs on. Returns the models that were evaluated or changed.
+        """
+        if not self._dirty and not self._pending:
+            return []
+        dirty = self._dirty
+        pending = self._pending
+        touched = []
+        for model in self.graph.topological_order():
+            if model in dirty:
+                self.evaluations += 1
+                emitted = model.evaluate()
+                if model.IS_SINK:
+                    self._deliver(model)
+                touched.append(model)
+                if emitted:
+                    self._send(model, emitted)
+                if model in pending:
+                    self._send(model, sorted(pending.pop(model)))
+            elif model in pending:
+                if model.EDGE_TRIGGERED:
+                    touched.append(model)
+                self._send(model, sorted(pending.pop(model)))
+        dirty.clear()
+        pending.clear() # Left over only for nodes no longer in the graph
+        return touched
+
+    def _deliver(self, sink):
+        self.channel_values[sink.channel_number] = sink.ppm_value
+        if self.on_channel:
+            self.on_channel(sink.channel_number, sink.ppm_value)
@@ -0,0 +1,96 @@
+# engine/formula.py
+"""
+Custom Logic formulas: "Y = <expression of X1..Xn>".
+
+A formula is parsed once with ast, checked against a whitelist (numbers,
+the inputs, arithmetic, comparisons, and/or/not, "a if c else b" and calls
+of the FORMULA_HELPERS) and compiled to a plain function of the inputs, so
+evaluating it is a single call. Anything else, e.g. attribute access,
+strings or other names, is rejected with a ValueError.
+"""
+import ast
+import re
+
+
+def clamp(value, low=-1.0, high=1.0):
+    return low if value < low else high if value > high else value
+
+
+def expo(x, amount):
+    """Expo curve as in Channel Config: amount 0 is linear, 1 is x³."""
+    return amount * x * x * x + (1 - amount) * x
+
+
+def deadband(x, width):
+    """0 while |x| <= width, rescaled so the remaining travel still reaches ±1."""
+    if -width <= x <= width:
+        return 0.0
+    return (x - width if x > 0 else x + width) / (1.0 - width)
+
+
+def sign(x):
+    return 1.0 if x > 0 else -1.0 if x < 0 else 0.0
+
+
+FORMULA_HELPERS = {
+    "clamp": clamp,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "expo": expo,
+    "deadband": deadband,
+    "sign": sign,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call,
+    ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.Not, ast.And, ast.Or, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+_INPUT_NAME = re.compile(r"X([1-9][0-9]*)$")
+
+
+def _check(tree, num_inputs, helpers):
+    helper_calls = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"'{type(node).__name__}' is not allowed in a formula")
+        if isinstance(node, ast.Constant) and type(node.value) not in (int, float, bool):
+            raise ValueError(f"Only numbers are allowed, not {node.value!r}")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in helpers:
+                raise ValueError(f"Unknown function (available: {', '.join(helpers)})")
+            if node.keywords:
+                raise ValueError("Functions take positional arguments only")
+        elif isinstance(node, ast.Name) and id(node) not in helper_calls:
+            match = _INPUT_NAME.match(node.id)
+            if not match:
+                raise ValueError(f"Unknown name '{node.id}' (inputs are X1..X{num_inputs})")
+            if int(match.group(1)) > num_inputs:
+                raise ValueError(f"'{node.id}' is not an input of this node (X1..X{num_inputs})")
+
+
+def compile_formula(text, num_inputs, helpers=FORMULA_HELPERS):
+    """
+    Returns a function taking the num_inputs input values and returning Y.
+    Raises ValueError for formulas that do not parse or fail the whitelist.
+    helpers replaces FORMULA_HELPERS, e.g. with array versions of them.
+    """
+    expression = text.strip()
+    if expression[:1] in ("Y", "y") and expression[1:].lstrip().startswith("="):
+        expression = expression[1:].lstrip()[1:]
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Syntax error: {e.msg}") from None
+    _check(tree, num_inputs, helpers)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and type(node.value) is int:
+            node.value = float(node.value) # Float math overflows instead of growing huge integers
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg=f"X{i + 1}") for i in range(num_inputs)],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    function = ast.Expression(ast.Lambda(args=arguments, body=tree.body))
+    ast.fix_missing_locations(function)
+    code = compile(function, "<formula>", "eval")
+    return eval(code, {"__builtins__": {}, **helpers})
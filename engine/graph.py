@@ -0,0 +1,163 @@
+# engine/graph.py
+from collections import namedtuple
+from .models import create_node_model
+
+# One connection: an output port of `source` feeding an input port of `target` (both models)
+Edge = namedtuple("Edge", "source output_index target input_index")
+
+
+class Graph:
+    """
+    Node models and the edges between their ports.
+
+    An output may feed any number of inputs, an input takes at most one
+    edge, and connect() refuses edges that would close a cycle, so the graph
+    always has a topological order. from_layout() builds a graph from the
+    contents of layout.json.
+    """
+    def __init__(self):
+        self.nodes = {} # id -> model
+        self.edges = []
+        self.version = 0 # Bumped on every change, for caches derived from the graph
+        self.params_version = 0 # Bumped by params_changed()
+        self._targets = {} # (source id, output index) -> [(target, input index), ...]
+        self._incoming = {} # (target id, input index) -> Edge
+        self._order = None
+
+    def _changed(self):
+        self.version += 1
+        self._order = None
+
+    def params_changed(self):
+        """Records that a node parameter was edited, for caches that fold parameters in (CompiledGraph)."""
+        self.params_version += 1
+
+    def add_node(self, model):
+        self.nodes[model.id] = model
+        self._changed()
+        return model
+
+    def remove_node(self, model):
+        for edge in [edge for edge in self.edges if model in (edge.source, edge.target)]:
+            self.disconnect(edge)
+        if self.nodes.get(model.id) is model:
+            del self.nodes[model.id]
+        self._changed()
+
+    def connect(self, source, output_index, target, input_index):
+        """Adds an edge and returns it; raises ValueError for ports that do not exist or are taken."""
+        if not 0 <= output_index < source.num_outputs:
+            raise ValueError(f"'{source.title}' has no output {output_index} ({source.num_outputs} outputs)")
+        if not 0 <= input_index < target.num_inputs:
+            raise ValueError(f"'{target.title}' has no input {input_index} ({target.num_inputs} inputs)")
+        if (target.id, input_index) in self._incoming:
+            raise ValueError(f"Input {input_index} of '{target.title}' is already connected")
+        if self._reaches(target, source):
+            raise ValueError(f"Connecting '{source.title}' to '{target.title}' would create a cycle")
+        edge = Edge(source, output_index, target, input_index)
+        self.edges.append(edge)
+        self._index(edge)
+        self._changed()
+        return edge
+
+    def _index(self, edge):
+        self._targets.setdefault((edge.source.id, edge.output_index), []).append((edge.target, edge.input_index))
+        self._incoming[(edge.target.id, edge.input_index)] = edge
+
+    def rename_node(self, model, node_id):
+        """Changes the id of a node in the graph, keeping its edges."""
+        if self.nodes.get(model.id) is model:
+            del self.nodes[model.id]
+        model.id = node_id
+        self.nodes[node_id] = model
+        self._targets = {}
+        self._incoming = {}
+        for edge in self.edges:
+            self._index(edge)
+        self._changed()
+
+    def _reaches(self, start, goal):
+        """True if values from start flow into goal (or start is goal)."""
+        stack = [start]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node is goal:
+                return True
+            if node.id not in seen:
+                seen.add(node.id)
+                stack.extend(edge.target for edge in self.edges if edge.source is node)
+        return False
+
+    def topological_order(self):
+        """Returns the nodes so that every node comes after all nodes feeding it."""
+        if self._order is None:
+            pending = {node_id: 0 for node_id in self.nodes}
+            for edge in self.edges:
+                pending[edge.target.id] += 1
+            ready = [model for model in self.nodes.values() if not pending[model.id]]
+            order = []
+            while ready:
+                model = ready.pop()
+                order.append(model)
+                for edge in self.edges:
+                    if edge.source is model:
+                        pending[edge.target.id] -= 1
+                        if not pending[edge.target.id]:
+                            ready.append(edge.target)
+            self._order = order
+        return self._order
+
+    def disconnect(self, edge):
+        if edge not in self.edges:
+            return
+        self.edges.remove(edge)
+        targets = self._targets[(edge.source.id, edge.output_index)]
+        targets.remove((edge.target, edge.input_index))
+        if not targets:
+            del self._targets[(edge.source.id, edge.output_index)]
+        del self._incoming[(edge.target.id, edge.input_index)]
+        self._changed()
+
+    def targets(self, source, output_index):
+        """Returns the (target model, input index) pairs fed by an output."""
+        return self._targets.get((source.id, output_index), ())
+
+    def incoming(self, target, input_index):
+        return self._incoming.get((target.id, input_index))
+
+    def nodes_of_type(self, model_class):
+        return [model for model in self.nodes.values() if isinstance(model, model_class)]
+
+    @classmethod
+    def from_layout(cls, data):
+        """
+        Builds a graph from a layout dict as saved in layout.json. Nodes of
+        unknown types are skipped together with their connections. Older
+        layouts without node ids are connected by node title.
+        """
+        graph = cls()
+        by_title = {}
+        for node_data in data.get("nodes", []):
+            try:
+                model = create_node_model(node_data)
+            except ValueError as e:
+                print(f"Skipping node '{node_data.get('title')}': {e}")
+                continue
+            graph.add_node(model)
+            by_title.setdefault(node_data.get("title", model.title), model)
+
+        for conn_data in data.get("connections", []):
+            if "start_node_id" in conn_data:
+                source = graph.nodes.get(conn_data["start_node_id"])
+                target = graph.nodes.get(conn_data["end_node_id"])
+            else:
+                source = by_title.get(conn_data.get("start_node_title"))
+                target = by_title.get(conn_data.get("end_node_title"))
+            if source and target:
+                try:
+                    graph.connect(source, conn_data["start_node_output_index"],
+                                  target, conn_data["end_node_input_index"])
+                except ValueError as e:
+                    print(f"Skipping connection: {e}")
+        return graph
@@ -0,0 +1,462 @@
+# engine/models.py
+"""
+Plain-Python models of the node types, without any Qt dependency.
+
+A model holds a node's parameters, its latest input and output values and
+the computation between them. set_input() stores an input and returns the
+indices of the outputs that should be emitted, so a caller (an editor
+node, the Evaluator) decides how values travel on. The editor nodes in
+nodes/ are views bound to one of these models.
+"""
+import time
+import uuid
+from .formula import clamp, compile_formula
+
+
+class NodeModel:
+    TYPE = None # "type" of the node in layout.json
+    TITLE = "Node"
+    NUM_INPUTS = 0
+    NUM_OUTPUTS = 0
+    PARAMS = () # Attributes saved with the layout
+    INITIAL_INPUTS = None # Input values before anything is connected, default all 0.0
+    IS_SINK = False # Consumes values outside the graph (PPM channels)
+    HAS_DEADLINE = False # Changes outputs on its own over time, see advance()
+    EDGE_TRIGGERED = False # Reacts to every input change, not just the latest value (see Evaluator)
+
+    def __init__(self, node_id=None, title=None):
+        self.id = node_id or str(uuid.uuid4())
+        self.title = title or self.TITLE
+        self.num_inputs = getattr(self, "num_inputs", self.NUM_INPUTS)
+        self.num_outputs = getattr(self, "num_outputs", self.NUM_OUTPUTS)
+        self.inputs = list(self.INITIAL_INPUTS or [0.0] * self.num_inputs)
+        self.outputs = [0.0] * self.num_outputs
+        self.all_outputs = tuple(range(self.num_outputs))
+
+    @classmethod
+    def from_state(cls, data):
+        """Creates the model for a node saved in layout.json."""
+        model = cls(node_id=data.get("id"), title=data.get("title"))
+        model.set_params(data)
+        return model
+
+    def get_params(self):
+        return {name: getattr(self, name) for name in self.PARAMS}
+
+    def set_params(self, data):
+        for name in self.PARAMS:
+            if name in data:
+                setattr(self, name, data[name])
+
+    def set_input(self, index, value):
+        """Stores an input value and returns the indices of the outputs to emit."""
+        if index < self.num_inputs:
+            self.inputs[index] = float(value)
+            return self.evaluate(index)
+        return ()
+
+    def evaluate(self, changed_input=None):
+        """Recomputes the outputs from the inputs; returns the indices of the outputs to emit."""
+        return ()
+
+
+class JoystickModel(NodeModel):
+    """
+    Source: axes, buttons, then an x/y pair per hat. Outputs are set by the
+    input service through set_output(); received tells which of them have
+    had a value yet (a disconnected device never sends one).
+    """
+    TYPE = "JoystickNode"
+    TITLE = "Joystick"
+    PARAMS = ("guid", "name")
+
+    def __init__(self, num_axes=4, num_buttons=12, num_hats=1, guid=None, name=None, node_id=None, title=None):
+        self.num_axes = num_axes
+        self.num_buttons = num_buttons
+        self.num_hats = num_hats
+        self.num_outputs = num_axes + num_buttons + num_hats * 2
+        self.guid = guid
+        self.name = name
+        super().__init__(node_id, title or name)
+        self.received = [False] * self.num_outputs
+
+    @classmethod
+    def from_state(cls, data):
+        return cls(data.get("num_axes", 4), data.get("num_buttons", 12), data.get("num_hats", 1),
+                   data.get("guid"), data.get("name") or data.get("title"), data.get("id"), data.get("title"))
+
+    def set_output(self, output_index, value):
+        self.outputs[output_index] = value
+        self.received[output_index] = True
+
+
+class TelemetryModel(NodeModel):
+    """Source: one output per telemetry field name, updated from the parsed telemetry values."""
+    TYPE = "TelemetryNode"
+    TITLE = "Telemetry"
+    NUM_OUTPUTS = 4
+    PARAMS = ("fields",)
+    DEFAULT_FIELDS = ["rssi", "lq", "vbat", ""]
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.fields = list(self.DEFAULT_FIELDS)
+        self.received = [False] * self.NUM_OUTPUTS
+
+    def set_params(self, data):
+        if "fields" in data:
+            self.fields = [name.strip().lower() for name in
+                           (list(data["fields"]) + [""] * self.NUM_OUTPUTS)[:self.NUM_OUTPUTS]]
+            self.received = [False] * self.NUM_OUTPUTS
+
+    def apply_values(self, values):
+        """Takes {field: value}; returns the indices of the outputs whose field changed."""
+        changed = []
+        for i, name in enumerate(self.fields):
+            value = values.get(name)
+            if value is not None and (not self.received[i] or value != self.outputs[i]):
+                self.outputs[i] = value
+                self.received[i] = True
+                changed.append(i)
+        return changed
+
+    def set_output(self, output_index, value):
+        self.outputs[output_index] = value
+        self.received[output_index] = True
+
+
+class PPMChannelModel(NodeModel):
+    """Sink: one PPM channel. ppm_value is the pulse width in µs for the current input."""
+    TYPE = "PPMChannelNode"
+    NUM_INPUTS = 1
+    PARAMS = ("inverted",)
+    IS_SINK = True
+
+    def __init__(self, channel_number=1, node_id=None, title=None):
+        self.channel_number = channel_number
+        super().__init__(node_id, title or f"PPM Channel {channel_number}")
+        self.inverted = False
+        self.current_value = 0.0
+        self.ppm_value = 1500
+
+    @classmethod
+    def from_state(cls, data):
+        channel_number = data.get("channel_number")
+        if channel_number is None: # Older layouts only name the channel in the title
+            channel_number = int(data.get("title", "").rsplit(" ", 1)[-1])
+        model = cls(channel_number, data.get("id"), data.get("title"))
+        model.set_params(data)
+        return model
+
+    def evaluate(self, changed_input=None):
+        value = -self.inputs[0] if self.inverted else self.inputs[0]
+        self.current_value = clamp(value)
+        self.ppm_value = int(1500 + self.current_value * 500)
+        return ()
+
+
+class CustomLogicModel(NodeModel):
+    """
+    Y = formula of X1..Xn (see engine/formula.py). The formula is compiled
+    when it is set; `error` describes why it does not compile or last failed
+    to evaluate, and each formula reports its errors only once.
+    """
+    TYPE = "CustomLogicNode"
+    TITLE = "Custom Logic"
+    NUM_OUTPUTS = 1
+    PARAMS = ("formula",)
+    MAX_INPUTS = 8
+
+    def __init__(self, inputs=1, node_id=None, title=None):
+        self.num_inputs = inputs
+        super().__init__(node_id, title)
+        self._formula = None
+        self.function = None
+        self.error = None
+        self.formula = "Y = X1" if inputs == 1 else "Y = " + " + ".join(f"X{i + 1}" for i in range(inputs))
+
+    @property
+    def formula(self):
+        return self._formula
+
+    @formula.setter
+    def formula(self, text):
+        if text == self._formula:
+            return
+        self._formula = text
+        try:
+            self.function = compile_formula(text, self.num_inputs)
+            self.error = None
+        except ValueError as e:
+            self.function = None
+            self.error = str(e)
+            print(f"Error in formula '{text}': {e}")
+
+    @classmethod
+    def from_state(cls, data):
+        model = cls(data.get("inputs", 1), data.get("id"), data.get("title"))
+        model.set_params(data)
+        return model
+
+    def get_params(self):
+        return {"inputs": self.num_inputs, "formula": self.formula}
+
+    def evaluate(self, changed_input=None):
+        if self.function is None:
+            self.outputs[0] = 0.0
+            return self.all_outputs
+        try:
+            self.outputs[0] = float(self.function(*self.inputs))
+        except (ArithmeticError, TypeError, ValueError) as e:
+            self.outputs[0] = 0.0
+            if self.error is None:
+                self.error = str(e) or type(e).__name__
+                print(f"Error evaluating formula '{self._formula}': {self.error}")
+        return self.all_outputs
+
+
+class BoostControlModel(NodeModel):
+    """
+    Throttle pass-through that adds boost_amount_us while the button is held,
+    for at most boost_duration_s, followed by a cooldown. Phases end on their
+    own; whoever drives the model calls advance() at or after `deadline`.
+    """
+    TYPE = "BoostControlNode"
+    TITLE = "Boost Control"
+    NUM_INPUTS = 2
+    NUM_OUTPUTS = 1
+    PARAMS = ("boost_duration_s", "cooldown_duration_s", "boost_amount_us")
+    HAS_DEADLINE = True
+    EDGE_TRIGGERED = True
+    STATE_READY = 0
+    STATE_BOOSTING = 1
+    STATE_COOLDOWN = 2
+
+    def __init__(self, node_id=None, title=None, clock=time.monotonic):
+        super().__init__(node_id, title)
+        self.boost_duration_s = 2.0
+        self.cooldown_duration_s = 3.0
+        self.boost_amount_us = 500
+        self.state = self.STATE_READY
+        self.deadline = None # clock() time at which the current phase ends
+        self.clock = clock
+
+    def _enter(self, state, duration_s, now=None):
+        self.state = state
+        self.deadline = (self.clock() if now is None else now) + duration_s
+
+    def evaluate(self, changed_input=None, now=None):
+        throttle, button = self.inputs
+        if self.state == self.STATE_READY and button > 0.5:
+            self._enter(self.STATE_BOOSTING, self.boost_duration_s, now)
+        elif self.state == self.STATE_BOOSTING and button < 0.5:
+            self._enter(self.STATE_COOLDOWN, self.cooldown_duration_s, now)
+        output_ppm = int(1500 + throttle * 500)
+        if self.state == self.STATE_BOOSTING:
+            output_ppm += self.boost_amount_us
+        self.outputs[0] = (clamp(output_ppm, 1000, 2000) - 1500) / 500.0
+        return self.all_outputs
+
+    def advance(self, now):
+        """Ends a boost or cooldown whose time is up; returns the indices of the outputs to emit."""
+        if self.deadline is None or now < self.deadline:
+            return ()
+        if self.state == self.STATE_BOOSTING:
+            self._enter(self.STATE_COOLDOWN, self.cooldown_duration_s, now)
+        else:
+            self.state = self.STATE_READY
+            self.deadline = None
+        return self.evaluate(now=now)
+
+
+class ToggleModel(NodeModel):
+    """Flips between -1 and 1 on every rising edge of the input."""
+    TYPE = "ToggleNode"
+    TITLE = "Toggle Switch"
+    NUM_INPUTS = 1
+    NUM_OUTPUTS = 1
+    EDGE_TRIGGERED = True
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.is_on = False
+        self.last_input_state = 0.0
+        self.outputs[0] = -1.0
+
+    def evaluate(self, changed_input=None):
+        value = self.inputs[0]
+        emitted = ()
+        if value > 0.5 and self.last_input_state < 0.5:
+            self.is_on = not self.is_on
+            self.outputs[0] = 1.0 if self.is_on else -1.0
+            emitted = self.all_outputs
+        self.last_input_state = value
+        return emitted
+
+
+class ThreePositionSwitchModel(NodeModel):
+    """Steps between -1, ~0 and 1 on rising edges of its Up (0) and Down (1) inputs."""
+    TYPE = "ThreePositionSwitchNode"
+    TITLE = "3-Position Switch"
+    NUM_INPUTS = 2
+    NUM_OUTPUTS = 1
+    EDGE_TRIGGERED = True
+    POSITION_VALUES = (-1.0, 0.000001, 1.0)
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.current_position = 1
+        self.last_input_states = [0.0, 0.0]
+        self.outputs[0] = self.POSITION_VALUES[1]
+
+    def evaluate(self, changed_input=0):
+        value = self.inputs[changed_input]
+        emitted = ()
+        if value > 0.5 and self.last_input_states[changed_input] < 0.5:
+            position = self.current_position + (1 if changed_input == 0 else -1)
+            if 0 <= position <= 2:
+                self.current_position = position
+                self.outputs[0] = self.POSITION_VALUES[position]
+                emitted = self.all_outputs
+        self.last_input_states[changed_input] = value
+        return emitted
+
+
+class ChannelConfigModel(NodeModel):
+    """Expo, weight and offset for one channel."""
+    TYPE = "ChannelConfigNode"
+    TITLE = "Channel Config"
+    NUM_INPUTS = 1
+    NUM_OUTPUTS = 1
+    PARAMS = ("expo_amount", "weight", "offset_us")
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.expo_amount = 0.0
+        self.weight = 100.0
+        self.offset_us = 0
+
+    def curve(self, x):
+        """Returns the output for input x in -1..1."""
+        y_expo = (self.expo_amount * (x ** 3)) + ((1 - self.expo_amount) * x)
+        y_weighted = y_expo * (self.weight / 100.0)
+        y_us = 1500 + (y_weighted * 500)
+        y_offset_us = y_us + self.offset_us
+        return clamp((y_offset_us - 1500) / 500.0)
+
+    def evaluate(self, changed_input=None):
+        self.outputs[0] = self.curve(self.inputs[0])
+        return self.all_outputs
+
+
+class MixerModel(NodeModel):
+    """Two inputs mixed into two outputs with percentage weights: Out1 = A*A1 + B*B1, Out2 = A*A2 + B*B2."""
+    TYPE = "MixerNode"
+    TITLE = "Mixer"
+    NUM_INPUTS = 2
+    NUM_OUTPUTS = 2
+    PARAMS = ("weights",)
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.weights = {'A1': 100, 'B1': 0, 'A2': 0, 'B2': 100}
+
+    def evaluate(self, changed_input=None):
+        in_a, in_b = self.inputs
+        w = self.weights
+        self.outputs[0] = clamp((in_a * w['A1'] / 100.0) + (in_b * w['B1'] / 100.0))
+        self.outputs[1] = clamp((in_a * w['A2'] / 100.0) + (in_b * w['B2'] / 100.0))
+        return self.all_outputs
+
+
+class AxisToButtonsModel(NodeModel):
+    """Two button outputs (1/-1) for the axis being past +deadzone and past -deadzone."""
+    TYPE = "AxisToButtonsNode"
+    TITLE = "Axis to Buttons"
+    NUM_INPUTS = 1
+    NUM_OUTPUTS = 2
+    PARAMS = ("deadzone",)
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.deadzone = 0.25
+        self.outputs = [-1.0, -1.0]
+
+    def evaluate(self, changed_input=None):
+        value = self.inputs[0]
+        emitted = []
+        pos_active = 1.0 if value > self.deadzone else -1.0
+        if pos_active != self.outputs[0]:
+            self.outputs[0] = pos_active
+            emitted.append(0)
+        neg_active = 1.0 if value < -self.deadzone else -1.0
+        if neg_active != self.outputs[1]:
+            self.outputs[1] = neg_active
+            emitted.append(1)
+        return emitted
+
+
+class SwitchGateModel(NodeModel):
+    """Passes input A (1) or, while the switch (0) is above 0, input B (2)."""
+    TYPE = "SwitchGateNode"
+    TITLE = "Switch Gate"
+    NUM_INPUTS = 3
+    NUM_OUTPUTS = 1
+    INITIAL_INPUTS = [-1.0, 0.0, 0.0]
+
+    def evaluate(self, changed_input=None):
+        switch_state, input_a, input_b = self.inputs
+        self.outputs[0] = input_b if switch_state > 0 else input_a
+        return self.all_outputs
+
+
+class PedalControlModel(NodeModel):
+    """Throttle (0) and brake (1) pedals combined into one channel around center_us; brake wins past its deadzone."""
+    TYPE = "PedalControlNode"
+    TITLE = "Pedal Control"
+    NUM_INPUTS = 2
+    NUM_OUTPUTS = 1
+    PARAMS = ("throttle_limit", "brake_limit", "brake_deadzone", "center_us")
+    INITIAL_INPUTS = [-1.0, -1.0]
+
+    def __init__(self, node_id=None, title=None):
+        super().__init__(node_id, title)
+        self.throttle_limit = 100
+        self.brake_limit = 100
+        self.brake_deadzone = 5 # % of brake travel before it takes over
+        self.center_us = 1500
+
+    def evaluate(self, changed_input=None):
+        raw_throttle, raw_brake = self.inputs
+        limited_throttle = (raw_throttle + 1.0) / 2.0 * (self.throttle_limit / 100.0)
+        limited_brake = (raw_brake + 1.0) / 2.0 * (self.brake_limit / 100.0)
+
+        combined_output = 0.0
+        if limited_brake > (self.brake_deadzone / 100.0):
+            combined_output = -limited_brake
+        elif limited_throttle > 0.01:
+            combined_output = limited_throttle
+
+        output_us = self.center_us
+        if combined_output > 0:
+            output_us = self.center_us + (combined_output * (2000 - self.center_us))
+        elif combined_output < 0:
+            output_us = self.center_us + (combined_output * (self.center_us - 1000))
+        # Back to -1..1 around 1500 µs, as the PPM channels expect
+        self.outputs[0] = (output_us - 1500) / 500.0
+        return self.all_outputs
+
+
+NODE_MODELS = {model.TYPE: model for model in (
+    JoystickModel, TelemetryModel, PPMChannelModel, CustomLogicModel, BoostControlModel,
+    ToggleModel, ThreePositionSwitchModel, ChannelConfigModel, MixerModel,
+    AxisToButtonsModel, SwitchGateModel, PedalControlModel)}
+
+
+def create_node_model(data):
+    """Creates the model for a node saved in layout.json (see NODE_MODELS)."""
+    try:
+        model_class = NODE_MODELS[data.get("type")]
+    except KeyError:
+        raise ValueError(f"Unknown node type: {data.get('type')}") from None
+    return model_class.from_state(data)
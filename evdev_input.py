@@ -0,0 +1,558 @@
+# evdev_input.py
+"""
+Linux evdev joystick backend that reads /dev/input/event* directly, without
+initialising pygame/SDL.
+
+Devices are read with non-blocking reads from an epoll set. EV_ABS and EV_KEY
+events are decoded into the same axes/buttons/hats model pygame exposes
+(axes scaled to -1..1 with the kernel's reported range, ABS_HAT* pairs as
+hats), and new or removed event nodes are picked up through inotify on
+/dev/input. Only the standard library is used (fcntl/ioctl, struct, ctypes
+for inotify).
+
+    python evdev_input.py            # list joysticks and print their events
+    python evdev_input.py --uinput   # create a virtual test joystick via uinput
+"""
+import argparse
+import ctypes
+import errno
+import fcntl
+import os
+import select
+import struct
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+# Same event type numbers as pygame, so the input service can dispatch both alike
+JOYAXISMOTION = 1536
+JOYHATMOTION = 1538
+JOYBUTTONDOWN = 1539
+JOYBUTTONUP = 1540
+JOYDEVICEADDED = 1541
+JOYDEVICEREMOVED = 1542
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+EV_MAX = 0x1f
+KEY_MAX = 0x2ff
+ABS_MAX = 0x3f
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_HAT0X = 0x10
+ABS_HAT3Y = 0x17
+BTN_MISC = 0x100
+BTN_JOYSTICK = 0x120
+BTN_GAMEPAD = 0x130
+BTN_DIGI = 0x140
+
+_IOC_WRITE = 1
+_IOC_READ = 2
+
+
+def _ioc(direction, kind, number, size):
+    return (direction << 30) | (size << 16) | (ord(kind) << 8) | number
+
+
+def EVIOCGNAME(length):
+    return _ioc(_IOC_READ, 'E', 0x06, length)
+
+
+def EVIOCGBIT(event_type, length):
+    return _ioc(_IOC_READ, 'E', 0x20 + event_type, length)
+
+
+def EVIOCGKEY(length):
+    return _ioc(_IOC_READ, 'E', 0x18, length)
+
+
+def EVIOCGABS(axis):
+    return _ioc(_IOC_READ, 'E', 0x40 + axis, _ABSINFO.size)
+
+
+_INPUT_EVENT = struct.Struct('llHHi') # struct input_event: timeval, type, code, value
+_INPUT_ID = struct.Struct('HHHH') # bustype, vendor, product, version
+_ABSINFO = struct.Struct('iiiiii') # value, minimum, maximum, fuzz, flat, resolution
+EVIOCGID = _ioc(_IOC_READ, 'E', 0x02, _INPUT_ID.size)
+
+
+def _query_bits(fd, event_type, max_code):
+    buffer = bytearray((max_code + 8) // 8)
+    fcntl.ioctl(fd, EVIOCGBIT(event_type, len(buffer)), buffer)
+    return buffer
+
+
+def _has_bit(bits, code):
+    return bool(bits[code // 8] & (1 << (code % 8)))
+
+
+class EvdevJoystick:
+    """
+    One /dev/input/event* joystick, duck-typing pygame.joystick.Joystick.
+
+    read() drains the pending kernel events into the device state; the
+    get_* accessors return that state. Buttons are numbered like SDL does
+    (BTN_JOYSTICK and up first, then BTN_MISC), axes in ABS code order.
+    """
+    def __init__(self, path, instance_id):
+        self.path = path
+        self.instance_id = instance_id
+        self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            self._probe()
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _probe(self):
+        fd = self.fd
+        name = bytearray(256)
+        fcntl.ioctl(fd, EVIOCGNAME(len(name)), name)
+        self.name = name.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        input_id = bytearray(_INPUT_ID.size)
+        fcntl.ioctl(fd, EVIOCGID, input_id)
+        bustype, vendor, product, version = _INPUT_ID.unpack(input_id)
+        # SDL's classic Linux GUID layout: little-endian 16-bit fields, each padded to 32 bits
+        self.guid = struct.pack('<HxxHxxHxxHxx', bustype, vendor, product, version).hex()
+
+        key_bits = _query_bits(fd, EV_KEY, KEY_MAX)
+        abs_bits = _query_bits(fd, EV_ABS, ABS_MAX)
+        key_codes = [code for code in range(BTN_JOYSTICK, KEY_MAX + 1) if _has_bit(key_bits, code)]
+        key_codes += [code for code in range(BTN_MISC, BTN_JOYSTICK) if _has_bit(key_bits, code)]
+        self._buttons = {code: index for index, code in enumerate(key_codes)}
+
+        self._axes = {} # code -> (index, minimum, span)
+        self._hats = {} # code -> (hat_index, is_y)
+        absinfo = bytearray(_ABSINFO.size)
+        axis_values = []
+        hat_codes = [code for code in range(ABS_HAT0X, ABS_HAT3Y + 1, 2)
+                     if _has_bit(abs_bits, code) or _has_bit(abs_bits, code + 1)]
+        for code in range(ABS_MAX + 1):
+            if not _has_bit(abs_bits, code):
+                continue
+            fcntl.ioctl(fd, EVIOCGABS(code), absinfo)
+            value, minimum, maximum = _ABSINFO.unpack(absinfo)[:3]
+            if ABS_HAT0X <= code <= ABS_HAT3Y:
+                hat_x_code = code & ~1
+                self._hats[code] = (hat_codes.index(hat_x_code), code & 1)
+            else:
+                self._axes[code] = (len(axis_values), minimum, max(1, maximum - minimum))
+                axis_values.append(value)
+
+        self.axes = [0.0] * len(axis_values)
+        for code, (index, minimum, span) in self._axes.items():
+            self.axes[index] = self._scale(axis_values[index], minimum, span)
+        self.buttons = [0] * len(self._buttons)
+        self.hats = [[0, 0] for _ in hat_codes]
+
+        key_state = bytearray(len(key_bits))
+        fcntl.ioctl(fd, EVIOCGKEY(len(key_state)), key_state)
+        for code, index in self._buttons.items():
+            self.buttons[index] = int(_has_bit(key_state, code))
+
+    @staticmethod
+    def _scale(value, minimum, span):
+        return max(-1.0, min(1.0, (value - minimum) * 2.0 / span - 1.0))
+
+    @staticmethod
+    def is_joystick(fd):
+        """True for devices with joystick/gamepad buttons or X/Y axes and no touch surface."""
+        key_bits = _query_bits(fd, EV_KEY, KEY_MAX)
+        if any(_has_bit(key_bits, code) for code in range(BTN_JOYSTICK, BTN_DIGI)):
+            return True
+        abs_bits = _query_bits(fd, EV_ABS, ABS_MAX)
+        return (_has_bit(abs_bits, ABS_X) and _has_bit(abs_bits, ABS_Y)
+                and not any(_has_bit(key_bits, code) for code in range(BTN_DIGI, BTN_DIGI + 16)))
+
+    def fileno(self):
+        return self.fd
+
+    def read(self, events=None):
+        """
+        Applies every pending kernel event to the state. With an `events`
+        list, the resulting joystick events are appended to it as well.
+        Raises OSError (ENODEV) once the device has been unplugged.
+        """
+        fd = self.fd
+        if fd is None:
+            return
+        while True:
+            try:
+                data = os.read(fd, _INPUT_EVENT.size * 64)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            for _, _, event_type, code, value in _INPUT_EVENT.iter_unpack(data):
+                if event_type == EV_ABS:
+                    self._on_abs(code, value, events)
+                elif event_type == EV_KEY:
+                    self._on_key(code, value, events)
+
+    def _on_abs(self, code, value, events):
+        axis = self._axes.get(code)
+        if axis:
+            index, minimum, span = axis
+            scaled = self._scale(value, minimum, span)
+            self.axes[index] = scaled
+            if events is not None:
+                events.append(SimpleNamespace(type=JOYAXISMOTION, instance_id=self.instance_id,
+                                              axis=index, value=scaled))
+            return
+        hat = self._hats.get(code)
+        if hat:
+            hat_index, is_y = hat
+            # evdev reports up as -1, pygame as +1
+            state = self.hats[hat_index]
+            state[is_y] = (value < 0) - (value > 0) if is_y else (value > 0) - (value < 0)
+            if events is not None:
+                events.append(SimpleNamespace(type=JOYHATMOTION, instance_id=self.instance_id,
+                                              hat=hat_index, value=tuple(state)))
+
+    def _on_key(self, code, value, events):
+        index = self._buttons.get(code)
+        if index is not None and value != 2: # 2 = autorepeat
+            self.buttons[index] = value
+            if events is not None:
+                events.append(SimpleNamespace(type=JOYBUTTONDOWN if value else JOYBUTTONUP,
+                                              instance_id=self.instance_id, button=index))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    # pygame.joystick.Joystick interface
+    def init(self):
+        pass
+
+    def quit(self):
+        self.close()
+
+    def get_instance_id(self):
+        return self.instance_id
+
+    def get_guid(self):
+        return self.guid
+
+    def get_name(self):
+        return self.name
+
+    def get_numaxes(self):
+        return len(self.axes)
+
+    def get_numbuttons(self):
+        return len(self.buttons)
+
+    def get_numhats(self):
+        return len(self.hats)
+
+    def get_axis(self, index):
+        return self.axes[index]
+
+    def get_button(self, index):
+        return self.buttons[index]
+
+    def get_hat(self, index):
+        x, y = self.hats[index]
+        return x, y
+
+
+class _Inotify:
+    """Minimal inotify binding through libc."""
+    IN_ATTRIB = 0x004
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = os.O_NONBLOCK
+    _EVENT = struct.Struct('iIII') # wd, mask, cookie, len
+
+    def __init__(self, path, mask):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {path}")
+
+    def read(self):
+        """Returns [(mask, name)] for the pending events."""
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].split(b"\0", 1)[0].decode()
+            offset += length
+            events.append((mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class EvdevInputBackend:
+    """
+    Input backend for JoystickInputService reading evdev devices directly.
+
+    pump() waits on an epoll set of all device descriptors with a zero
+    timeout and reads whatever is ready; it may run on any thread. Hotplug
+    is handled by get_events() on the GUI thread only: it reads inotify,
+    opens new devices and closes removed ones (including those pump() found
+    unplugged), so the device list that get_count() and open() index never
+    changes under the GUI thread. Opening and closing hold the same lock as
+    pump(), so a descriptor is never closed while it is read. Device
+    indices follow the order in which devices were found, like SDL's, and
+    shift when a device is removed; instance ids are never reused.
+    """
+    name = "evdev"
+    INPUT_DIR = "/dev/input"
+    PUMP_FROM_ANY_THREAD = True # Only reads open descriptors; see the class docstring
+
+    def __init__(self, input_dir=INPUT_DIR):
+        self.input_dir = input_dir
+        self.joysticks = []
+        self._by_fd = {}
+        self._lock = threading.Lock() # Held by pump() and while devices are opened or closed
+        self._events = deque() # Appended by pump(), drained by get_events(); safe across threads
+        self._unplugged = deque() # Found by pump(), removed by get_events()
+        self._motion_events = False
+        self._next_instance_id = 0
+        self._epoll = None
+        self._inotify = None
+
+    def start(self):
+        self._epoll = select.epoll()
+        try:
+            self._inotify = _Inotify(self.input_dir, _Inotify.IN_CREATE | _Inotify.IN_ATTRIB | _Inotify.IN_DELETE)
+            self._epoll.register(self._inotify.fd, select.EPOLLIN)
+        except OSError as e:
+            print(f"evdev hotplug disabled: {e}")
+        for name in sorted(os.listdir(self.input_dir), key=lambda n: (len(n), n)):
+            if name.startswith("event"):
+                self._try_open(os.path.join(self.input_dir, name), announce=False)
+
+    def stop(self):
+        with self._lock:
+            for joystick in self.joysticks:
+                joystick.close()
+            self.joysticks = []
+            self._by_fd.clear()
+        self._unplugged.clear()
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+        if self._epoll:
+            self._epoll.close()
+            self._epoll = None
+
+    def _try_open(self, path, announce=True):
+        if any(joystick.path == path for joystick in self.joysticks):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            return # Not readable (yet); udev may still be fixing the permissions
+        try:
+            is_joystick = EvdevJoystick.is_joystick(fd)
+        except OSError:
+            is_joystick = False
+        finally:
+            os.close(fd)
+        if not is_joystick:
+            return
+        try:
+            joystick = EvdevJoystick(path, self._next_instance_id)
+        except OSError:
+            return
+        self._next_instance_id += 1
+        self.joysticks.append(joystick)
+        with self._lock:
+            self._by_fd[joystick.fd] = joystick
+            self._epoll.register(joystick.fd, select.EPOLLIN)
+        if announce:
+            self._events.append(SimpleNamespace(type=JOYDEVICEADDED, device_index=len(self.joysticks) - 1))
+
+    def _remove(self, joystick):
+        if joystick not in self.joysticks:
+            return
+        self.joysticks.remove(joystick)
+        with self._lock:
+            self._by_fd.pop(joystick.fd, None)
+            try:
+                self._epoll.unregister(joystick.fd)
+            except (OSError, ValueError):
+                pass
+            joystick.close()
+        self._events.append(SimpleNamespace(type=JOYDEVICEREMOVED, instance_id=joystick.instance_id))
+
+    def get_count(self):
+        return len(self.joysticks)
+
+    def open(self, device_index):
+        return self.joysticks[device_index]
+
+    def set_motion_events(self, enabled):
+        self._motion_events = enabled
+
+    def pump(self):
+        """Reads the devices with pending events; unplugged ones are left for get_events() to remove."""
+        events = self._events if self._motion_events else None
+        with self._lock:
+            if not self._epoll:
+                return
+            for fd, _ in self._epoll.poll(0):
+                joystick = self._by_fd.get(fd)
+                if joystick is None:
+                    continue # The inotify descriptor, read by get_events()
+                try:
+                    joystick.read(events)
+                except OSError as e:
+                    if e.errno not in (errno.ENODEV, errno.EBADF):
+                        raise
+                    # Stop polling it; the GUI thread closes it
+                    del self._by_fd[fd]
+                    self._epoll.unregister(fd)
+                    self._unplugged.append(joystick)
+
+    def _handle_hotplug(self):
+        while self._unplugged:
+            self._remove(self._unplugged.popleft())
+        if not self._inotify:
+            return
+        for mask, name in self._inotify.read():
+            if not name.startswith("event"):
+                continue
+            path = os.path.join(self.input_dir, name)
+            if mask & _Inotify.IN_DELETE:
+                for joystick in [j for j in self.joysticks if j.path == path]:
+                    self._remove(joystick)
+            else:
+                self._try_open(path)
+
+    def get_events(self, pump=True):
+        """Pumps if asked, handles hotplug (GUI thread only) and returns the queued events."""
+        if pump:
+            self.pump()
+        self._handle_hotplug()
+        events = self._events
+        return [events.popleft() for _ in range(len(events))]
+
+
+class UInputJoystick:
+    """
+    Virtual joystick created through /dev/uinput, used as a stand-in for real
+    hardware when testing the evdev backend (needs write access to /dev/uinput).
+    Axes report -32768..32767 and appear as ABS_X, ABS_Y, ABS_Z, ...
+    """
+    UINPUT_PATH = "/dev/uinput"
+    UI_DEV_CREATE = _ioc(0, 'U', 1, 0)
+    UI_DEV_DESTROY = _ioc(0, 'U', 2, 0)
+    UI_SET_EVBIT = _ioc(_IOC_WRITE, 'U', 100, 4)
+    UI_SET_KEYBIT = _ioc(_IOC_WRITE, 'U', 101, 4)
+    UI_SET_ABSBIT = _ioc(_IOC_WRITE, 'U', 103, 4)
+    _USER_DEV = struct.Struct('80sHHHHI64i64i64i64i') # struct uinput_user_dev
+    AXIS_MIN = -32768
+    AXIS_MAX = 32767
+
+    def __init__(self, name="QtPye Virtual Joystick", num_axes=4, num_buttons=12, num_hats=1):
+        self.num_axes = num_axes
+        self.num_buttons = num_buttons
+        self.num_hats = num_hats
+        self.fd = os.open(self.UINPUT_PATH, os.O_WRONLY | os.O_NONBLOCK)
+
+        fcntl.ioctl(self.fd, self.UI_SET_EVBIT, EV_KEY)
+        fcntl.ioctl(self.fd, self.UI_SET_EVBIT, EV_ABS)
+        for button in range(num_buttons):
+            fcntl.ioctl(self.fd, self.UI_SET_KEYBIT, self._button_code(button))
+        absmax = [0] * 64
+        absmin = [0] * 64
+        for axis in range(num_axes):
+            fcntl.ioctl(self.fd, self.UI_SET_ABSBIT, axis)
+            absmin[axis], absmax[axis] = self.AXIS_MIN, self.AXIS_MAX
+        for hat in range(num_hats):
+            for code in (ABS_HAT0X + hat * 2, ABS_HAT0X + hat * 2 + 1):
+                fcntl.ioctl(self.fd, self.UI_SET_ABSBIT, code)
+                absmin[code], absmax[code] = -1, 1
+        os.write(self.fd, self._USER_DEV.pack(name.encode()[:79], 0x03, 0x1234, 0x5678, 1, 0,
+                                              *absmax, *absmin, *([0] * 64), *([0] * 64)))
+        fcntl.ioctl(self.fd, self.UI_DEV_CREATE)
+
+    @staticmethod
+    def _button_code(button):
+        # BTN_TRIGGER..BTN_DEAD hold 16 buttons, further ones continue in the gamepad range
+        return BTN_JOYSTICK + button
+
+    def _emit(self, event_type, code, value):
+        os.write(self.fd, _INPUT_EVENT.pack(0, 0, event_type, code, value))
+
+    def _sync(self):
+        self._emit(EV_SYN, 0, 0)
+
+    def set_axis(self, axis, value):
+        """Moves an axis to value in -1..1."""
+        span = self.AXIS_MAX - self.AXIS_MIN
+        self._emit(EV_ABS, axis, int(self.AXIS_MIN + (value + 1.0) / 2.0 * span))
+        self._sync()
+
+    def set_button(self, button, pressed):
+        self._emit(EV_KEY, self._button_code(button), int(bool(pressed)))
+        self._sync()
+
+    def set_hat(self, hat, x, y):
+        self._emit(EV_ABS, ABS_HAT0X + hat * 2, x)
+        self._emit(EV_ABS, ABS_HAT0X + hat * 2 + 1, -y)
+        self._sync()
+
+    def close(self):
+        if self.fd is not None:
+            fcntl.ioctl(self.fd, self.UI_DEV_DESTROY)
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="evdev joystick backend")
+    parser.add_argument("--uinput", action="store_true", help="create a virtual joystick and move its first axis")
+    args = parser.parse_args()
+
+    if args.uinput:
+        import math
+        with UInputJoystick() as device:
+            print("Virtual joystick created, Ctrl+C to remove it")
+            try:
+                start = time.monotonic()
+                while True:
+                    phase = time.monotonic() - start
+                    device.set_axis(0, math.sin(phase * 2.0))
+                    device.set_button(0, int(phase) % 2)
+                    time.sleep(0.01)
+            except KeyboardInterrupt:
+                pass
+    else:
+        backend = EvdevInputBackend()
+        backend.start()
+        backend.set_motion_events(True)
+        for index, joystick in enumerate(backend.joysticks):
+            print(f"{index}: {joystick.name} ({joystick.path}) guid={joystick.guid} "
+                  f"axes={joystick.get_numaxes()} buttons={joystick.get_numbuttons()} hats={joystick.get_numhats()}")
+        try:
+            while True:
+                select.select([backend._epoll.fileno()], [], [], 1.0)
+                for event in backend.get_events():
+                    print(event)
+        except KeyboardInterrupt:
+            backend.stop()
@@ -0,0 +1,179 @@
+# frame_encoders.py
+import struct
+
+
+class AsciiFrameEncoder:
+    """
+    Encodes channels as concatenated 'N=VALUE' commands, the format the
+    PiKoder USB2PPM adapter understands (e.g. b"1=15002=1500...").
+
+    The frame lives in a preallocated template. As long as the channel count
+    stays the same and every value has four digits, encoding only patches
+    the digits of the changed channels in place and allocates nothing.
+    Partial (delta) frames are assembled from the template's per-channel
+    segments.
+    """
+    name = "ascii"
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.delta_buffer = bytearray()
+        self.allocations = 0
+        self._segments = []
+        self._fixed_width = False
+
+    def _rebuild(self, channel_values):
+        parts = [f"{index + 1}={value}".encode() for index, value in enumerate(channel_values)]
+        self.buffer = bytearray(b"".join(parts))
+        self.delta_buffer = bytearray(len(self.buffer))
+        self.allocations += 1
+
+        self._segments = []
+        offset = 0
+        for part in parts:
+            self._segments.append((offset, offset + len(part)))
+            offset += len(part)
+
+        # Only a fixed-width (4-digit) frame can be patched in place later on
+        self._fixed_width = all(1000 <= value <= 9999 for value in channel_values)
+
+    def encode(self, channel_values, channels=None, changed=None):
+        """
+        Returns the frame for the given channel numbers (all if None) as a
+        bytes-like object backed by a buffer that is reused between calls.
+        channel_values is a sequence where channel N is at index N - 1.
+        changed lists the channels modified since the previous call; None
+        means unknown, in which case every channel is refreshed.
+        """
+        segments = self._segments
+        if not self._fixed_width or len(segments) != len(channel_values):
+            self._rebuild(channel_values)
+        else:
+            buf = self.buffer
+            for channel in (range(1, len(channel_values) + 1) if changed is None else changed):
+                value = channel_values[channel - 1]
+                if not 1000 <= value <= 9999:
+                    self._rebuild(channel_values)
+                    break
+                offset = segments[channel - 1][1] - 4
+                buf[offset] = 48 + value // 1000
+                buf[offset + 1] = 48 + value // 100 % 10
+                buf[offset + 2] = 48 + value // 10 % 10
+                buf[offset + 3] = 48 + value % 10
+
+        if channels is None:
+            return self.buffer
+
+        source = memoryview(self.buffer)
+        delta = self.delta_buffer
+        size = 0
+        for channel in channels:
+            start, end = self._segments[channel - 1]
+            delta[size:size + end - start] = source[start:end]
+            size += end - start
+        return memoryview(delta)[:size]
+
+    def frame_size(self, channel_count):
+        """Bytes in a full frame of 4-digit values for channel_count channels."""
+        return sum(len(str(channel)) + 5 for channel in range(1, channel_count + 1))
+
+    def describe(self, frame):
+        return bytes(frame).decode('ascii', errors='replace')
+
+
+class BinaryFrameEncoder:
+    """
+    Compact binary frame:
+
+        0xA5 | count | (channel, value_lo, value_hi) * count | checksum
+
+    Values are unsigned 16-bit little-endian microseconds. The checksum is
+    the XOR of every byte after the sync byte. Every entry carries its
+    channel number, so partial (delta) frames use the same layout.
+
+    Like the ASCII encoder, the full frame is a template in which only the
+    changed entries are repacked; the checksum is updated incrementally.
+    """
+    name = "binary"
+    SYNC = 0xA5
+    _ENTRY = struct.Struct('<BH')
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.delta_buffer = bytearray()
+        self.allocations = 0
+        self._payload_checksum = 0
+
+    def _rebuild(self, channel_values):
+        count = len(channel_values)
+        self.buffer = bytearray(3 + count * 3)
+        self.delta_buffer = bytearray(len(self.buffer))
+        self.allocations += 1
+        self.buffer[0] = self.SYNC
+        self.buffer[1] = count
+        self._payload_checksum = count
+        for index, value in enumerate(channel_values):
+            self._ENTRY.pack_into(self.buffer, 2 + index * 3, index + 1, value)
+            self._payload_checksum ^= (index + 1) ^ (value & 0xFF) ^ (value >> 8)
+        self.buffer[-1] = self._payload_checksum
+
+    def encode(self, channel_values, channels=None, changed=None):
+        """
+        Returns the frame for the given channel numbers (all if None) as a
+        bytes-like object backed by a buffer that is reused between calls.
+        channel_values is a sequence where channel N is at index N - 1.
+        changed lists the channels modified since the previous call; None
+        means unknown, in which case every channel is refreshed.
+        """
+        buf = self.buffer
+        if len(buf) != 3 + len(channel_values) * 3 or changed is None:
+            self._rebuild(channel_values)
+            buf = self.buffer
+        else:
+            checksum = self._payload_checksum
+            for channel in changed:
+                offset = 2 + (channel - 1) * 3
+                value = channel_values[channel - 1]
+                checksum ^= buf[offset + 1] ^ buf[offset + 2] ^ (value & 0xFF) ^ (value >> 8)
+                buf[offset + 1] = value & 0xFF
+                buf[offset + 2] = value >> 8
+            self._payload_checksum = checksum
+            buf[-1] = checksum
+
+        if channels is None:
+            return buf
+
+        delta = self.delta_buffer
+        count = len(channels)
+        delta[0] = self.SYNC
+        delta[1] = count
+        checksum = count
+        offset = 2
+        for channel in channels:
+            source = 2 + (channel - 1) * 3
+            delta[offset:offset + 3] = buf[source:source + 3]
+            checksum ^= buf[source] ^ buf[source + 1] ^ buf[source + 2]
+            offset += 3
+        delta[offset] = checksum
+        return memoryview(delta)[:offset + 1]
+
+    def frame_size(self, channel_count):
+        """Bytes in a full frame for channel_count channels."""
+        return 3 + channel_count * 3
+
+    def describe(self, frame):
+        return bytes(frame).hex(' ').upper()
+
+
+FRAME_ENCODERS = {
+    AsciiFrameEncoder.name: AsciiFrameEncoder,
+    BinaryFrameEncoder.name: BinaryFrameEncoder,
+}
+
+
+def create_frame_encoder(name):
+    """Creates a frame encoder by its registered name (see FRAME_ENCODERS)."""
+    try:
+        return FRAME_ENCODERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown frame encoder: {name}") from None
@@ -0,0 +1,466 @@
+# input_recording.py
+"""
+Recording of joystick input and deterministic replay, for benchmarking the
+node graph and the serial path with the same input on every run.
+
+A recording is a flat binary file: a 32-byte header, fixed 16-byte records
+(monotonic timestamp in ns, device index, JoystickNode output index, value)
+and a device table written when the recording is closed. The file is read
+back through mmap, so a replay does not load it into memory.
+
+ReplayInputBackend plays a recording through the input backend interface of
+JoystickInputService, in real time or as fast as the graph can consume it;
+its devices stand in for pygame.joystick.Joystick behind JoystickNode.
+
+    python main.py --record session.qpir     # record while using the app
+    python input_recording.py layout_presets/layoutFPV.json session.qpir
+    python input_recording.py layout_presets/layoutFPV.json session.qpir --realtime --emulator
+    python input_recording.py layout_presets/layoutFPV.json session.qpir --batch --save traces.npz
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from types import SimpleNamespace
+import pygame
+
+MAGIC = b"QPIR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ8x") # magic, version, record size, record count, device table offset
+RECORD = struct.Struct("<qHHf") # timestamp_ns, device index, output index, value
+DEVICE = struct.Struct("<32s64sHHH2x") # guid, name, axes, buttons, hats
+
+
+class InputRecorder:
+    """
+    Appends every change the input service fans out to a recording file.
+
+    Each device gets its full state recorded when it is added, so a replay
+    starts from the same state the nodes saw. Values are recorded after the
+    axis noise gate, i.e. exactly what the JoystickNodes received.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.record_count = 0
+        self._devices = {} # InputDevice -> index in the device table
+        self._device_table = []
+        self._file = open(path, "wb", buffering=1 << 16)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0))
+
+    def add_device(self, device, timestamp_ns=None):
+        if device in self._devices:
+            return self._devices[device]
+        index = self._devices[device] = len(self._device_table)
+        joystick = device.joystick
+        self._device_table.append(DEVICE.pack(
+            device.guid.encode()[:32], joystick.get_name().encode()[:64],
+            device.num_axes, device.num_buttons, device.num_hats))
+        self._write(index, device.state(), timestamp_ns or time.monotonic_ns())
+        return index
+
+    def record(self, device, changes, timestamp_ns):
+        index = self._devices.get(device)
+        if index is None:
+            self.add_device(device, timestamp_ns) # The initial state already includes the changes
+        else:
+            self._write(index, changes, timestamp_ns)
+
+    def _write(self, index, changes, timestamp_ns):
+        pack = RECORD.pack
+        self._file.write(b"".join(pack(timestamp_ns, index, output_index, value)
+                                  for output_index, value in changes))
+        self.record_count += len(changes)
+
+    def close(self):
+        if self._file.closed:
+            return
+        devices_offset = self._file.tell()
+        self._file.write(b"".join(self._device_table))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.record_count, devices_offset))
+        self._file.close()
+        print(f"Recorded {self.record_count} input changes to {self.path}")
+
+
+class InputRecording:
+    """Read-only, mmap-backed view of a recording file."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not an input recording")
+        magic, version, record_size, self.record_count, devices_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        if not devices_offset:
+            raise ValueError(f"{path} was not closed properly, its device table is missing")
+
+        self.devices = []
+        for offset in range(devices_offset, len(self._map) - DEVICE.size + 1, DEVICE.size):
+            guid, name, num_axes, num_buttons, num_hats = DEVICE.unpack_from(self._map, offset)
+            self.devices.append({
+                "guid": guid.rstrip(b"\0").decode(errors="replace"),
+                "name": name.rstrip(b"\0").decode(errors="replace"),
+                "num_axes": num_axes, "num_buttons": num_buttons, "num_hats": num_hats,
+            })
+
+    def __len__(self):
+        return self.record_count
+
+    def record(self, position):
+        """Returns (timestamp_ns, device index, output index, value) of one record."""
+        return RECORD.unpack_from(self._map, HEADER.size + position * RECORD.size)
+
+    def as_array(self):
+        """All records as a NumPy structured array (timestamp_ns, device, output, value) on the mapped file; drop it before close()."""
+        import numpy as np
+        dtype = np.dtype([("timestamp_ns", "<i8"), ("device", "<u2"), ("output", "<u2"), ("value", "<f4")])
+        return np.frombuffer(self._map, dtype=dtype, count=self.record_count, offset=HEADER.size)
+
+    @property
+    def duration_ns(self):
+        if not self.record_count:
+            return 0
+        return self.record(self.record_count - 1)[0] - self.record(0)[0]
+
+    def close(self):
+        self._map.close()
+
+
+class ReplayJoystick:
+    """A recorded device, with the parts of the pygame.joystick.Joystick interface the app uses."""
+    def __init__(self, instance_id, guid, name, num_axes, num_buttons, num_hats):
+        self.instance_id = instance_id
+        self.guid = guid
+        self.name = name
+        self.axes = [0.0] * num_axes
+        self.buttons = [0] * num_buttons
+        self.hats = [(0, 0)] * num_hats
+
+    def init(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def get_instance_id(self):
+        return self.instance_id
+
+    def get_guid(self):
+        return self.guid
+
+    def get_name(self):
+        return self.name
+
+    def get_numaxes(self):
+        return len(self.axes)
+
+    def get_numbuttons(self):
+        return len(self.buttons)
+
+    def get_numhats(self):
+        return len(self.hats)
+
+    def get_axis(self, axis):
+        return self.axes[axis]
+
+    def get_button(self, button):
+        return self.buttons[button]
+
+    def get_hat(self, hat):
+        return self.hats[hat]
+
+    def set_output(self, output_index, value, events=None):
+        """Applies a value in JoystickNode output order; appends the matching pygame event to events."""
+        num_axes = len(self.axes)
+        num_inputs = num_axes + len(self.buttons)
+        if output_index < num_axes:
+            self.axes[output_index] = value
+            if events is not None:
+                events.append(SimpleNamespace(type=pygame.JOYAXISMOTION, instance_id=self.instance_id,
+                                              axis=output_index, value=value))
+        elif output_index < num_inputs:
+            button = output_index - num_axes
+            self.buttons[button] = int(value)
+            if events is not None:
+                events.append(SimpleNamespace(type=pygame.JOYBUTTONDOWN if value else pygame.JOYBUTTONUP,
+                                              instance_id=self.instance_id, button=button))
+        else:
+            hat, is_y = divmod(output_index - num_inputs, 2)
+            x, y = self.hats[hat]
+            self.hats[hat] = (x, int(value)) if is_y else (int(value), y)
+            if events is not None:
+                events.append(SimpleNamespace(type=pygame.JOYHATMOTION, instance_id=self.instance_id,
+                                              hat=hat, value=self.hats[hat]))
+
+
+class ReplayInputBackend:
+    """
+    Input backend that plays a recording instead of reading hardware.
+
+    speed scales the recorded timing (1.0 is real time); with speed 0 every
+    pump() applies the next batch of records that were read together, so a
+    replay runs as fast as the input service is ticked. impersonate is an
+    optional list of {'guid', 'name'} dicts that replace the identity of the
+    recorded devices in order, so a recording can drive a layout saved with
+    other hardware (see layout_joysticks()).
+    """
+    name = "replay"
+    PUMP_FROM_ANY_THREAD = True
+
+    def __init__(self, path, speed=0.0, impersonate=None):
+        self.recording = InputRecording(path)
+        self.speed = speed
+        self.joysticks = []
+        for index, device in enumerate(self.recording.devices):
+            identity = dict(device)
+            if impersonate and index < len(impersonate):
+                identity.update({key: value for key, value in impersonate[index].items()
+                                 if key in ("guid", "name") and value})
+            self.joysticks.append(ReplayJoystick(
+                index, identity["guid"], identity["name"],
+                device["num_axes"], device["num_buttons"], device["num_hats"]))
+        self.motion_events = False
+        self._events = []
+        self.rewind()
+
+    def rewind(self):
+        self.position = 0
+        self._started_ns = time.monotonic_ns()
+        self._first_ns = self.recording.record(0)[0] if len(self.recording) else 0
+
+    @property
+    def finished(self):
+        return self.position >= len(self.recording)
+
+    def start(self):
+        self.rewind()
+
+    def stop(self):
+        pass
+
+    def get_count(self):
+        return len(self.joysticks)
+
+    def open(self, device_index):
+        return self.joysticks[device_index]
+
+    def set_motion_events(self, enabled):
+        self.motion_events = enabled
+
+    def pump(self):
+        """Applies every record that is due."""
+        recording = self.recording
+        count = len(recording)
+        position = self.position
+        if position >= count:
+            return
+        if self.speed > 0:
+            limit_ns = self._first_ns + (time.monotonic_ns() - self._started_ns) * self.speed
+        else:
+            limit_ns = recording.record(position)[0]
+        events = self._events if self.motion_events else None
+        joysticks = self.joysticks
+        while position < count:
+            timestamp_ns, device_index, output_index, value = recording.record(position)
+            if timestamp_ns > limit_ns:
+                break
+            joysticks[device_index].set_output(output_index, value, events)
+            position += 1
+        self.position = position
+
+    def get_events(self, pump=True):
+        if pump:
+            self.pump()
+        events, self._events = self._events, []
+        return events
+
+
+def layout_joysticks(layout):
+    """Returns {'guid', 'name'} for the JoystickNodes of a layout dict, for ReplayInputBackend(impersonate=...)."""
+    return [{"guid": node.get("guid"), "name": node.get("name") or node.get("title")}
+            for node in layout.get("nodes", []) if node.get("type") == "JoystickNode"]
+
+
+def recording_inputs(recording, graph, ports, sample_rate_hz=1000.0):
+    """
+    Resamples a recording into the input array of engine.batch.evaluate_batch():
+    one row per 1/sample_rate_hz, one column per (source model, output index)
+    in ports, each holding the latest recorded value. As with impersonate,
+    the graph's joysticks take the recorded devices in order; other sources
+    (telemetry) stay at 0.
+    """
+    import numpy as np
+    from engine import JoystickModel
+    records = recording.as_array()
+    count = int(recording.duration_ns * sample_rate_hz / 1e9) + 1
+    inputs = np.zeros((count, len(ports)))
+    if not len(records):
+        return inputs
+    samples = ((records["timestamp_ns"] - records["timestamp_ns"][0]) * (sample_rate_hz / 1e9)).astype(np.intp)
+    joysticks = graph.nodes_of_type(JoystickModel)
+    for column, (model, output_index) in enumerate(ports):
+        if model not in joysticks:
+            continue
+        positions = np.flatnonzero((records["device"] == joysticks.index(model)) & (records["output"] == output_index))
+        if not len(positions):
+            continue
+        # Index of the latest record at or before each sample, -1 before the first
+        latest = np.full(count, -1, dtype=np.intp)
+        np.maximum.at(latest, samples[positions], positions)
+        latest = np.maximum.accumulate(latest)
+        inputs[:, column] = np.where(latest >= 0, records["value"][latest], 0.0)
+    return inputs
+
+
+def run_batch(layout_path, recording_path, sample_rate_hz=1000.0, save_path=None):
+    """
+    Evaluates a layout over a whole recording at once with engine.batch (needs
+    numpy) and summarizes the PPM trace of each channel; save_path writes the
+    traces to an .npz file with one array per channel ("ch1", "ch2", ...).
+    """
+    import numpy as np
+    from engine import Graph
+    from engine.batch import evaluate_batch, source_ports
+    with open(layout_path) as f:
+        graph = Graph.from_layout(json.load(f))
+    recording = InputRecording(recording_path)
+    ports = source_ports(graph)
+    inputs = recording_inputs(recording, graph, ports, sample_rate_hz)
+    recording.close()
+    start_ns = time.perf_counter_ns()
+    traces = evaluate_batch(graph, inputs, sample_rate_hz, ports)
+    elapsed_s = (time.perf_counter_ns() - start_ns) / 1e9
+    if save_path:
+        np.savez(save_path, **{f"ch{channel}": trace for channel, trace in traces.items()})
+    return {
+        "layout": layout_path,
+        "recording": recording_path,
+        "samples": len(inputs),
+        "sample_rate_hz": sample_rate_hz,
+        "elapsed_s": elapsed_s,
+        "channels": {channel: {"min": int(trace.min()), "max": int(trace.max()), "mean": float(trace.mean())}
+                     for channel, trace in sorted(traces.items())},
+    }
+
+
+def run_benchmark(layout_path, recording_path, realtime=False, port=None, evaluation="signals"):
+    """
+    Loads a layout into an offscreen PPMApp and drives it with a recording.
+
+    By default the recording is replayed as fast as possible by calling the
+    input service's tick() in a loop, which measures the graph's throughput.
+    With realtime the recording plays at its recorded pace through the normal
+    timers, and with a port (e.g. the emulator's) the input-to-write latency
+    of the serial path is reported as well. evaluation selects the scene's
+    evaluation mode ("signals", "tick" or "compiled").
+    """
+    with open(layout_path) as f:
+        layout = json.load(f)
+    backend = ReplayInputBackend(recording_path, speed=1.0 if realtime else 0.0,
+                                 impersonate=layout_joysticks(layout))
+    result = benchmark_backend(layout_path, backend, lambda: backend.finished, realtime, port, evaluation)
+    result["recording"] = recording_path
+    result["records"] = len(backend.recording)
+    result["records_per_s"] = len(backend.recording) / result["elapsed_s"] if result["elapsed_s"] else 0.0
+    return result
+
+
+def benchmark_backend(layout_path, backend, finished, realtime=False, port=None, evaluation="signals"):
+    """Runs a layout offscreen with the given input backend until finished() returns True (see run_benchmark)."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import tracemalloc
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from main import PPMApp
+
+    app = QApplication.instance() or QApplication([])
+    window = PPMApp(default_port=port, input_backend=backend, layout_path=layout_path)
+    tracemalloc.stop() # The memory profiler's allocation tracing would dominate the timings
+    service = window.input_service
+    serial_manager = window.serial_manager
+    scene = window.scene
+    scene.set_evaluation_mode(evaluation)
+    tick_mode = scene.evaluation_mode != scene.EVALUATION_SIGNALS
+    if not port:
+        serial_manager.disconnect()
+
+    backend.start() # Restart the input from the beginning
+    ticks = 0
+    start_ns = time.perf_counter_ns()
+    if realtime:
+        finished_timer = QTimer()
+        finished_timer.timeout.connect(lambda: finished() and app.quit())
+        finished_timer.start(50)
+        app.exec_()
+        finished_timer.stop()
+    else:
+        service.timer.stop()
+        while not finished():
+            service.tick()
+            if tick_mode:
+                scene.flush() # The event loop is not running to do it
+            ticks += 1
+    elapsed_s = (time.perf_counter_ns() - start_ns) / 1e9
+
+    result = {
+        "layout": layout_path,
+        "backend": backend.name,
+        "evaluation": scene.evaluation_mode,
+        "elapsed_s": elapsed_s,
+        "channel_values": list(serial_manager.channel_values),
+    }
+    if ticks:
+        result["ticks"] = ticks
+        result["tick_us_mean"] = elapsed_s * 1e6 / ticks
+    if scene.evaluation_mode == scene.EVALUATION_TICK:
+        result["evaluations"] = scene.evaluator.evaluations
+    if port:
+        result["latency"] = serial_manager.latency.summary().get("all")
+        result["frames"] = serial_manager.stats.frames
+    service.stop()
+    serial_manager.disconnect()
+    window.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay an input recording through a layout and time it")
+    parser.add_argument("layouts", nargs="+", help="layout files, e.g. layout_presets/*.json")
+    parser.add_argument("recording", help="input recording made with main.py --record")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded pace instead of flat out")
+    parser.add_argument("--emulator", action="store_true",
+                        help="transmit to the built-in USB2PPM adapter emulator and report latency (Linux only)")
+    parser.add_argument("--batch", action="store_true",
+                        help="evaluate the whole recording at once with NumPy instead of replaying it through the app")
+    parser.add_argument("--sample-rate", type=float, default=1000.0, help="samples per second for --batch")
+    parser.add_argument("--save", metavar="FILE", help="with --batch, save the PPM traces to FILE (.npz)")
+    parser.add_argument("--evaluation", nargs="+", choices=("signals", "tick", "compiled"), default=["signals"],
+                        help="evaluate the graph through Qt signals, once per tick in topological order or as "
+                             "compiled code; several modes are run one after the other for comparison")
+    args = parser.parse_args()
+
+    emulator = None
+    port = None
+    if args.emulator and not args.batch:
+        from serial_manager import SerialManager
+        from usb2ppm_emulator import USB2PPMEmulator
+        emulator = USB2PPMEmulator(channel_count=SerialManager.MAX_CHANNEL_COUNT)
+        port = emulator.start()
+
+    for layout_path in args.layouts:
+        if args.batch:
+            save_path = args.save
+            if save_path and len(args.layouts) > 1: # One file per layout
+                save_path = f"{os.path.splitext(save_path)[0]}_{os.path.splitext(os.path.basename(layout_path))[0]}.npz"
+            print(json.dumps(run_batch(layout_path, args.recording, args.sample_rate, save_path), indent=4))
+            continue
+        for evaluation in args.evaluation:
+            result = run_benchmark(layout_path, args.recording, realtime=args.realtime, port=port,
+                                   evaluation=evaluation)
+            print(json.dumps(result, indent=4))
+    if emulator:
+        emulator.stop()
@@ -0,0 +1,538 @@
+# input_service.py
+import time
+from array import array
+import pygame
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+import latency
+from transmit_thread import ChannelDoubleBuffer, TransmitThread
+from virtual_joystick import VirtualInputBackend
+try:
+    from evdev_input import EvdevInputBackend
+except ImportError: # fcntl/epoll only exist on Linux
+    EvdevInputBackend = None
+
+# Raised by a backend's devices when they are unplugged mid-read
+INPUT_ERRORS = (pygame.error, OSError)
+
+
+class PygameInputBackend:
+    """Joysticks through pygame/SDL. The device objects are pygame.joystick.Joystick."""
+    name = "pygame"
+    # SDL only allows event pumping on the thread that initialised it
+    PUMP_FROM_ANY_THREAD = False
+    MOTION_EVENT_TYPES = (pygame.JOYAXISMOTION, pygame.JOYBALLMOTION, pygame.JOYHATMOTION,
+                          pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP)
+
+    def start(self):
+        pygame.init()
+        pygame.joystick.init()
+
+    def stop(self):
+        pass
+
+    def get_count(self):
+        return pygame.joystick.get_count()
+
+    def open(self, device_index):
+        joystick = pygame.joystick.Joystick(device_index)
+        joystick.init()
+        return joystick
+
+    def set_motion_events(self, enabled):
+        if enabled:
+            pygame.event.set_allowed(list(self.MOTION_EVENT_TYPES))
+        else:
+            # Only hotplug events are needed while polling; keep SDL from queueing the rest
+            pygame.event.set_blocked(list(self.MOTION_EVENT_TYPES))
+
+    def pump(self):
+        pygame.event.pump()
+
+    def get_events(self, pump=True):
+        return pygame.event.get(pump=pump)
+
+
+INPUT_BACKENDS = {PygameInputBackend.name: PygameInputBackend,
+                  VirtualInputBackend.name: VirtualInputBackend}
+if EvdevInputBackend:
+    INPUT_BACKENDS[EvdevInputBackend.name] = EvdevInputBackend
+
+
+def create_input_backend(name):
+    """Creates an input backend by its registered name (see INPUT_BACKENDS)."""
+    try:
+        return INPUT_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown input backend: {name}") from None
+
+
+class InputDevice:
+    """
+    One open joystick and the JoystickNodes bound to it.
+
+    Changes are reported as (output_index, value) pairs in the output layout
+    of JoystickNode: axes, then buttons, then the x/y pair of every hat.
+    Axes are kept in an array('f') that is compared with the fresh reading
+    in one go, so an idle stick costs a single comparison; buttons are
+    packed into an integer bitmask and diffed with XOR, so only the buttons
+    that actually changed are visited.
+
+    Every axis has a noise gate: a change smaller than its threshold from the
+    last emitted value is dropped, and reversing direction needs threshold +
+    hysteresis, so one-LSB jitter around a resting position emits nothing.
+    The end stops (-1/+1) always pass. axis_emissions counts emitted changes.
+
+    In "thread" acquisition mode, sample() runs on the acquisition thread and
+    publishes every input into a preallocated double-buffered float32
+    snapshot (axes, hats, then the button mask in exact 16-bit words);
+    read_snapshot() diffs the latest snapshot on the GUI thread.
+    """
+    BUTTON_WORD_BITS = 16
+
+    def __init__(self, joystick):
+        self.joystick = joystick
+        self.instance_id = joystick.get_instance_id()
+        self.guid = joystick.get_guid()
+        self.num_axes = joystick.get_numaxes()
+        self.num_buttons = joystick.get_numbuttons()
+        self.num_hats = joystick.get_numhats()
+        self.nodes = []
+
+        self.axes = array('f', [0.0] * self.num_axes) # Last emitted values
+        self.axis_threshold = array('f', [0.0] * self.num_axes)
+        self.axis_hysteresis = array('f', [0.0] * self.num_axes)
+        self.axis_emissions = array('L', [0] * self.num_axes)
+        self._axis_direction = array('b', [0] * self.num_axes)
+        self._previous_emissions = array('L', self.axis_emissions)
+        self.button_mask = 0
+        self.hats = [(0, 0)] * self.num_hats
+        self._axes_read = array('f', self.axes)
+
+        self._button_words = (self.num_buttons + self.BUTTON_WORD_BITS - 1) // self.BUTTON_WORD_BITS
+        snapshot_size = self.num_axes + self.num_hats * 2 + self._button_words
+        self.snapshot = ChannelDoubleBuffer([0.0] * snapshot_size, 'f')
+        self.sampled_ns = 0
+        self._sample = array('f', [0.0] * snapshot_size)
+        self._latest = array('f', self._sample)
+
+    def state(self):
+        """Returns (output_index, value) for every output, e.g. to bring a newly bound node up to date."""
+        pairs = list(enumerate(self.axes))
+        mask = self.button_mask
+        base = self.num_axes
+        pairs += [(base + i, float(mask >> i & 1)) for i in range(self.num_buttons)]
+        base += self.num_buttons
+        for i, (x, y) in enumerate(self.hats):
+            pairs += [(base + i * 2, float(x)), (base + i * 2 + 1, float(y))]
+        return pairs
+
+    def set_filters(self, filters):
+        """Sets [(threshold, hysteresis), ...] per axis; missing axes get no filtering."""
+        for axis in range(self.num_axes):
+            threshold, hysteresis = filters[axis] if axis < len(filters) else (0.0, 0.0)
+            self.axis_threshold[axis] = threshold
+            self.axis_hysteresis[axis] = hysteresis
+
+    def update_axes(self, axes_read, changes):
+        axes = self.axes
+        if axes_read == axes:
+            return
+        for i, value in enumerate(axes_read):
+            if value != axes[i]:
+                self._gate_axis(i, value, changes)
+
+    def set_axis(self, axis, value, changes):
+        axes_read = self._axes_read
+        axes_read[axis] = value # Rounds to float32 like a polled reading
+        if axes_read[axis] != self.axes[axis]:
+            self._gate_axis(axis, axes_read[axis], changes)
+
+    def _gate_axis(self, axis, value, changes):
+        delta = value - self.axes[axis]
+        direction = 1 if delta > 0 else -1
+        needed = self.axis_threshold[axis]
+        if direction != self._axis_direction[axis]:
+            needed += self.axis_hysteresis[axis]
+        if abs(delta) < needed and -1.0 < value < 1.0:
+            return
+        self.axes[axis] = value
+        self._axis_direction[axis] = direction
+        self.axis_emissions[axis] += 1
+        changes.append((axis, value))
+
+    def take_emission_counts(self):
+        """Returns the emitted changes per axis since the previous call."""
+        counts = [now - before for now, before in zip(self.axis_emissions, self._previous_emissions)]
+        self._previous_emissions[:] = self.axis_emissions
+        return counts
+
+    def update_buttons(self, mask, changes):
+        diff = mask ^ self.button_mask
+        if not diff:
+            return
+        self.button_mask = mask
+        base = self.num_axes
+        while diff:
+            bit = diff & -diff
+            changes.append((base + bit.bit_length() - 1, 1.0 if mask & bit else 0.0))
+            diff ^= bit
+
+    def set_button(self, button, pressed, changes):
+        bit = 1 << button
+        self.update_buttons(self.button_mask | bit if pressed else self.button_mask & ~bit, changes)
+
+    def set_hat(self, hat, x, y, changes):
+        previous_x, previous_y = self.hats[hat]
+        if x == previous_x and y == previous_y:
+            return
+        self.hats[hat] = (x, y)
+        index = self.num_axes + self.num_buttons + hat * 2
+        if x != previous_x:
+            changes.append((index, float(x)))
+        if y != previous_y:
+            changes.append((index + 1, float(y)))
+
+    def _read_buttons(self):
+        get_button = self.joystick.get_button
+        mask = 0
+        for i in range(self.num_buttons):
+            if get_button(i):
+                mask |= 1 << i
+        return mask
+
+    def poll(self, changes):
+        """Reads every input once and appends (output_index, value) for each one that changed."""
+        joystick = self.joystick
+        axes_read = self._axes_read
+        for i in range(self.num_axes):
+            axes_read[i] = joystick.get_axis(i)
+        self.update_axes(axes_read, changes)
+        self.update_buttons(self._read_buttons(), changes)
+        for i in range(self.num_hats):
+            x, y = joystick.get_hat(i)
+            self.set_hat(i, x, y, changes)
+
+    def sample(self):
+        joystick = self.joystick
+        sample = self._sample
+        for i in range(self.num_axes):
+            sample[i] = joystick.get_axis(i)
+        index = self.num_axes
+        for i in range(self.num_hats):
+            sample[index], sample[index + 1] = joystick.get_hat(i)
+            index += 2
+        mask = self._read_buttons()
+        for word in range(self._button_words):
+            sample[index + word] = mask >> (word * self.BUTTON_WORD_BITS) & 0xFFFF
+        self.snapshot.publish(sample)
+        self.sampled_ns = time.monotonic_ns()
+
+    def read_snapshot(self, changes):
+        """Appends (output_index, value) for every input that changed in the latest snapshot."""
+        latest = self._latest
+        self.snapshot.read_with(lambda values: latest.__setitem__(slice(None), values))
+        num_axes = self.num_axes
+        self.update_axes(latest[:num_axes], changes)
+        base = num_axes + self.num_hats * 2
+        mask = 0
+        for word in range(self._button_words):
+            mask |= int(latest[base + word]) << (word * self.BUTTON_WORD_BITS)
+        self.update_buttons(mask, changes)
+        for i in range(self.num_hats):
+            self.set_hat(i, int(latest[num_axes + i * 2]), int(latest[num_axes + i * 2 + 1]), changes)
+
+
+class JoystickInputService(QObject):
+    """
+    Reads all joysticks for the whole graph.
+
+    Once per tick the backend is pumped a single time and its events are dispatched;
+    hotplug is handled here in both modes. In "poll" mode every open device is
+    then read once. In "events" mode only the JOYAXISMOTION, JOYBUTTON* and
+    JOYHATMOTION events are routed by instance_id, so the work follows the
+    actual changes; the tick interval is the coalescing window in which
+    several motion events of the same axis collapse into the latest value.
+
+    In "thread" mode a background InputAcquisition thread samples every
+    device at acquisition_rate_hz into its snapshot, independent of GUI load;
+    the tick only diffs the latest snapshots and still handles hotplug.
+    Backends with PUMP_FROM_ANY_THREAD (evdev, virtual) are pumped by the
+    acquisition thread as well. pygame/SDL must be pumped on the GUI thread,
+    so with it the samples are only as fresh as the last tick's pump; use
+    the evdev backend to get the full acquisition rate.
+
+    In every mode, a device's changes are fanned out to all JoystickNodes bound
+    to it (several nodes may show the same device), so the per-tick cost does
+    not grow with the number of nodes.
+
+    Devices come from a backend (see INPUT_BACKENDS): pygame/SDL by default,
+    or "evdev" to read /dev/input directly without initialising pygame.
+    JoystickNodes open their devices through open().
+    """
+    device_added = pyqtSignal(int) # device index
+    device_removed = pyqtSignal(int) # instance id
+    input_stats_updated = pyqtSignal(object) # [{name, guid, emissions_per_s}], once per second
+
+    INPUT_MODES = ("poll", "events", "thread")
+    DEFAULT_INTERVAL_MS = 20
+    DEFAULT_COALESCE_MS = 4
+    DEFAULT_ACQUISITION_RATE_HZ = 500
+    MAX_ACQUISITION_RATE_HZ = 1000
+
+    def __init__(self, parent=None, backend=None):
+        super().__init__(parent)
+        self.backend = backend or PygameInputBackend()
+        self.backend.start()
+        self.devices = {} # instance_id -> InputDevice
+        self.nodes = [] # Every registered JoystickNode, connected or not
+        self._changes = []
+        self._pending_axes = {} # (instance_id, axis) -> latest value within the window
+        self.mode = "poll"
+        self.poll_interval_ms = self.DEFAULT_INTERVAL_MS
+        self.coalesce_ms = self.DEFAULT_COALESCE_MS
+        self.acquisition_rate_hz = self.DEFAULT_ACQUISITION_RATE_HZ
+        self.acquisition_thread = None
+        self._sampled_devices = () # Replaced, never mutated, so the thread can iterate it
+        # Per-axis noise gate settings by device GUID: [[threshold, hysteresis], ...]
+        self.axis_filters = {}
+        self.recorder = None # InputRecorder while recording (see input_recording.py)
+        self.backend.set_motion_events(False)
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(self.poll_interval_ms)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start()
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self._report_stats)
+        self.stats_timer.start()
+        self._last_stats_ns = time.monotonic_ns()
+
+    def set_mode(self, mode):
+        if mode not in self.INPUT_MODES:
+            print(f"Unknown input mode: {mode}")
+            return
+        self._stop_acquisition() # Before polling, the thread must not sample the devices meanwhile
+        self.mode = mode
+        if mode == "thread":
+            self.backend.set_motion_events(False)
+            self.timer.setInterval(self.poll_interval_ms)
+        elif mode == "events":
+            self.backend.set_motion_events(True)
+            self.timer.setInterval(self.coalesce_ms)
+        else:
+            self.backend.set_motion_events(False)
+            self.timer.setInterval(self.poll_interval_ms)
+        # Events queued before the switch may describe a stale state
+        for device in list(self.devices.values()):
+            self._changes.clear()
+            device.poll(self._changes)
+            self._fan_out(device, self._changes, time.monotonic_ns())
+        if mode == "thread":
+            self._start_acquisition()
+        print(f"Input mode set to '{mode}'.")
+
+    def set_acquisition_rate(self, rate_hz):
+        self.acquisition_rate_hz = max(1, min(self.MAX_ACQUISITION_RATE_HZ, int(rate_hz)))
+        if self.acquisition_thread:
+            self.acquisition_thread.period_ns = 1_000_000_000 // self.acquisition_rate_hz
+
+    def _start_acquisition(self):
+        self.acquisition_thread = TransmitThread(self._acquire, 1000 / self.acquisition_rate_hz,
+                                                 name="InputAcquisition")
+        self.acquisition_thread.start()
+
+    def _stop_acquisition(self):
+        if self.acquisition_thread:
+            self.acquisition_thread.stop()
+            self.acquisition_thread = None
+
+    def stop(self):
+        self.timer.stop()
+        self.stats_timer.stop()
+        self._stop_acquisition()
+        self.stop_recording()
+        self.backend.stop()
+
+    def start_recording(self, path):
+        """Records every change fanned out to the nodes into path, starting with the current state."""
+        from input_recording import InputRecorder
+        self.stop_recording()
+        self.recorder = InputRecorder(path)
+        for device in self.devices.values():
+            self.recorder.add_device(device)
+        print(f"Recording input to {path}")
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def get_count(self):
+        return self.backend.get_count()
+
+    def open(self, device_index):
+        """Opens the backend's device at device_index (a pygame.joystick.Joystick-like object)."""
+        return self.backend.open(device_index)
+
+    def _acquire(self):
+        """Acquisition thread tick: samples every device, pumping the backend first where that is allowed."""
+        if self.backend.PUMP_FROM_ANY_THREAD:
+            self.backend.pump()
+        for device in self._sampled_devices:
+            try:
+                device.sample()
+            except INPUT_ERRORS:
+                pass # Unplugged; the GUI thread handles the removal event
+
+    def set_axis_filters(self, guid, filters):
+        """Sets the noise gate [[threshold, hysteresis], ...] for every axis of the devices with this GUID."""
+        self.axis_filters[guid] = [[float(threshold), float(hysteresis)] for threshold, hysteresis in filters]
+        for device in self.devices.values():
+            if device.guid == guid:
+                device.set_filters(self.axis_filters[guid])
+
+    def load_axis_filters(self, axis_filters):
+        self.axis_filters = {}
+        for guid, filters in axis_filters.items():
+            self.set_axis_filters(guid, filters)
+        for device in self.devices.values():
+            device.set_filters(self.axis_filters.get(device.guid, []))
+
+    def _report_stats(self):
+        now = time.monotonic_ns()
+        elapsed_s = max(1e-9, (now - self._last_stats_ns) / 1e9)
+        self._last_stats_ns = now
+        self.input_stats_updated.emit([{
+            "name": device.joystick.get_name(),
+            "guid": device.guid,
+            "emissions_per_s": [count / elapsed_s for count in device.take_emission_counts()],
+        } for device in self.devices.values()])
+
+    def set_coalesce_window(self, window_ms):
+        self.coalesce_ms = max(1, int(window_ms))
+        if self.mode == "events":
+            self.timer.setInterval(self.coalesce_ms)
+
+    def register(self, node):
+        self.nodes.append(node)
+        if node.is_connected:
+            self._bind(node)
+
+    def unregister(self, node):
+        if node in self.nodes:
+            self.nodes.remove(node)
+        self._unbind(node)
+
+    def _bind(self, node):
+        device = self.devices.get(node.instance_id)
+        if device is None:
+            device = self.devices[node.instance_id] = InputDevice(node.joystick)
+            device.set_filters(self.axis_filters.get(device.guid, []))
+            device.poll([])
+            device.sample()
+            self._sampled_devices = tuple(self.devices.values())
+            if self.recorder:
+                self.recorder.add_device(device)
+        if node not in device.nodes:
+            device.nodes.append(node)
+            # Bring the node up to the device state the other nodes already have
+            node.apply_changes(device.state())
+
+    def _unbind(self, node):
+        device = self.devices.get(node.instance_id)
+        if device and node in device.nodes:
+            device.nodes.remove(node)
+            if not device.nodes:
+                del self.devices[node.instance_id]
+                self._sampled_devices = tuple(self.devices.values())
+
+    def tick(self):
+        threaded = self.acquisition_thread is not None
+        if not (threaded and self.backend.PUMP_FROM_ANY_THREAD):
+            self.backend.pump() # Otherwise the acquisition thread pumps
+        read_ns = time.monotonic_ns()
+        pending = self._pending_axes
+        changes = self._changes
+        for event in self.backend.get_events(pump=False):
+            event_type = event.type
+            if event_type == pygame.JOYAXISMOTION:
+                pending[(event.instance_id, event.axis)] = event.value
+            elif event_type == pygame.JOYBUTTONDOWN or event_type == pygame.JOYBUTTONUP:
+                # Buttons are not coalesced, a short press must not get lost
+                device = self.devices.get(event.instance_id)
+                if device:
+                    changes.clear()
+                    device.set_button(event.button, event_type == pygame.JOYBUTTONDOWN, changes)
+                    self._fan_out(device, changes, read_ns)
+            elif event_type == pygame.JOYHATMOTION:
+                device = self.devices.get(event.instance_id)
+                if device:
+                    changes.clear()
+                    device.set_hat(event.hat, event.value[0], event.value[1], changes)
+                    self._fan_out(device, changes, read_ns)
+            elif event_type == pygame.JOYDEVICEADDED:
+                self._on_device_added(event.device_index)
+            elif event_type == pygame.JOYDEVICEREMOVED:
+                self._on_device_removed(event.instance_id)
+
+        if pending:
+            by_device = {}
+            for (instance_id, axis), value in pending.items():
+                device = self.devices.get(instance_id)
+                if device:
+                    device.set_axis(axis, value, by_device.setdefault(device, []))
+            pending.clear()
+            for device, device_changes in by_device.items():
+                self._fan_out(device, device_changes, read_ns)
+
+        if self.mode == "poll":
+            for device in self.devices.values():
+                changes.clear()
+                device.poll(changes)
+                self._fan_out(device, changes, read_ns)
+        elif threaded:
+            for device in self._sampled_devices:
+                changes.clear()
+                device.read_snapshot(changes)
+                self._fan_out(device, changes, device.sampled_ns)
+
+    def _fan_out(self, device, changes, read_ns):
+        if changes:
+            if self.recorder:
+                self.recorder.record(device, changes, read_ns)
+            latency.begin_source(read_ns)
+            for node in device.nodes:
+                node.apply_changes(changes)
+            latency.end_source()
+
+    def _on_device_added(self, device_index):
+        joystick = self.backend.open(device_index)
+        guid = joystick.get_guid()
+
+        # Reconnect the first disconnected node for this GUID together with every
+        # other node that was showing the same device
+        previous_instance_id = None
+        for node in self.nodes:
+            if node.is_connected or node.guid != guid:
+                continue
+            if previous_instance_id is None:
+                previous_instance_id = node.instance_id
+            elif node.instance_id != previous_instance_id:
+                continue
+            node.reconnect(device_index)
+            self._bind(node)
+        if previous_instance_id is None:
+            print(f"New, unassigned joystick added: {joystick.get_name()}")
+        self.device_added.emit(device_index)
+
+    def _on_device_removed(self, instance_id):
+        device = self.devices.pop(instance_id, None)
+        self._sampled_devices = tuple(self.devices.values())
+        if device:
+            for node in device.nodes:
+                node.disconnect()
+                print(f"Disconnected '{node.name}'")
+        self.device_removed.emit(instance_id)
@@ -0,0 +1,91 @@
+# latency.py
+"""
+Input-to-wire latency instrumentation.
+
+Source nodes open a "source context" with the time their input was read
+before emitting. The signal cascade is synchronous, so every node reached
+from that emission (and finally PPMChannelNode.set_value) can pick up the
+same origin timestamp via current_origin(). SerialManager stores it per
+channel and records the latency once the frame carrying the value has
+left ser.write().
+"""
+import time
+from array import array
+
+_origin_ns = 0
+
+
+def begin_source(timestamp_ns=None):
+    """Marks the start of an emission cascade for an input read at timestamp_ns."""
+    global _origin_ns
+    _origin_ns = timestamp_ns if timestamp_ns is not None else time.monotonic_ns()
+
+
+def end_source():
+    global _origin_ns
+    _origin_ns = 0
+
+
+def current_origin():
+    """Returns the origin timestamp of the cascade in progress, or 0 outside of one."""
+    return _origin_ns
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent WINDOW latency samples per channel in preallocated
+    ring buffers. Recording is a couple of array stores, so it can run on the
+    transmit path; percentiles are only computed when a summary is requested.
+    """
+    WINDOW = 512
+
+    def __init__(self, channel_count):
+        self.resize(channel_count)
+
+    def resize(self, channel_count):
+        self._samples = [array('q', [0] * self.WINDOW) for _ in range(channel_count)]
+        self._counts = [0] * channel_count
+
+    def record(self, channel, latency_ns):
+        index = channel - 1
+        if 0 <= index < len(self._samples):
+            count = self._counts[index]
+            self._samples[index][count % self.WINDOW] = latency_ns
+            self._counts[index] = count + 1
+
+    def clear(self):
+        self._counts = [0] * len(self._samples)
+
+    @staticmethod
+    def _percentiles(samples):
+        samples = sorted(samples)
+        last = len(samples) - 1
+        return {
+            "samples": len(samples),
+            "p50_ms": samples[int(last * 0.50)] / 1e6,
+            "p95_ms": samples[int(last * 0.95)] / 1e6,
+            "p99_ms": samples[int(last * 0.99)] / 1e6,
+            "max_ms": samples[last] / 1e6,
+        }
+
+    def channel_summary(self, channel):
+        """Returns p50/p95/p99/max for one channel, or None without samples."""
+        index = channel - 1
+        count = min(self._counts[index], self.WINDOW)
+        if not count:
+            return None
+        return self._percentiles(self._samples[index][:count])
+
+    def summary(self):
+        """Returns {'all': stats, 'channels': {channel: stats}} over the current windows."""
+        channels = {}
+        combined = []
+        for channel in range(1, len(self._samples) + 1):
+            stats = self.channel_summary(channel)
+            if stats:
+                channels[channel] = stats
+                combined.extend(self._samples[channel - 1][:min(self._counts[channel - 1], self.WINDOW)])
+        return {
+            "all": self._percentiles(combined) if combined else None,
+            "channels": channels,
+        }
@@ -1,22 +1,27 @@
 import sys
 import json
-import pygame
+import argparse
 import tracemalloc
 from functools import partial
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QDockWidget, QTextEdit, QGraphicsView, QGraphicsScene,
                              QToolBar, QAction, QStatusBar, QDialog, QListWidget,
                              QPushButton, QHBoxLayout, QLabel, QCheckBox,
-                             QGraphicsPathItem, QMenu, QToolButton)
+                             QGraphicsPathItem, QMenu, QToolButton, QComboBox,
+                             QSpinBox, QInputDialog, QDoubleSpinBox, QGridLayout)
 from PyQt5.QtCore import Qt, QTimer, QPointF
 from PyQt5.QtGui import (QBrush, QColor, QPainterPath, QPainter,
                          QPen, QIcon)
 from serial_manager import SerialManager
+from input_service import JoystickInputService, INPUT_BACKENDS, INPUT_ERRORS, create_input_backend
+from frame_encoders import FRAME_ENCODERS
 from nodes import (BaseNode, PPMChannelNode, JoystickNode, CustomLogicNode,
                    BoostControlNode, ToggleNode, ThreePositionSwitchNode,
                    ChannelConfigNode, MixerNode, AxisToButtonsNode, SwitchGateNode,
-                   PedalControlNode)
+                   PedalControlNode, TelemetryNode)
 from connections import Connection
+from engine import Graph, Evaluator, CompiledGraph, CustomLogicModel
+import latency
 
 class MemoryProfiler:
     def __init__(self, interval_ms=30000):
@@ -61,6 +66,57 @@ class PortSelectionDialog(QDialog):
             self.selected_port = selected_items[0].text()
         super().accept()
 
+class AxisFilterDialog(QDialog):
+    """Edits the per-axis noise threshold and hysteresis of the connected joysticks."""
+    def __init__(self, input_service):
+        super().__init__()
+        self.setWindowTitle("Input Filters")
+        self.input_service = input_service
+        self.devices = {device.guid: device for device in input_service.devices.values()}
+        layout = QVBoxLayout(self)
+        self.device_combo = QComboBox()
+        for guid, device in self.devices.items():
+            self.device_combo.addItem(device.joystick.get_name(), guid)
+        self.device_combo.currentIndexChanged.connect(self._show_device)
+        layout.addWidget(self.device_combo)
+        self.grid = QGridLayout()
+        layout.addLayout(self.grid)
+        apply_button = QPushButton("Apply")
+        apply_button.clicked.connect(self._apply)
+        layout.addWidget(apply_button)
+        self.spinboxes = []
+        self._show_device()
+
+    def _show_device(self):
+        while self.grid.count():
+            self.grid.takeAt(0).widget().deleteLater()
+        self.spinboxes = []
+        guid = self.device_combo.currentData()
+        if guid is None:
+            self.grid.addWidget(QLabel("No joystick connected."), 0, 0)
+            return
+        filters = self.input_service.axis_filters.get(guid, [])
+        self.grid.addWidget(QLabel("Threshold"), 0, 1)
+        self.grid.addWidget(QLabel("Hysteresis"), 0, 2)
+        for axis in range(self.devices[guid].num_axes):
+            self.grid.addWidget(QLabel(f"Axis {axis}:"), axis + 1, 0)
+            row = []
+            for column, value in enumerate(filters[axis] if axis < len(filters) else (0.0, 0.0)):
+                spinbox = QDoubleSpinBox()
+                spinbox.setRange(0.0, 0.2)
+                spinbox.setDecimals(3)
+                spinbox.setSingleStep(0.001)
+                spinbox.setValue(value)
+                self.grid.addWidget(spinbox, axis + 1, column + 1)
+                row.append(spinbox)
+            self.spinboxes.append(row)
+
+    def _apply(self):
+        guid = self.device_combo.currentData()
+        if guid is not None:
+            self.input_service.set_axis_filters(
+                guid, [(threshold.value(), hysteresis.value()) for threshold, hysteresis in self.spinboxes])
+
 class ConnectionView(QGraphicsView):
     def __init__(self, scene, parent=None):
         super().__init__(scene, parent)
@@ -99,8 +155,33 @@ class ConnectionView(QGraphicsView):
         super().mouseReleaseEvent(event)
 
 class PPMScene(QGraphicsScene):
+    """
+    The node editor. Every node's model is mirrored into `graph`, which
+    rejects connections that would form a cycle. In the "signals" evaluation
+    mode values travel through the nodes' Qt signals as soon as they are
+    emitted; in "tick" mode emitted outputs are queued and `evaluator`
+    evaluates the affected nodes once each, in topological order, when
+    control returns to the event loop (i.e. once per input tick). "compiled"
+    mode runs the graph compiled to one Python function instead (see
+    engine/compiler.py); it is compiled again after any edit (node views
+    report parameter edits through BaseNode.params_changed()), and only the
+    views of the nodes it changed are refreshed.
+    """
+    EVALUATION_SIGNALS = "signals"
+    EVALUATION_TICK = "tick"
+    EVALUATION_COMPILED = "compiled"
+    EVALUATION_MODES = (EVALUATION_SIGNALS, EVALUATION_TICK, EVALUATION_COMPILED)
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.graph = Graph()
+        self.evaluator = Evaluator(self.graph, mode=Evaluator.MODE_TICK)
+        self.evaluation_mode = self.EVALUATION_SIGNALS
+        self.views = {} # model -> node
+        self.compiled = None # CompiledGraph of the current graph in compiled mode
+        self._changed_outputs = set() # (source model, output index) set since the last flush, compiled mode
+        self._flush_scheduled = False
+        self._flush_origin = 0
         self.setSceneRect(0, 0, 4000, 4000)
         self.setBackgroundBrush(QBrush(QColor("#323232")))
         self.temp_connection_line = None
@@ -116,6 +197,80 @@ class PPMScene(QGraphicsScene):
         self.update_timer.timeout.connect(self.update_all_connections)
         self.update_timer.start()
 
+    def addItem(self, item):
+        super().addItem(item)
+        if isinstance(item, BaseNode):
+            self.graph.add_node(item.model)
+            self.views[item.model] = item
+
+    def removeItem(self, item):
+        if isinstance(item, BaseNode):
+            self.graph.remove_node(item.model)
+            self.views.pop(item.model, None)
+        super().removeItem(item)
+
+    def set_evaluation_mode(self, mode):
+        if mode not in self.EVALUATION_MODES:
+            print(f"Unknown evaluation mode '{mode}'")
+            return
+        if self.evaluation_mode != self.EVALUATION_SIGNALS:
+            self.flush()
+        self.compiled = None
+        self.evaluation_mode = mode
+        print(f"Evaluation mode set to {mode}")
+
+    def queue_changes(self, model, changes):
+        """Tick/compiled mode: applies a source's (output_index, value) changes; the scene evaluates them on flush()."""
+        if self.evaluation_mode == self.EVALUATION_COMPILED:
+            changed = self._changed_outputs
+            for output_index, value in changes:
+                key = (model, output_index)
+                if key in changed:
+                    self.flush() # Evaluate the earlier value first, e.g. a short button press
+                changed.add(key)
+                model.set_output(output_index, value)
+            self._schedule_flush()
+            return
+        self._schedule_flush()
+        self.evaluator.apply_changes(model, changes)
+
+    def queue_outputs(self, model, output_indices):
+        """Tick/compiled mode: passes on the current value of the given outputs of a node on flush()."""
+        self._schedule_flush()
+        if self.evaluation_mode == self.EVALUATION_COMPILED:
+            return
+        self.evaluator.set_outputs(model, output_indices)
+
+    def _schedule_flush(self):
+        if not self._flush_origin:
+            # The oldest input of the tick counts for the latency of its channels
+            self._flush_origin = latency.current_origin()
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        """Evaluates everything queued since the last flush and refreshes the nodes that changed."""
+        self._flush_scheduled = False
+        origin = self._flush_origin
+        self._flush_origin = 0
+        if origin:
+            latency.begin_source(origin)
+        views = self.views
+        if self.evaluation_mode == self.EVALUATION_COMPILED:
+            self._changed_outputs.clear()
+            if self.compiled is None or self.compiled.is_stale():
+                self.compiled = CompiledGraph(self.graph)
+            changed = self.compiled.run()
+        else:
+            changed = self.evaluator.flush()
+        for model in changed:
+            view = views.get(model)
+            if view is not None:
+                view.refresh()
+        if origin:
+            latency.end_source()
+
     def update_all_connections(self):
         for conn in self.connections:
             conn.update_path()
@@ -131,6 +286,8 @@ class PPMScene(QGraphicsScene):
         start_node.remove_connection(conn)
         end_node.remove_connection(conn)
         end_node.set_input_occupied(conn.end_index, False)
+        if getattr(conn, 'edge', None) is not None:
+            self.graph.disconnect(conn.edge)
         if hasattr(conn, 'slot') and conn.slot is not None:
             try:
                 start_node.output_signals[conn.start_index].output_signal.disconnect(conn.slot)
@@ -204,7 +361,14 @@ class PPMScene(QGraphicsScene):
             print(f"Warning: Skipping connection to '{end_node.title}'. Input index {end_index} is out of range (node has {num_inputs} inputs).")
             return
 
+        try:
+            edge = self.graph.connect(start_node.model, start_index, end_node.model, end_index)
+        except ValueError as e:
+            print(f"Warning: Skipping connection from '{start_node.title}' to '{end_node.title}': {e}")
+            return
+
         new_connection = Connection(start_node, start_index, end_node, end_index)
+        new_connection.edge = edge
         self.addItem(new_connection)
         self.connections.append(new_connection)
         end_node.set_input_occupied(end_index, True)
@@ -233,15 +397,21 @@ class PPMScene(QGraphicsScene):
             super().keyPressEvent(event)
 
 class PPMApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, default_port=None, input_backend="pygame", layout_path="layout.json"):
         super().__init__()
+        self.default_port = default_port
+        self.layout_path = layout_path
         self.profiler = MemoryProfiler()
         self.setWindowTitle("QtPye-PPM-Controller")
         self.setGeometry(100, 100, 1200, 800)
 
-        pygame.init()
-        pygame.joystick.init()
-        print(f"Detected {pygame.joystick.get_count()} joysticks.")
+        # Reads every joystick once per tick and handles hotplug for all Joystick nodes
+        # input_backend is a registered backend name or a ready backend, e.g. a ReplayInputBackend
+        if isinstance(input_backend, str):
+            input_backend = create_input_backend(input_backend)
+        self.input_service = JoystickInputService(self, input_backend)
+        print(f"Detected {self.input_service.get_count()} joysticks ({input_backend.name}).")
+        self.input_service.device_added.connect(lambda device_index: self._rebuild_joystick_menu())
 
         self.serial_manager = SerialManager()
         self.serial_manager.connection_status_changed.connect(self.update_status)
@@ -253,10 +423,7 @@ class PPMApp(QMainWindow):
         self.setCentralWidget(self.view)
 
         self.ppm_nodes = []
-        for i in range(8):
-            node = PPMChannelNode(i + 1, 800, 50 + i * 150, serial_manager=self.serial_manager)
-            self.ppm_nodes.append(node)
-            self.scene.addItem(node)
+        self.set_channel_count(SerialManager.DEFAULT_CHANNEL_COUNT)
 
         self.serial_console = QDockWidget("Serial Console", self)
         console_widget = QWidget()
@@ -264,13 +431,117 @@ class PPMApp(QMainWindow):
         self.console_text = QTextEdit()
         self.console_text.setReadOnly(True)
         console_layout.addWidget(self.console_text)
+        console_options = QHBoxLayout()
         raw_checkbox = QCheckBox("Raw")
         raw_checkbox.stateChanged.connect(self.toggle_raw_mode)
-        console_layout.addWidget(raw_checkbox)
+        console_options.addWidget(raw_checkbox)
+        console_options.addStretch()
+        console_options.addWidget(QLabel("Frame Format:"))
+        self.encoder_combo = QComboBox()
+        self.encoder_combo.addItems(FRAME_ENCODERS.keys())
+        self.encoder_combo.setCurrentText(self.serial_manager.frame_encoder.name)
+        self.encoder_combo.currentTextChanged.connect(self.serial_manager.set_frame_encoder)
+        console_options.addWidget(self.encoder_combo)
+        console_options.addWidget(QLabel("Transmit:"))
+        self.transmit_mode_combo = QComboBox()
+        self.transmit_mode_combo.addItems(SerialManager.TRANSMIT_MODES)
+        self.transmit_mode_combo.setCurrentText(self.serial_manager.transmit_mode)
+        self.transmit_mode_combo.currentTextChanged.connect(self.serial_manager.set_transmit_mode)
+        console_options.addWidget(self.transmit_mode_combo)
+        delta_checkbox = QCheckBox("Delta")
+        delta_checkbox.setChecked(self.serial_manager.delta_mode)
+        delta_checkbox.stateChanged.connect(lambda state: self.serial_manager.set_delta_mode(state == Qt.Checked))
+        console_options.addWidget(delta_checkbox)
+        console_options.addWidget(QLabel("Keepalive (ms):"))
+        keepalive_spinbox = QSpinBox()
+        keepalive_spinbox.setRange(20, 5000)
+        keepalive_spinbox.setSingleStep(50)
+        keepalive_spinbox.setValue(self.serial_manager.keepalive_interval_ms)
+        keepalive_spinbox.valueChanged.connect(self.serial_manager.set_keepalive_interval)
+        console_options.addWidget(keepalive_spinbox)
+        console_layout.addLayout(console_options)
+
+        transport_options = QHBoxLayout()
+        transport_options.addStretch()
+        transport_options.addWidget(QLabel("Rate (Hz):"))
+        self.rate_spinbox = QSpinBox()
+        self.rate_spinbox.setRange(SerialManager.MIN_TRANSMIT_RATE_HZ, SerialManager.MAX_TRANSMIT_RATE_HZ)
+        self.rate_spinbox.setValue(self.serial_manager.transmit_rate_hz)
+        self.rate_spinbox.editingFinished.connect(
+            lambda: self.serial_manager.set_transmit_rate(self.rate_spinbox.value()))
+        transport_options.addWidget(self.rate_spinbox)
+        transport_options.addWidget(QLabel("Baud:"))
+        baud_combo = QComboBox()
+        baud_combo.addItems([str(baud) for baud in SerialManager.BAUD_RATES])
+        baud_combo.setCurrentText(str(self.serial_manager.baud_rate))
+        baud_combo.currentTextChanged.connect(lambda text: self.serial_manager.set_baud_rate(int(text)))
+        transport_options.addWidget(baud_combo)
+        auto_cap_checkbox = QCheckBox("Cap rate to link")
+        auto_cap_checkbox.setChecked(self.serial_manager.auto_cap_rate)
+        auto_cap_checkbox.stateChanged.connect(lambda state: self.serial_manager.set_auto_cap_rate(state == Qt.Checked))
+        transport_options.addWidget(auto_cap_checkbox)
+        self.budget_label = QLabel()
+        transport_options.addWidget(self.budget_label)
+        self.update_budget_display()
+        self.rate_spinbox.editingFinished.connect(self.update_budget_display)
+        baud_combo.currentTextChanged.connect(self.update_budget_display)
+        auto_cap_checkbox.stateChanged.connect(self.update_budget_display)
+        self.encoder_combo.currentTextChanged.connect(self.update_budget_display)
+        console_layout.addLayout(transport_options)
+
+        input_options = QHBoxLayout()
+        input_options.addStretch()
+        input_options.addWidget(QLabel("Input:"))
+        input_mode_combo = QComboBox()
+        input_mode_combo.addItems(JoystickInputService.INPUT_MODES)
+        input_mode_combo.setCurrentText(self.input_service.mode)
+        input_mode_combo.currentTextChanged.connect(self.input_service.set_mode)
+        input_options.addWidget(input_mode_combo)
+        input_options.addWidget(QLabel("Coalesce (ms):"))
+        coalesce_spinbox = QSpinBox()
+        coalesce_spinbox.setRange(1, 50)
+        coalesce_spinbox.setValue(self.input_service.coalesce_ms)
+        coalesce_spinbox.valueChanged.connect(self.input_service.set_coalesce_window)
+        input_options.addWidget(coalesce_spinbox)
+        input_options.addWidget(QLabel("Acquisition (Hz):"))
+        acquisition_spinbox = QSpinBox()
+        acquisition_spinbox.setRange(50, JoystickInputService.MAX_ACQUISITION_RATE_HZ)
+        acquisition_spinbox.setSingleStep(50)
+        acquisition_spinbox.setValue(self.input_service.acquisition_rate_hz)
+        acquisition_spinbox.valueChanged.connect(self.input_service.set_acquisition_rate)
+        input_options.addWidget(acquisition_spinbox)
+        input_options.addWidget(QLabel("Evaluation:"))
+        self.evaluation_combo = QComboBox()
+        self.evaluation_combo.addItems(PPMScene.EVALUATION_MODES)
+        self.evaluation_combo.setCurrentText(self.scene.evaluation_mode)
+        self.evaluation_combo.currentTextChanged.connect(self.scene.set_evaluation_mode)
+        input_options.addWidget(self.evaluation_combo)
+        console_layout.addLayout(input_options)
         self.serial_console.setWidget(console_widget)
         self.addDockWidget(Qt.BottomDockWidgetArea, self.serial_console)
         self.serial_console.setVisible(False)
 
+        self.stats_dock = QDockWidget("Transport Stats", self)
+        stats_widget = QWidget()
+        stats_layout = QVBoxLayout(stats_widget)
+        self.stats_label = QLabel("No data.")
+        self.stats_label.setStyleSheet("font-family: monospace;")
+        self.stats_label.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        stats_layout.addWidget(self.stats_label)
+        copy_stats_button = QPushButton("Copy JSON")
+        copy_stats_button.clicked.connect(self.copy_stats_snapshot)
+        stats_layout.addWidget(copy_stats_button)
+        self.input_stats_label = QLabel("No input data.")
+        self.input_stats_label.setStyleSheet("font-family: monospace;")
+        self.input_stats_label.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        stats_layout.addWidget(self.input_stats_label)
+        self.input_service.input_stats_updated.connect(self.update_input_stats_display)
+        self.stats_dock.setWidget(stats_widget)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.stats_dock)
+        self.stats_dock.setVisible(False)
+        self.serial_manager.stats_updated.connect(self.update_stats_display)
+        self.serial_manager.stats_updated.connect(self.update_budget_display)
+
         toolbar = QToolBar("Controls")
         self.addToolBar(toolbar)
 
@@ -281,6 +552,7 @@ class PPMApp(QMainWindow):
         actions_to_add = {
             "1-Input Logic": lambda: self.add_custom_node(1),
             "2-Input Logic": lambda: self.add_custom_node(2),
+            "Multi-Input Logic...": self.show_multi_input_logic_dialog,
             "Boost Node": self.add_boost_node,
             "Toggle Switch": self.add_toggle_node,
             "3-Position Switch": self.add_three_position_switch_node,
@@ -288,7 +560,8 @@ class PPMApp(QMainWindow):
             "Mixer": self.add_mixer_node,
             "Axis to Buttons": self.add_axis_to_buttons_node,
             "Switch Gate": self.add_switch_gate_node,
-            "Pedal Control": self.add_pedal_control_node
+            "Pedal Control": self.add_pedal_control_node,
+            "Telemetry": self.add_telemetry_node
         }
         for name, func in actions_to_add.items():
             action = QAction(name, self)
@@ -327,84 +600,162 @@ class PPMApp(QMainWindow):
         self.remove_all_action = QAction(QIcon.fromTheme("edit-clear"), "Remove All Connections", self)
         self.remove_all_action.triggered.connect(self.scene.remove_all_connections)
         toolbar.addAction(self.remove_all_action)
+        channels_action = QAction(QIcon.fromTheme("preferences-system"), "Channels...", self)
+        channels_action.triggered.connect(self.show_channel_count_dialog)
+        toolbar.addAction(channels_action)
+        input_filters_action = QAction(QIcon.fromTheme("input-gaming"), "Input Filters...", self)
+        input_filters_action.triggered.connect(lambda: AxisFilterDialog(self.input_service).exec_())
+        toolbar.addAction(input_filters_action)
+        export_latency_action = QAction(QIcon.fromTheme("document-export"), "Export Latency", self)
+        export_latency_action.triggered.connect(self.export_latency_stats)
+        toolbar.addAction(export_latency_action)
         toggle_console_action = self.serial_console.toggleViewAction()
         toggle_console_action.setText("Toggle Console")
         toggle_console_action.setIcon(QIcon.fromTheme("utilities-terminal"))
         toolbar.addAction(toggle_console_action)
+        toggle_stats_action = self.stats_dock.toggleViewAction()
+        toggle_stats_action.setText("Toggle Stats")
+        toggle_stats_action.setIcon(QIcon.fromTheme("utilities-system-monitor"))
+        toolbar.addAction(toggle_stats_action)
 
         self.statusBar()
         self.status_label = QLabel("Disconnected")
         self.statusBar().addWidget(self.status_label)
+        self.latency_label = QLabel("Latency: -")
+        self.statusBar().addPermanentWidget(self.latency_label)
         self.sps_label = QLabel("SPS: 0")
         self.statusBar().addPermanentWidget(self.sps_label)
+        self.serial_manager.latency_updated.connect(self.update_latency_display)
+        self.serial_manager.sps_updated.connect(self.update_sps_display)
+        self.serial_manager.sps_detail_updated.connect(self.update_sps_detail_display)
         self.max_log_blocks = 500
 
         self.load_layout()
         self.auto_connect()
 
-        self.joystick_check_timer = QTimer(self)
-        self.joystick_check_timer.setInterval(1000)
-        self.joystick_check_timer.timeout.connect(self._check_joystick_events)
-        self.joystick_check_timer.start()
+    def set_channel_count(self, count):
+        """Creates or removes PPM Channel nodes so the layout drives `count` channels."""
+        self.serial_manager.set_channel_count(count)
+        count = len(self.serial_manager.channel_values)
+
+        while len(self.ppm_nodes) > count:
+            node = self.ppm_nodes.pop()
+            for conn in list(node.connections):
+                self.scene.remove_connection(conn)
+            node.cleanup()
+            self.scene.removeItem(node)
+
+        # Channels are laid out in banks of 8, one column per bank
+        for i in range(len(self.ppm_nodes), count):
+            bank, row = divmod(i, 8)
+            node = PPMChannelNode(i + 1, 800 + bank * 220, 50 + row * 150, serial_manager=self.serial_manager)
+            self.ppm_nodes.append(node)
+            self.scene.addItem(node)
+
+    def show_channel_count_dialog(self):
+        count, ok = QInputDialog.getInt(self, "PPM Channels", "Number of channels:",
+                                        len(self.ppm_nodes), 1, SerialManager.MAX_CHANNEL_COUNT)
+        if ok:
+            self.set_channel_count(count)
 
     def update_sps_display(self, sps_value):
         """Updates the SPS counter in the status bar."""
         self.sps_label.setText(f"SPS: {sps_value}")
 
+    def update_sps_detail_display(self, changed, keepalive):
+        """Adds the changed / keepalive split to the SPS counter; follows each update_sps_display()."""
+        self.sps_label.setText(f"{self.sps_label.text()} ({changed} changed / {keepalive} keepalive)")
+
+    def update_stats_display(self, snapshot):
+        """Renders the once-per-second transport statistics into the stats dock."""
+        if not self.stats_dock.isVisible():
+            return
+        lines = [
+            f"Frames/s:      {snapshot['frames_per_s']:8.1f}",
+            f"Commands/s:    {snapshot['commands_per_s']:8.1f}",
+            f"  changed:     {snapshot['changed_commands_per_s']:8.1f}",
+            f"  keepalive:   {snapshot['keepalive_commands_per_s']:8.1f}",
+            f"Bytes/s out:   {snapshot['bytes_written_per_s']:8.1f}",
+            f"Bytes/s in:    {snapshot['bytes_read_per_s']:8.1f}",
+            f"Write (us):    {snapshot['write_us_mean']:8.1f} mean {snapshot['write_us_max']:8.1f} max",
+            f"Interval (ms): {snapshot['interval_ms_min']:8.2f} min  {snapshot['interval_ms_mean']:8.2f} mean",
+            f"               {snapshot['interval_ms_max']:8.2f} max  {snapshot['interval_ms_stddev']:8.2f} stddev",
+            f"out_waiting:   {snapshot['out_waiting']:8d} now  {snapshot['out_waiting_max']:8d} max",
+            f"Dropped/s:     {snapshot['frames_dropped_per_s']:8.1f}",
+            f"Coalesced/s:   {snapshot['frames_coalesced_per_s']:8.1f}",
+            f"Partial w/s:   {snapshot['partial_writes_per_s']:8.1f}",
+        ]
+        self.stats_label.setText("\n".join(lines))
+
+    def update_input_stats_display(self, devices):
+        """Shows how many changes per second every joystick axis emits into the graph."""
+        if not self.stats_dock.isVisible():
+            return
+        lines = ["Axis emissions/s:"]
+        for device in devices:
+            lines.append(f"  {device['name']}")
+            lines += [f"    Axis {axis}: {rate:8.1f}" for axis, rate in enumerate(device['emissions_per_s'])]
+        self.input_stats_label.setText("\n".join(lines) if devices else "No input data.")
+
+    def update_budget_display(self, snapshot=None):
+        """Shows the effective rate and how much of the link's byte capacity it uses."""
+        budget = self.serial_manager.wire_budget()
+        self.budget_label.setText(
+            f"{budget['rate_hz']} Hz, {budget['bytes_per_frame']} B/frame, "
+            f"{budget['utilization']:.0%} of link (max {budget['max_rate_hz']} Hz)")
+
+    def copy_stats_snapshot(self):
+        QApplication.clipboard().setText(json.dumps(self.serial_manager.stats.snapshot(), indent=4))
+        self.append_log("Transport statistics copied to the clipboard as JSON.", False)
+
+    def update_latency_display(self, summary):
+        """Shows input-to-wire latency percentiles over all channels in the status bar."""
+        stats = summary["all"]
+        if stats is None:
+            self.latency_label.setText("Latency: -")
+            return
+        self.latency_label.setText(
+            f"Latency p50/p95/p99/max: {stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}/"
+            f"{stats['p99_ms']:.1f}/{stats['max_ms']:.1f} ms")
+
+    def export_latency_stats(self):
+        summary = self.serial_manager.latency.summary()
+        with open("latency_stats.json", "w") as f:
+            json.dump(summary, f, indent=4)
+        self.append_log("Latency statistics exported to latency_stats.json", False)
+
     def _rebuild_joystick_menu(self):
         for action in self.add_node_menu.actions():
             if action.text().startswith("Input:") or action.isSeparator():
                 self.add_node_menu.removeAction(action)
 
-        joystick_count = pygame.joystick.get_count()
+        joystick_count = self.input_service.get_count()
         if joystick_count > 0:
             first_action = self.add_node_menu.actions()[0] if self.add_node_menu.actions() else None
             for i in range(joystick_count):
-                joystick = pygame.joystick.Joystick(i)
-                joystick.init()
+                joystick = self.input_service.open(i)
                 action = QAction(f"Input: {joystick.get_name()} (ID {i})", self)
                 action.triggered.connect(lambda checked, jid=i: self.add_joystick_node(jid))
                 self.add_node_menu.insertAction(first_action, action)
             self.add_node_menu.insertSeparator(first_action)
 
-    def _check_joystick_events(self):
-        pygame.event.pump()
-        scene_joysticks = [item for item in self.scene.items() if isinstance(item, JoystickNode)]
-
-        for event in pygame.event.get():
-            if event.type == pygame.JOYDEVICEADDED:
-                pygame.joystick.init()
-                self._rebuild_joystick_menu()
-                new_joy = pygame.joystick.Joystick(event.device_index)
-                new_joy.init()
-
-                reconnected = False
-                for node in scene_joysticks:
-                    if not node.is_connected and node.guid == new_joy.get_guid():
-                        node.reconnect(event.device_index)
-                        reconnected = True
-                        break
-                if not reconnected:
-                    print(f"New, unassigned joystick added: {new_joy.get_name()}")
-
-            if event.type == pygame.JOYDEVICEREMOVED:
-                for node in scene_joysticks:
-                    if node.instance_id == event.instance_id:
-                        node.disconnect()
-                        print(f"Disconnected '{node.name}'")
-                        break
-
     def add_joystick_node(self, joystick_id):
         try:
-            node = JoystickNode(joystick_id, x=50, y=50)
+            node = JoystickNode(joystick_id, x=50, y=50, input_service=self.input_service)
             self.scene.addItem(node)
-        except pygame.error as e:
+        except INPUT_ERRORS as e:
             print(f"Error adding joystick {joystick_id}: {e}")
 
     def add_custom_node(self, inputs):
         node = CustomLogicNode(x=400, y=100, inputs=inputs)
         self.scene.addItem(node)
 
+    def show_multi_input_logic_dialog(self):
+        inputs, ok = QInputDialog.getInt(self, "Multi-Input Logic", "Number of inputs:",
+                                         3, 1, CustomLogicModel.MAX_INPUTS)
+        if ok:
+            self.add_custom_node(inputs)
+
     def add_boost_node(self):
         node = BoostControlNode(x=400, y=100)
         self.scene.addItem(node)
@@ -437,6 +788,10 @@ class PPMApp(QMainWindow):
         node = PedalControlNode(x=400, y=100)
         self.scene.addItem(node)
 
+    def add_telemetry_node(self):
+        node = TelemetryNode(x=400, y=100, serial_manager=self.serial_manager)
+        self.scene.addItem(node)
+
     def center_view_on_nodes(self):
         nodes = [item for item in self.scene.items() if isinstance(item, BaseNode)]
         if not nodes:
@@ -448,6 +803,13 @@ class PPMApp(QMainWindow):
         self.view.centerOn(avg_x, avg_y)
 
     def auto_connect(self):
+        if self.default_port:
+            # An explicitly requested port (e.g. the emulator's pty) is not enumerated by list_ports
+            self.selected_port = self.default_port
+            self.append_log(f"Connecting to {self.selected_port}.", False)
+            self.serial_manager.connect(self.selected_port)
+            return
+
         default_port = "/dev/ttyACM0"
         available_ports = self.serial_manager.list_ports()
         self.append_log("Attempting to auto-connect...", False)
@@ -533,18 +895,20 @@ class PPMApp(QMainWindow):
             "end_node_input_index": conn.end_index
         } for conn in self.scene.connections]
 
-        with open("layout.json", "w") as f:
-            json.dump({"nodes": nodes, "connections": connections}, f, indent=4)
+        with open(self.layout_path, "w") as f:
+            json.dump({"channel_count": len(self.ppm_nodes), "nodes": nodes,
+                       "connections": connections,
+                       "input_filters": self.input_service.axis_filters}, f, indent=4)
         print("Layout saved.")
-        self.append_log("Layout saved to layout.json", False)
+        self.append_log(f"Layout saved to {self.layout_path}", False)
 
     def load_layout(self):
         try:
-            with open("layout.json", "r") as f:
+            with open(self.layout_path, "r") as f:
                 data = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Could not load layout.json: {e}")
-            self.append_log("No valid layout.json found. Starting fresh.", False)
+            print(f"Could not load {self.layout_path}: {e}")
+            self.append_log(f"No valid {self.layout_path} found. Starting fresh.", False)
             return
 
         # Clear existing dynamic nodes and all connections
@@ -555,7 +919,13 @@ class PPMApp(QMainWindow):
                 if hasattr(item, 'cleanup'): item.cleanup()
                 self.scene.removeItem(item)
 
+        # Layouts saved before the channel count was configurable always have 8 channels
+        self.set_channel_count(data.get("channel_count", SerialManager.DEFAULT_CHANNEL_COUNT))
+        self.input_service.load_axis_filters(data.get("input_filters", {}))
+
         node_map_by_id = {item.id: item for item in self.scene.items() if isinstance(item, BaseNode)}
+        # Older layouts (e.g. layout_presets/) have no node ids and connect nodes by title
+        node_map_by_title = {}
 
         # Load nodes
         node_classes = {
@@ -573,56 +943,110 @@ class PPMApp(QMainWindow):
                 # Find the existing PPM node and apply its state
                 for node in self.ppm_nodes:
                     if node.title == node_data.get("title"):
-                        node.id = node_data['id']
+                        node.id = node_data.get('id', node.id)
                         node.set_state(node_data)
                         node_map_by_id[node.id] = node
+                        node_map_by_title[node.title] = node
                         break
                 continue
 
             node = None
             if node_type == "JoystickNode":
                 guid = node_data.get('guid')
+                title = node_data.get('title')
                 is_connected = False
-                for i in range(pygame.joystick.get_count()):
-                    joy = pygame.joystick.Joystick(i)
-                    if joy.get_guid() == guid:
-                        node = JoystickNode(i, node_data['x'], node_data['y'])
+                for i in range(self.input_service.get_count()):
+                    joy = self.input_service.open(i)
+                    # Older layouts did not save the GUID; match those by device name
+                    matches = joy.get_guid() == guid if guid else joy.get_name() == title
+                    if matches:
+                        node = JoystickNode(i, node_data['x'], node_data['y'], input_service=self.input_service)
                         is_connected = True
                         break
                 if not is_connected:
-                    node = JoystickNode.create_disconnected(node_data)
+                    node = JoystickNode.create_disconnected(node_data, input_service=self.input_service)
 
             elif node_type == "CustomLogicNode":
                 num_inputs = node_data.get('inputs', 1)
                 node = CustomLogicNode(x=node_data['x'], y=node_data['y'], inputs=num_inputs)
 
+            elif node_type == "TelemetryNode":
+                node = TelemetryNode(x=node_data['x'], y=node_data['y'], serial_manager=self.serial_manager)
+
             else:
                 node_class = node_classes.get(node_type)
                 if node_class:
                     node = node_class(x=node_data['x'], y=node_data['y'])
 
             if node:
-                node.id = node_data['id']
+                node.id = node_data.get('id', node.id)
+                node_map_by_title.setdefault(node_data.get('title', node.title), node)
                 node.set_state(node_data)
                 self.scene.addItem(node)
                 node_map_by_id[node.id] = node
 
         # Load connections
         for conn_data in data.get("connections", []):
-            start_node = node_map_by_id.get(conn_data["start_node_id"])
-            end_node = node_map_by_id.get(conn_data["end_node_id"])
+            if "start_node_id" in conn_data:
+                start_node = node_map_by_id.get(conn_data["start_node_id"])
+                end_node = node_map_by_id.get(conn_data["end_node_id"])
+            else:
+                start_node = node_map_by_title.get(conn_data.get("start_node_title"))
+                end_node = node_map_by_title.get(conn_data.get("end_node_title"))
             if start_node and end_node:
                 self.scene.create_connection(
                     start_node, conn_data["start_node_output_index"],
                     end_node, conn_data["end_node_input_index"]
                 )
 
-        self.append_log("Layout loaded from layout.json", False)
+        self.append_log(f"Layout loaded from {self.layout_path}", False)
         self.center_view_on_nodes()
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = PPMApp()
+    parser = argparse.ArgumentParser(description="QtPye-PPM-Controller")
+    parser.add_argument("--port", help="serial port to connect to instead of /dev/ttyACM0")
+    parser.add_argument("--emulator", action="store_true",
+                        help="connect to a built-in USB2PPM adapter emulator on a pty (Linux only)")
+    parser.add_argument("--input-backend", choices=INPUT_BACKENDS.keys(), default="pygame",
+                        help="read joysticks through pygame/SDL, directly from /dev/input (evdev, Linux only) "
+                             "or from animated virtual joysticks standing in for those in layout.json (virtual)")
+    parser.add_argument("--record", metavar="FILE", help="record all joystick input to FILE for later replay")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recording made with --record in real time instead of reading joysticks")
+    parser.add_argument("--evaluation", choices=PPMScene.EVALUATION_MODES, default=PPMScene.EVALUATION_SIGNALS,
+                        help="evaluate the graph through Qt signals as values change, once per input tick "
+                             "in topological order (glitch-free, fewer evaluations) or as compiled code (fastest)")
+    args, qt_args = parser.parse_known_args()
+
+    emulator = None
+    port = args.port
+    if args.emulator:
+        from usb2ppm_emulator import USB2PPMEmulator
+        emulator = USB2PPMEmulator(channel_count=SerialManager.MAX_CHANNEL_COUNT)
+        port = emulator.start()
+        print(f"USB2PPM emulator listening on {port}")
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    input_backend = args.input_backend
+    if input_backend == "virtual":
+        from virtual_joystick import VirtualInputBackend
+        try:
+            with open("layout.json") as f:
+                input_backend = VirtualInputBackend.from_layout(json.load(f), animate=True)
+        except (FileNotFoundError, json.JSONDecodeError):
+            input_backend = VirtualInputBackend()
+            input_backend.add_device().animate()
+    if args.replay:
+        from input_recording import ReplayInputBackend
+        input_backend = ReplayInputBackend(args.replay, speed=1.0)
+    window = PPMApp(default_port=port, input_backend=input_backend)
+    window.evaluation_combo.setCurrentText(args.evaluation)
+    if args.record:
+        window.input_service.start_recording(args.record)
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    window.input_service.stop()
+    if emulator:
+        emulator.stop()
+    sys.exit(exit_code)
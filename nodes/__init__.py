@@ -12,3 +12,4 @@ from .mixer_node import MixerNode
 from .axis_to_buttons_node import AxisToButtonsNode
 from .switch_gate_node import SwitchGateNode
 from .pedal_control_node import PedalControlNode
+from .telemetry_node import TelemetryNode
@@ -2,25 +2,23 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLineEdit, QLabel, QWidget, QHBoxLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen
+from engine import AxisToButtonsModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class AxisToButtonsNode(BaseNode):
     def __init__(self, x=0, y=0, parent=None):
         # Increased height slightly for better layout
-        super().__init__(title="Axis to Buttons", x=x, y=y, w=250, h=140, parent=parent)
+        super().__init__(title="Axis to Buttons", x=x, y=y, w=250, h=140, parent=parent, model=AxisToButtonsModel())
         self.inputs = 1
         self.inputs_occupied = [False]
         self.output_signals = [NodeSignalEmitter(), NodeSignalEmitter()]
 
-        self.deadzone = 0.25
-        self.output_values = [-1.0, -1.0]
-
         # UI Elements are now at the top
         widget = QWidget()
         layout = QHBoxLayout(widget)
         layout.setContentsMargins(5, 0, 5, 0)
         layout.addWidget(QLabel("Deadzone:"))
-        self.deadzone_edit = QLineEdit(str(self.deadzone))
+        self.deadzone_edit = QLineEdit(str(self.model.deadzone))
         self.deadzone_edit.editingFinished.connect(self._update_deadzone)
         layout.addWidget(self.deadzone_edit)
 
@@ -39,33 +37,25 @@ class AxisToButtonsNode(BaseNode):
     def _update_deadzone(self):
         try:
             val = float(self.deadzone_edit.text())
-            self.deadzone = max(0.0, min(1.0, val))
-            self.deadzone_edit.setText(str(self.deadzone))
+            self.model.deadzone = max(0.0, min(1.0, val))
         except ValueError:
-            self.deadzone_edit.setText(str(self.deadzone))
+            pass
+        self.deadzone_edit.setText(str(self.model.deadzone))
+        self.params_changed()
 
     def get_state(self):
         state = super().get_state()
-        state['deadzone'] = self.deadzone
+        state.update(self.model.get_params())
         return state
 
     def set_state(self, data):
         super().set_state(data)
         if 'deadzone' in data:
-            self.deadzone = data['deadzone']
-            self.deadzone_edit.setText(str(self.deadzone))
+            self.model.set_params(data)
+            self.deadzone_edit.setText(str(self.model.deadzone))
 
     def set_value(self, value, input_index=0):
-        input_val = float(value)
-        pos_active = 1.0 if input_val > self.deadzone else -1.0
-        if pos_active != self.output_values[0]:
-            self.output_values[0] = pos_active
-            self.output_signals[0].output_signal.emit(pos_active, 0)
-
-        neg_active = 1.0 if input_val < -self.deadzone else -1.0
-        if neg_active != self.output_values[1]:
-            self.output_values[1] = neg_active
-            self.output_signals[1].output_signal.emit(neg_active, 0)
+        self.emit_outputs(self.model.set_input(input_index, value))
         self.update()
 
     def paint(self, painter, option, widget=None):
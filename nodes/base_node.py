@@ -1,16 +1,21 @@
 # nodes/base_node.py
-import uuid
 from PyQt5.QtWidgets import QGraphicsItem
 from PyQt5.QtCore import QRectF, QPointF, Qt, pyqtSignal, QObject
 from PyQt5.QtGui import QBrush, QColor, QPen
+from engine import NodeModel
 
 class NodeSignalEmitter(QObject):
     output_signal = pyqtSignal(float, int)
 
 class BaseNode(QGraphicsItem):
-    def __init__(self, title="Node", x=0, y=0, w=150, h=100, parent=None):
+    """
+    Editor view of one node. The values and the computation live in `model`
+    (see engine/models.py); the view shows them, edits the model's parameters
+    and emits the model's outputs through output_signals.
+    """
+    def __init__(self, title="Node", x=0, y=0, w=150, h=100, parent=None, model=None):
         super().__init__(parent)
-        self.id = str(uuid.uuid4())
+        self.model = model or NodeModel(title=title)
         self.title = title
         self.setPos(x, y)
         self.width = w
@@ -25,9 +30,42 @@ class BaseNode(QGraphicsItem):
         self.connections = []
         self.inputs_occupied = [False]
 
+    @property
+    def id(self):
+        return self.model.id
+
+    @id.setter
+    def id(self, node_id):
+        graph = getattr(self.scene(), 'graph', None)
+        if graph is not None and node_id != self.model.id:
+            graph.rename_node(self.model, node_id)
+        else:
+            self.model.id = node_id
+
     def boundingRect(self):
         return self.rect
 
+    def emit_outputs(self, output_indices):
+        """Emits the model's current value of each given output, or queues it for the scene's next tick."""
+        scene = self.scene()
+        if scene is not None and scene.evaluation_mode != scene.EVALUATION_SIGNALS:
+            if output_indices:
+                scene.queue_outputs(self.model, output_indices)
+            return
+        outputs = self.model.outputs
+        for output_index in output_indices:
+            self.output_signals[output_index].output_signal.emit(outputs[output_index], 0)
+
+    def params_changed(self):
+        """Call after editing a model parameter; a compiled layout has them folded in as constants."""
+        graph = getattr(self.scene(), 'graph', None)
+        if graph is not None:
+            graph.params_changed()
+
+    def refresh(self):
+        """Shows the model's current values after the scene evaluated it in tick mode."""
+        self.update()
+
     def is_input_occupied(self, index):
         if index < len(self.inputs_occupied):
             return self.inputs_occupied[index]
@@ -77,6 +115,7 @@ class BaseNode(QGraphicsItem):
 
     def set_state(self, data):
         self.setPos(data['x'], data['y'])
+        self.params_changed()
 
     def get_hotspot_rects(self):
         """Child classes must override this to return their connection dot hitboxes."""
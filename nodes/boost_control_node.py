@@ -1,36 +1,34 @@
 # nodes/boost_control_node.py
+import time
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLineEdit, QLabel, QWidget, QVBoxLayout, QHBoxLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt, QTimer
 from PyQt5.QtGui import QBrush, QColor, QPen
+from engine import BoostControlModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class BoostControlNode(BaseNode):
-    BOOST_STATE_READY = 0
-    BOOST_STATE_BOOSTING = 1
-    BOOST_STATE_COOLDOWN = 2
+    BOOST_STATE_READY = BoostControlModel.STATE_READY
+    BOOST_STATE_BOOSTING = BoostControlModel.STATE_BOOSTING
+    BOOST_STATE_COOLDOWN = BoostControlModel.STATE_COOLDOWN
+    STATUS_STYLES = {
+        BOOST_STATE_READY: ("Ready", "font-weight: bold; color: green;"),
+        BOOST_STATE_BOOSTING: ("Boosting", "font-weight: bold; color: orange;"),
+        BOOST_STATE_COOLDOWN: ("Cooldown", "font-weight: bold; color: red;"),
+    }
 
     def __init__(self, x=0, y=0, parent=None):
         # Increased height to make space for dots at the bottom
-        super().__init__(title="Boost Control", x=x, y=y, w=220, h=260, parent=parent)
+        super().__init__(title="Boost Control", x=x, y=y, w=220, h=260, parent=parent, model=BoostControlModel())
         self.inputs = 2
-        self.input_values = [0.0, 0.0]
-        self.output_value = 0.0
         self.inputs_occupied = [False] * self.inputs
         self.output_signal = NodeSignalEmitter()
         self.output_signals = [self.output_signal]
 
-        self.boost_duration_s = 2.0
-        self.cooldown_duration_s = 3.0
-        self.boost_amount_us = 500
-        self.state = self.BOOST_STATE_READY
-
-        self.boost_timer = QTimer()
-        self.boost_timer.setSingleShot(True)
-        self.boost_timer.timeout.connect(self._end_boost)
-
-        self.cooldown_timer = QTimer()
-        self.cooldown_timer.setSingleShot(True)
-        self.cooldown_timer.timeout.connect(self._end_cooldown)
+        # Ends the model's boost and cooldown phases on time
+        self.phase_timer = QTimer()
+        self.phase_timer.setSingleShot(True)
+        self.phase_timer.timeout.connect(self._advance)
+        self._timer_deadline = None
 
         # UI elements are positioned at the top
         widget = QWidget()
@@ -43,19 +41,19 @@ class BoostControlNode(BaseNode):
 
         hbox1 = QHBoxLayout()
         hbox1.addWidget(QLabel("Boost Dur (s):"))
-        self.boost_duration_edit = QLineEdit(str(self.boost_duration_s))
+        self.boost_duration_edit = QLineEdit(str(self.model.boost_duration_s))
         hbox1.addWidget(self.boost_duration_edit)
         layout.addLayout(hbox1)
 
         hbox2 = QHBoxLayout()
         hbox2.addWidget(QLabel("Cooldown (s):"))
-        self.cooldown_duration_edit = QLineEdit(str(self.cooldown_duration_s))
+        self.cooldown_duration_edit = QLineEdit(str(self.model.cooldown_duration_s))
         hbox2.addWidget(self.cooldown_duration_edit)
         layout.addLayout(hbox2)
 
         hbox3 = QHBoxLayout()
         hbox3.addWidget(QLabel("Boost Amt (µs):"))
-        self.boost_amount_edit = QLineEdit(str(self.boost_amount_us))
+        self.boost_amount_edit = QLineEdit(str(self.model.boost_amount_us))
         hbox3.addWidget(self.boost_amount_edit)
         layout.addLayout(hbox3)
 
@@ -77,91 +75,72 @@ class BoostControlNode(BaseNode):
         self.output_rect = QRectF(self.width - 5, output_y - 5, 10, 10)
 
     def cleanup(self):
-        """Stops and deletes the timers to prevent memory leaks."""
-        if self.boost_timer:
-            self.boost_timer.stop()
-            self.boost_timer.deleteLater()
-            self.boost_timer = None
-        if self.cooldown_timer:
-            self.cooldown_timer.stop()
-            self.cooldown_timer.deleteLater()
-            self.cooldown_timer = None
+        """Stops and deletes the timer to prevent memory leaks."""
+        if self.phase_timer:
+            self.phase_timer.stop()
+            self.phase_timer.deleteLater()
+            self.phase_timer = None
         print(f"Cleaned up timers for Boost Control Node")
         super().cleanup()
 
     def _update_boost_duration(self):
         try:
             val = float(self.boost_duration_edit.text())
-            self.boost_duration_s = max(0.0, val)
-            self.boost_duration_edit.setText(str(self.boost_duration_s))
+            self.model.boost_duration_s = max(0.0, val)
         except ValueError:
-            self.boost_duration_edit.setText(str(self.boost_duration_s))
+            pass
+        self.boost_duration_edit.setText(str(self.model.boost_duration_s))
+        self.params_changed()
 
     def _update_cooldown_duration(self):
         try:
             val = float(self.cooldown_duration_edit.text())
-            self.cooldown_duration_s = max(0.0, val)
-            self.cooldown_duration_edit.setText(str(self.cooldown_duration_s))
+            self.model.cooldown_duration_s = max(0.0, val)
         except ValueError:
-            self.cooldown_duration_edit.setText(str(self.cooldown_duration_s))
+            pass
+        self.cooldown_duration_edit.setText(str(self.model.cooldown_duration_s))
+        self.params_changed()
 
     def _update_boost_amount(self):
         try:
             val = int(self.boost_amount_edit.text())
-            self.boost_amount_us = max(-1000, min(1000, val))
-            self.boost_amount_edit.setText(str(self.boost_amount_us))
+            self.model.boost_amount_us = max(-1000, min(1000, val))
         except ValueError:
-            self.boost_amount_edit.setText(str(self.boost_amount_us))
+            pass
+        self.boost_amount_edit.setText(str(self.model.boost_amount_us))
+        self.params_changed()
         self._recalculate_output()
 
     def set_value(self, value, input_index=0):
-        if input_index < len(self.input_values):
-            self.input_values[input_index] = value
-        self._recalculate_output()
+        self._show(self.model.set_input(input_index, value))
 
     def _recalculate_output(self):
-        throttle_input_normalized = self.input_values[0]
-        boost_button_state = self.input_values[1]
-        base_throttle_ppm = int(1500 + throttle_input_normalized * 500)
-        output_ppm = base_throttle_ppm
-
-        if self.state == self.BOOST_STATE_READY:
-            self.status_label.setText("Ready")
-            self.status_label.setStyleSheet("font-weight: bold; color: green;")
-            if boost_button_state > 0.5:
-                self._start_boost()
-                return
-        elif self.state == self.BOOST_STATE_BOOSTING:
-            self.status_label.setText("Boosting")
-            self.status_label.setStyleSheet("font-weight: bold; color: orange;")
-            output_ppm = base_throttle_ppm + self.boost_amount_us
-            if boost_button_state < 0.5:
-                self._end_boost()
-                return
-        elif self.state == self.BOOST_STATE_COOLDOWN:
-            self.status_label.setText("Cooldown")
-            self.status_label.setStyleSheet("font-weight: bold; color: red;")
-
-        output_ppm = max(1000, min(2000, output_ppm))
-        self.output_value = (output_ppm - 1500) / 500.0
-        self.output_signal.output_signal.emit(self.output_value, 0)
+        self._show(self.model.evaluate())
+
+    def _advance(self):
+        self._show(self.model.advance(time.monotonic()))
+
+    def refresh(self):
+        self._show(())
+
+    def _show(self, emitted):
+        """Emits the model's output and follows its phase: status label and the timer for the phase end."""
+        model = self.model
+        text, style = self.STATUS_STYLES[model.state]
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(style)
+        if self.phase_timer:
+            if model.deadline is None:
+                self.phase_timer.stop()
+            else:
+                remaining_ms = max(0, int((model.deadline - time.monotonic()) * 1000))
+                # Restart only when the phase changed, not on every input
+                if not self.phase_timer.isActive() or model.deadline != self._timer_deadline:
+                    self.phase_timer.start(remaining_ms)
+                self._timer_deadline = model.deadline
+        self.emit_outputs(emitted)
         self.update()
 
-    def _start_boost(self):
-        self.state = self.BOOST_STATE_BOOSTING
-        self.boost_timer.start(int(self.boost_duration_s * 1000))
-        self._recalculate_output()
-
-    def _end_boost(self):
-        if self.state == self.BOOST_STATE_BOOSTING:
-            self.state = self.BOOST_STATE_COOLDOWN
-            self.cooldown_timer.start(int(self.cooldown_duration_s * 1000))
-            self._recalculate_output()
-
-    def _end_cooldown(self):
-        self.state = self.BOOST_STATE_READY
-        self._recalculate_output()
-
     def get_hotspot_rects(self):
         return self.input_rects + [self.output_rect]
 
@@ -205,20 +184,18 @@ class BoostControlNode(BaseNode):
     def get_state(self):
         """Sammelt die spezifischen Werte dieses Nodes zum Speichern."""
         state = super().get_state()
-        state['boost_duration_s'] = self.boost_duration_s
-        state['cooldown_duration_s'] = self.cooldown_duration_s
-        state['boost_amount_us'] = self.boost_amount_us
+        state.update(self.model.get_params())
         return state
 
     def set_state(self, data):
         """Stellt den Zustand des Nodes aus den geladenen Daten wieder her."""
         super().set_state(data)
         # Lade die Werte aus den Daten, mit Standardwerten falls sie nicht existieren
-        self.boost_duration_s = data.get('boost_duration_s', 2.0)
-        self.cooldown_duration_s = data.get('cooldown_duration_s', 3.0)
-        self.boost_amount_us = data.get('boost_amount_us', 500)
+        self.model.boost_duration_s = data.get('boost_duration_s', 2.0)
+        self.model.cooldown_duration_s = data.get('cooldown_duration_s', 3.0)
+        self.model.boost_amount_us = data.get('boost_amount_us', 500)
 
         # Aktualisiere die Textfelder in der UI, damit sie die geladenen Werte anzeigen
-        self.boost_duration_edit.setText(str(self.boost_duration_s))
-        self.cooldown_duration_edit.setText(str(self.cooldown_duration_s))
-        self.boost_amount_edit.setText(str(self.boost_amount_us))
+        self.boost_duration_edit.setText(str(self.model.boost_duration_s))
+        self.cooldown_duration_edit.setText(str(self.model.cooldown_duration_s))
+        self.boost_amount_edit.setText(str(self.model.boost_amount_us))
@@ -2,6 +2,7 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLabel, QLineEdit, QWidget, QGridLayout, QGraphicsItem
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen, QPainterPath
+from engine import ChannelConfigModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class CurveVisualizer(QGraphicsItem):
@@ -24,18 +25,11 @@ class CurveVisualizer(QGraphicsItem):
         painter.setPen(QPen(QColor("#00BFFF"), 2))
         path = QPainterPath()
 
-        node = self.parent_node
+        model = self.parent_node.model
 
         for i in range(int(bounds.width()) + 1):
             x_norm = (i / bounds.width()) * 2.0 - 1.0
-
-            # Apply full calculation chain to get final normalized output
-            y_expo = (node.expo_amount * (x_norm ** 3)) + ((1 - node.expo_amount) * x_norm)
-            y_weighted = y_expo * (node.weight / 100.0)
-            y_us = 1500 + (y_weighted * 500)
-            y_offset_us = y_us + node.offset_us
-            y_final_norm = (y_offset_us - 1500) / 500.0
-            y_clamped = max(-1.0, min(1.0, y_final_norm))
+            y_clamped = model.curve(x_norm)
 
             y_pixel = bounds.height() - ((y_clamped + 1.0) / 2.0 * bounds.height())
 
@@ -44,13 +38,8 @@ class CurveVisualizer(QGraphicsItem):
         painter.drawPath(path)
 
         # Draw the current position dot
-        input_val = node.current_input_value
-        y_expo = (node.expo_amount * (input_val ** 3)) + ((1 - node.expo_amount) * input_val)
-        y_weighted = y_expo * (node.weight / 100.0)
-        y_us = 1500 + (y_weighted * 500)
-        y_offset_us = y_us + node.offset_us
-        y_final_norm = (y_offset_us - 1500) / 500.0
-        y_clamped = max(-1.0, min(1.0, y_final_norm))
+        input_val = model.inputs[0]
+        y_clamped = model.outputs[0]
 
         x_pixel = (input_val + 1.0) / 2.0 * bounds.width()
         y_pixel = bounds.height() - ((y_clamped + 1.0) / 2.0 * bounds.height())
@@ -61,29 +50,25 @@ class CurveVisualizer(QGraphicsItem):
 
 class ChannelConfigNode(BaseNode):
     def __init__(self, x=0, y=0, parent=None):
-        super().__init__(title="Channel Config", x=x, y=y, w=250, h=300, parent=parent)
+        super().__init__(title="Channel Config", x=x, y=y, w=250, h=300, parent=parent, model=ChannelConfigModel())
         self.inputs = 1
         self.inputs_occupied = [False]
         self.output_signal = NodeSignalEmitter()
         self.output_signals = [self.output_signal]
-
-        self.expo_amount = 0.0
-        self.weight = 100.0
-        self.offset_us = 0
-        self.current_input_value = 0.0
+        model = self.model
 
         # UI Elements
         widget = QWidget()
         layout = QGridLayout(widget)
         layout.setContentsMargins(5, 5, 5, 5)
         layout.addWidget(QLabel("Expo %:"), 0, 0)
-        self.expo_edit = QLineEdit(str(int(self.expo_amount * 100)))
+        self.expo_edit = QLineEdit(str(int(model.expo_amount * 100)))
         layout.addWidget(self.expo_edit, 0, 1)
         layout.addWidget(QLabel("Weight %:"), 1, 0)
-        self.weight_edit = QLineEdit(str(int(self.weight)))
+        self.weight_edit = QLineEdit(str(int(model.weight)))
         layout.addWidget(self.weight_edit, 1, 1)
         layout.addWidget(QLabel("Offset µs:"), 2, 0)
-        self.offset_edit = QLineEdit(str(self.offset_us))
+        self.offset_edit = QLineEdit(str(model.offset_us))
         layout.addWidget(self.offset_edit, 2, 1)
 
         edits = [self.expo_edit, self.weight_edit, self.offset_edit]
@@ -102,57 +87,50 @@ class ChannelConfigNode(BaseNode):
         self.output_rect = QRectF(self.width - 5, dot_y - 5, 10, 10)
 
     def _update_settings(self):
+        model = self.model
         try:
             expo_val = max(0, min(100, int(self.expo_edit.text())))
-            self.expo_amount = expo_val / 100.0
+            model.expo_amount = expo_val / 100.0
             self.expo_edit.setText(str(expo_val))
 
             weight_val = max(-1000, min(1000, int(self.weight_edit.text())))
-            self.weight = float(weight_val)
+            model.weight = float(weight_val)
             self.weight_edit.setText(str(weight_val))
 
             offset_val = max(-1000, min(1000, int(self.offset_edit.text())))
-            self.offset_us = offset_val
+            model.offset_us = offset_val
             self.offset_edit.setText(str(offset_val))
         except ValueError:
             # On invalid input, revert to saved values
-            self.expo_edit.setText(str(int(self.expo_amount * 100)))
-            self.weight_edit.setText(str(int(self.weight)))
-            self.offset_edit.setText(str(self.offset_us))
+            self._show_settings()
 
+        # Recalculate output with new settings
+        self.params_changed()
+        self.emit_outputs(self.model.evaluate())
         self.visualizer.update()
-        self.set_value(self.current_input_value) # Recalculate output with new settings
-
-    def set_value(self, value, input_index=0):
-        self.current_input_value = float(value)
 
-        y_expo = (self.expo_amount * (self.current_input_value ** 3)) + ((1 - self.expo_amount) * self.current_input_value)
-        y_weighted = y_expo * (self.weight / 100.0)
-        y_us = 1500 + (y_weighted * 500)
-        y_offset_us = y_us + self.offset_us
-        y_final_norm = (y_offset_us - 1500) / 500.0
+    def _show_settings(self):
+        model = self.model
+        self.expo_edit.setText(str(int(model.expo_amount * 100)))
+        self.weight_edit.setText(str(int(model.weight)))
+        self.offset_edit.setText(str(model.offset_us))
 
-        output_value = max(-1.0, min(1.0, y_final_norm))
+    def set_value(self, value, input_index=0):
+        self.emit_outputs(self.model.set_input(input_index, value))
+        self.visualizer.update()
 
-        self.output_signal.output_signal.emit(output_value, 0)
+    def refresh(self):
         self.visualizer.update()
 
     def get_state(self):
         state = super().get_state()
-        state['expo_amount'] = self.expo_amount
-        state['weight'] = self.weight
-        state['offset_us'] = self.offset_us
+        state.update(self.model.get_params())
         return state
 
     def set_state(self, data):
         super().set_state(data)
-        if 'expo_amount' in data: self.expo_amount = data['expo_amount']
-        if 'weight' in data: self.weight = data['weight']
-        if 'offset_us' in data: self.offset_us = data['offset_us']
-
-        self.expo_edit.setText(str(int(self.expo_amount * 100)))
-        self.weight_edit.setText(str(int(self.weight)))
-        self.offset_edit.setText(str(self.offset_us))
+        self.model.set_params(data)
+        self._show_settings()
         self.visualizer.update()
 
     def get_hotspot_rects(self):
@@ -2,6 +2,7 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLineEdit, QLabel, QWidget, QVBoxLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QBrush, QColor, QPen
+from engine import CustomLogicModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class CustomLogicNode(BaseNode):
@@ -11,19 +12,15 @@ class CustomLogicNode(BaseNode):
         line_height = 25
         content_height = inputs * line_height
         h = content_y_start + content_height
-        super().__init__(title="Custom Logic", x=x, y=y, w=250, h=h, parent=parent)
+        super().__init__(title="Custom Logic", x=x, y=y, w=250, h=h, parent=parent, model=CustomLogicModel(inputs))
 
         self.inputs = inputs
-        self.input_values = [0.0] * inputs
-        self.output_value = 0.0
         self.output_signal = NodeSignalEmitter()
         self.output_signals = [self.output_signal]
         self.inputs_occupied = [False] * self.inputs
 
         # UI Elements (positioned at the top)
-        self.formula_line_edit = QLineEdit()
-        if self.inputs == 1: self.formula_line_edit.setText("Y = X1")
-        else: self.formula_line_edit.setText("Y = X1 + X2")
+        self.formula_line_edit = QLineEdit(self.model.formula)
         self.formula_label = QLabel("Formula:")
         self.formula_line_edit.textChanged.connect(self.evaluate_formula)
 
@@ -49,36 +46,37 @@ class CustomLogicNode(BaseNode):
 
     def get_state(self):
         state = super().get_state()
-        state['inputs'] = self.inputs
-        state['formula'] = self.formula_line_edit.text()
+        state.update(self.model.get_params())
         return state
 
     def set_state(self, data):
         """Restores node state from a dictionary."""
         super().set_state(data)
         if 'formula' in data:
-            self.formula_line_edit.setText(data.get('formula', ''))
+            self.model.set_params(data)
+            self.formula_line_edit.setText(self.model.formula)
+            self._show_error()
 
     def set_value(self, value, input_index=0):
-        if input_index < len(self.input_values):
-            self.input_values[input_index] = value
-            self.evaluate_formula()
+        self.emit_outputs(self.model.set_input(input_index, value))
+        self.update()
 
     def evaluate_formula(self):
-        local_vars = {}
-        for i, val in enumerate(self.input_values):
-            local_vars[f"X{i+1}"] = val
-        formula_text = self.formula_line_edit.text().strip()
-        if formula_text.startswith("Y ="): formula_text = formula_text[3:].strip()
-        try:
-            result = eval(formula_text, {"__builtins__": None}, local_vars)
-            self.output_value = float(result)
-        except Exception as e:
-            print(f"Error evaluating formula: {e}")
-            self.output_value = 0.0
-        self.output_signal.output_signal.emit(self.output_value, 0)
+        self.model.formula = self.formula_line_edit.text()
+        self.params_changed()
+        self.emit_outputs(self.model.evaluate())
+        self._show_error()
+        self.update()
+
+    def refresh(self):
+        self._show_error()
         self.update()
 
+    def _show_error(self):
+        error = self.model.error
+        self.formula_label.setText(f"Formula: {error}" if error else "Formula:")
+        self.formula_label.setStyleSheet("color: #FF5252;" if error else "")
+
     def get_hotspot_rects(self):
         return self.input_rects + [self.output_rect]
 
@@ -1,13 +1,19 @@
 # nodes/joystick_node.py
 import pygame
-from PyQt5.QtCore import QRectF, QPointF, Qt, QTimer
+from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QBrush, QColor, QPen, QFontMetrics
+from engine import JoystickModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class JoystickNode(BaseNode):
-    def __init__(self, joystick_id, x=0, y=0, parent=None):
-        self.joystick = pygame.joystick.Joystick(joystick_id)
-        self.joystick.init()
+    """
+    Shows one joystick and exposes its axes, buttons and hats as outputs.
+    The node does not read the device itself; the JoystickInputService it is
+    registered with pushes changes to it through apply_changes().
+    """
+    def __init__(self, joystick_id, x=0, y=0, parent=None, input_service=None):
+        self.input_service = input_service
+        self.joystick = self._open_joystick(joystick_id)
 
         self.joystick_id = joystick_id
         self.instance_id = self.joystick.get_instance_id()
@@ -25,21 +31,21 @@ class JoystickNode(BaseNode):
         hat_height = 40
         h = 50 + (self.num_axes * item_height) + (self.num_buttons * item_height) + (self.num_hats * hat_height)
 
-        super().__init__(title=self.name, x=x, y=y, w=250, h=h, parent=parent)
+        super().__init__(title=self.name, x=x, y=y, w=250, h=h, parent=parent, model=self._create_model())
         self._finish_init()
 
     def cleanup(self):
-        """Stops and deletes the timer to prevent memory leaks."""
-        if self.poll_timer:
-            self.poll_timer.stop()
-            self.poll_timer.deleteLater() # Use deleteLater for safe Qt object removal
-            self.poll_timer = None
-            print(f"Cleaned up timer for Joystick: {self.name}")
+        """Unregisters from the input service so the node stops receiving input."""
+        if self.input_service:
+            self.input_service.unregister(self)
+            self.input_service = None
+            print(f"Unregistered Joystick node: {self.name}")
         super().cleanup()
 
     @classmethod
-    def create_disconnected(cls, node_data):
+    def create_disconnected(cls, node_data, input_service=None):
         instance = cls.__new__(cls)
+        instance.input_service = input_service
         instance.is_connected = False
         instance.joystick_id = -1
         instance.instance_id = -1
@@ -55,10 +61,9 @@ class JoystickNode(BaseNode):
         hat_height = 40
         h = 40 + (instance.num_axes * item_height) + (instance.num_buttons * item_height) + (instance.num_hats * hat_height)
 
-        super(JoystickNode, instance).__init__(title=f"{instance.name} (Disconnected)", x=node_data['x'], y=node_data['y'], w=250, h=h)
+        super(JoystickNode, instance).__init__(title=f"{instance.name} (Disconnected)", x=node_data['x'], y=node_data['y'], w=250, h=h,
+                                               model=instance._create_model())
         instance._finish_init()
-        if instance.poll_timer:
-            instance.poll_timer.stop()
         return instance
 
     def _initialize_properties(self, defaults=None):
@@ -73,31 +78,32 @@ class JoystickNode(BaseNode):
         else:
             self.num_axes, self.num_buttons, self.num_hats = 0, 0, 0
 
+    def _create_model(self):
+        return JoystickModel(self.num_axes, self.num_buttons, self.num_hats, self.guid, self.name)
+
     def _finish_init(self):
-        self.axis_values = [0.0] * self.num_axes
-        self.button_values = [0] * self.num_buttons
-        self.hat_values = [(0, 0)] * self.num_hats
-        self.poll_timer = QTimer()
-        self.poll_timer.setInterval(20)
-        self.poll_timer.timeout.connect(self.update_joystick_state)
-        if self.is_connected:
-            self.poll_timer.start()
         num_outputs = self.num_axes + self.num_buttons + (self.num_hats * 2)
         self.output_signals = [NodeSignalEmitter() for _ in range(num_outputs)]
+        if self.input_service:
+            self.input_service.register(self)
 
     def disconnect(self):
         self.is_connected = False
-        self.poll_timer.stop()
         self.title = f"{self.name} (Disconnected)"
         self.update()
 
+    def _open_joystick(self, joystick_id):
+        if self.input_service:
+            return self.input_service.open(joystick_id)
+        joystick = pygame.joystick.Joystick(joystick_id)
+        joystick.init()
+        return joystick
+
     def reconnect(self, new_joystick_id):
-        self.joystick = pygame.joystick.Joystick(new_joystick_id)
-        self.joystick.init()
+        self.joystick = self._open_joystick(new_joystick_id)
         self.joystick_id = new_joystick_id
         self.instance_id = self.joystick.get_instance_id()
         self.is_connected = True
-        self.poll_timer.start()
         self.title = self.name
         self.update()
         print(f"Reconnected '{self.name}' on ID {self.joystick_id}")
@@ -112,35 +118,18 @@ class JoystickNode(BaseNode):
         state['num_hats'] = self.num_hats
         return state
 
-    def update_joystick_state(self):
-        if not self.is_connected: return
-        pygame.event.pump()
-        needs_update = False
-        output_index = 0
-        for i in range(self.num_axes):
-            new_value = self.joystick.get_axis(i)
-            if abs(self.axis_values[i] - new_value) > 1e-9:
-                self.axis_values[i] = new_value
-                self.output_signals[output_index].output_signal.emit(new_value, 0)
-                needs_update = True
-            output_index += 1
-        for i in range(self.num_buttons):
-            new_value = float(self.joystick.get_button(i))
-            if self.button_values[i] != new_value:
-                self.button_values[i] = new_value
-                self.output_signals[output_index].output_signal.emit(new_value, 0)
-                needs_update = True
-            output_index += 1
-        for i in range(self.num_hats):
-            new_value = self.joystick.get_hat(i)
-            if self.hat_values[i] != new_value:
-                self.hat_values[i] = new_value
-                self.output_signals[output_index].output_signal.emit(float(new_value[0]), 0)
-                self.output_signals[output_index + 1].output_signal.emit(float(new_value[1]), 0)
-                needs_update = True
-            output_index += 2
-        if needs_update:
+    def apply_changes(self, changes):
+        """Updates and emits the given (output_index, value) pairs, as read by the input service."""
+        scene = self.scene()
+        if scene is not None and scene.evaluation_mode != scene.EVALUATION_SIGNALS:
+            scene.queue_changes(self.model, changes)
             self.update()
+            return
+        model = self.model
+        for output_index, value in changes:
+            model.set_output(output_index, value)
+            self.output_signals[output_index].output_signal.emit(value, 0)
+        self.update()
 
     def _get_y_for_output(self, index):
         item_height = 20
@@ -199,7 +188,7 @@ class JoystickNode(BaseNode):
             slider_y = y - 2.5
             painter.setBrush(QBrush(QColor("#333333")))
             painter.drawRect(int(80), int(slider_y), int(slider_width), 5)
-            fill_width = (self.axis_values[i] + 1.0) / 2.0 * slider_width
+            fill_width = (self.model.outputs[i] + 1.0) / 2.0 * slider_width
             painter.setBrush(QBrush(QColor("#00FF00")))
             painter.drawRect(int(80), int(slider_y), int(fill_width), 5)
             painter.setBrush(QBrush(QColor("#E0E0E0")))
@@ -215,7 +204,7 @@ class JoystickNode(BaseNode):
             button_y = y - (button_size / 2)
             painter.setBrush(QBrush(QColor("#333333")))
             painter.drawRect(int(button_x), int(button_y), button_size, button_size)
-            if self.button_values[i]:
+            if self.model.outputs[output_index]:
                 painter.setBrush(QBrush(QColor("#00FF00")))
                 painter.drawRect(int(button_x), int(button_y), button_size, button_size)
             painter.setBrush(QBrush(QColor("#E0E0E0")))
@@ -231,8 +220,9 @@ class JoystickNode(BaseNode):
             dpad_y = y_base + 7.5
             painter.setBrush(QBrush(QColor("#333333")))
             painter.drawRoundedRect(int(dpad_x), int(dpad_y), int(dpad_size), int(dpad_size), 3, 3)
-            dot_x = dpad_x + (dpad_size / 2) + (self.hat_values[i][0] * dpad_size / 2)
-            dot_y = dpad_y + (dpad_size / 2) - (self.hat_values[i][1] * dpad_size / 2)
+            hat_x, hat_y = self.model.outputs[output_index:output_index + 2]
+            dot_x = dpad_x + (dpad_size / 2) + (hat_x * dpad_size / 2)
+            dot_y = dpad_y + (dpad_size / 2) - (hat_y * dpad_size / 2)
             painter.setBrush(QBrush(QColor("#00FF00")))
             painter.drawEllipse(QPointF(dot_x, dot_y), 3, 3)
             y_x = self._get_y_for_output(output_index)
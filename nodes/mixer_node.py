@@ -2,17 +2,16 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLabel, QLineEdit, QWidget, QGridLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen
+from engine import MixerModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class MixerNode(BaseNode):
     def __init__(self, x=0, y=0, parent=None):
-        super().__init__(title="Mixer", x=x, y=y, w=220, h=230, parent=parent)
+        super().__init__(title="Mixer", x=x, y=y, w=220, h=230, parent=parent, model=MixerModel())
         self.inputs = 2
         self.inputs_occupied = [False] * self.inputs
         self.output_signals = [NodeSignalEmitter(), NodeSignalEmitter()]
-
-        self.input_values = [0.0, 0.0]
-        self.weights = { 'A1': 100, 'B1': 0, 'A2': 0, 'B2': 100 }
+        self.weights = self.model.weights
 
         # UI Elements at the top
         widget = QWidget()
@@ -55,26 +54,22 @@ class MixerNode(BaseNode):
 
     def _update_weights(self):
         try:
-            self.weights['A1'] = int(self.edit_A1.text()); self.weights['B1'] = int(self.edit_B1.text())
-            self.weights['A2'] = int(self.edit_A2.text()); self.weights['B2'] = int(self.edit_B2.text())
-            self._recalculate_outputs()
+            weights = {'A1': int(self.edit_A1.text()), 'B1': int(self.edit_B1.text()),
+                       'A2': int(self.edit_A2.text()), 'B2': int(self.edit_B2.text())}
         except ValueError:
             self.edit_A1.setText(str(self.weights['A1'])); self.edit_B1.setText(str(self.weights['B1']))
             self.edit_A2.setText(str(self.weights['A2'])); self.edit_B2.setText(str(self.weights['B2']))
+            return
+        self.weights.update(weights)
+        self.params_changed()
+        self._recalculate_outputs()
 
     def set_value(self, value, input_index=0):
-        if input_index < len(self.input_values):
-            self.input_values[input_index] = float(value)
-            self._recalculate_outputs()
+        self.emit_outputs(self.model.set_input(input_index, value))
+        self.update()
 
     def _recalculate_outputs(self):
-        in_a, in_b = self.input_values
-        w = self.weights
-        out_1 = (in_a * w['A1'] / 100.0) + (in_b * w['B1'] / 100.0)
-        out_2 = (in_a * w['A2'] / 100.0) + (in_b * w['B2'] / 100.0)
-        out_1 = max(-1.0, min(1.0, out_1)); out_2 = max(-1.0, min(1.0, out_2))
-        self.output_signals[0].output_signal.emit(out_1, 0)
-        self.output_signals[1].output_signal.emit(out_2, 0)
+        self.emit_outputs(self.model.evaluate())
         self.update()
 
     def get_hotspot_rects(self):
@@ -115,7 +110,8 @@ class MixerNode(BaseNode):
         """Restores node state from a dictionary."""
         super().set_state(data)
         if 'weights' in data:
-            self.weights = data['weights']
+            self.model.set_params(data)
+            self.weights = self.model.weights
             # Update the UI text boxes to match the loaded state
             self.edit_A1.setText(str(self.weights.get('A1', 100)))
             self.edit_B1.setText(str(self.weights.get('B1', 0)))
@@ -2,21 +2,16 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLineEdit, QLabel, QWidget, QGridLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen
+from engine import PedalControlModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class PedalControlNode(BaseNode):
     def __init__(self, x=0, y=0, parent=None):
-        super().__init__(title="Pedal Control", x=x, y=y, w=250, h=260, parent=parent)
+        super().__init__(title="Pedal Control", x=x, y=y, w=250, h=260, parent=parent, model=PedalControlModel())
         self.inputs = 2
         self.inputs_occupied = [False] * self.inputs
         self.output_signals = [NodeSignalEmitter()]
-
-        # State
-        self.throttle_limit = 100
-        self.brake_limit = 100
-        self.brake_deadzone = 5  # Default 5% deadzone for brake activation
-        self.center_us = 1500    # Default 1500us center point
-        self.input_values = [-1.0, -1.0] # [Throttle, Brake]
+        model = self.model
 
         # UI Elements
         widget = QWidget()
@@ -24,19 +19,19 @@ class PedalControlNode(BaseNode):
         layout.setContentsMargins(10, 5, 10, 5)
 
         layout.addWidget(QLabel("Throttle Limit %:"), 0, 0)
-        self.throttle_edit = QLineEdit(str(self.throttle_limit))
+        self.throttle_edit = QLineEdit(str(model.throttle_limit))
         layout.addWidget(self.throttle_edit, 0, 1)
 
         layout.addWidget(QLabel("Brake Limit %:"), 1, 0)
-        self.brake_edit = QLineEdit(str(self.brake_limit))
+        self.brake_edit = QLineEdit(str(model.brake_limit))
         layout.addWidget(self.brake_edit, 1, 1)
 
         layout.addWidget(QLabel("Brake Deadzone %:"), 2, 0)
-        self.deadzone_edit = QLineEdit(str(self.brake_deadzone))
+        self.deadzone_edit = QLineEdit(str(model.brake_deadzone))
         layout.addWidget(self.deadzone_edit, 2, 1)
 
         layout.addWidget(QLabel("Center (µs):"), 3, 0)
-        self.center_edit = QLineEdit(str(self.center_us))
+        self.center_edit = QLineEdit(str(model.center_us))
         layout.addWidget(self.center_edit, 3, 1)
 
         # Connect all edit fields to the same update function
@@ -60,79 +55,42 @@ class PedalControlNode(BaseNode):
         self.output_rect = QRectF(self.width - 5, output_y - 5, 10, 10)
 
     def _update_settings(self):
+        model = self.model
         try:
-            self.throttle_limit = max(0, min(100, int(self.throttle_edit.text())))
-            self.brake_limit = max(0, min(100, int(self.brake_edit.text())))
-            self.brake_deadzone = max(0, min(100, int(self.deadzone_edit.text())))
-            self.center_us = max(1000, min(2000, int(self.center_edit.text())))
+            model.throttle_limit = max(0, min(100, int(self.throttle_edit.text())))
+            model.brake_limit = max(0, min(100, int(self.brake_edit.text())))
+            model.brake_deadzone = max(0, min(100, int(self.deadzone_edit.text())))
+            model.center_us = max(1000, min(2000, int(self.center_edit.text())))
         except ValueError:
             pass # Ignore invalid input
 
-        self.throttle_edit.setText(str(self.throttle_limit))
-        self.brake_edit.setText(str(self.brake_limit))
-        self.deadzone_edit.setText(str(self.brake_deadzone))
-        self.center_edit.setText(str(self.center_us))
+        self._show_settings()
+        self.params_changed()
         self._recalculate_output()
 
+    def _show_settings(self):
+        model = self.model
+        self.throttle_edit.setText(str(model.throttle_limit))
+        self.brake_edit.setText(str(model.brake_limit))
+        self.deadzone_edit.setText(str(model.brake_deadzone))
+        self.center_edit.setText(str(model.center_us))
+
     def get_state(self):
         state = super().get_state()
-        state['throttle_limit'] = self.throttle_limit
-        state['brake_limit'] = self.brake_limit
-        state['brake_deadzone'] = self.brake_deadzone
-        state['center_us'] = self.center_us
+        state.update(self.model.get_params())
         return state
 
     def set_state(self, data):
         super().set_state(data)
-        if 'throttle_limit' in data:
-            self.throttle_limit = data['throttle_limit']
-            self.throttle_edit.setText(str(self.throttle_limit))
-        if 'brake_limit' in data:
-            self.brake_limit = data['brake_limit']
-            self.brake_edit.setText(str(self.brake_limit))
-        if 'brake_deadzone' in data:
-            self.brake_deadzone = data['brake_deadzone']
-            self.deadzone_edit.setText(str(self.brake_deadzone))
-        if 'center_us' in data:
-            self.center_us = data['center_us']
-            self.center_edit.setText(str(self.center_us))
+        self.model.set_params(data)
+        self._show_settings()
 
     def set_value(self, value, input_index=0):
-        if input_index < len(self.input_values):
-            self.input_values[input_index] = float(value)
-            self._recalculate_output()
+        self.emit_outputs(self.model.set_input(input_index, value))
+        self.update()
 
     def _recalculate_output(self):
-        raw_throttle, raw_brake = self.input_values
-
-        norm_throttle = (raw_throttle + 1.0) / 2.0
-        norm_brake = (raw_brake + 1.0) / 2.0
-
-        limited_throttle = norm_throttle * (self.throttle_limit / 100.0)
-        limited_brake = norm_brake * (self.brake_limit / 100.0)
-
-        combined_output = 0.0
-        # Brake has priority over throttle only if it's past the deadzone
-        if limited_brake > (self.brake_deadzone / 100.0):
-            combined_output = -limited_brake
-        elif limited_throttle > 0.01:
-            combined_output = limited_throttle
-
-        # Convert the [-1, 1] signal to microseconds using the custom center
-        span_positive = 2000 - self.center_us
-        span_negative = self.center_us - 1000
-
-        output_us = self.center_us
-        if combined_output > 0:
-            output_us = self.center_us + (combined_output * span_positive)
-        elif combined_output < 0:
-            output_us = self.center_us + (combined_output * span_negative)
-
-        # Re-normalize the microsecond value back to the standard [-1, 1] range for output
-        # This keeps it compatible with the PPM Channel Node
-        final_normalized_output = (output_us - 1500) / 500.0
-
-        self.output_signals[0].output_signal.emit(final_normalized_output, 0)
+        self.emit_outputs(self.model.evaluate())
         self.update()
 
     def paint(self, painter, option, widget=None):
@@ -2,17 +2,17 @@
 from PyQt5.QtWidgets import QStyleOptionButton, QStyle, QApplication
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QBrush, QColor, QPen
+import latency
+from engine import PPMChannelModel
 from .base_node import BaseNode
 
 class PPMChannelNode(BaseNode):
     def __init__(self, channel_number, x=0, y=0, parent=None, serial_manager=None):
-        super().__init__(title=f"PPM Channel {channel_number}", x=x, y=y, w=180, h=140, parent=parent)
+        super().__init__(title=f"PPM Channel {channel_number}", x=x, y=y, w=180, h=140, parent=parent,
+                         model=PPMChannelModel(channel_number))
         self.channel_number = channel_number
         self.serial_manager = serial_manager
         self.inputs = 1
-        self.inverted = False
-        self.current_value = 0.0
-        self.raw_input_value = 0.0
         self.inputs_occupied = [False]
 
         # Define local rects for interactive elements
@@ -34,7 +34,7 @@ class PPMChannelNode(BaseNode):
         opt = self.checkbox_option
         opt.rect = self.checkbox_rect.toRect() # Update the rect each time
         opt.state = QStyle.State_Enabled
-        if self.inverted:
+        if self.model.inverted:
             opt.state |= QStyle.State_On
         else:
             opt.state |= QStyle.State_Off
@@ -55,22 +55,23 @@ class PPMChannelNode(BaseNode):
         painter.setBrush(QBrush(QColor("#333333")))
         painter.drawRoundedRect(slider_rect, 3, 3)
 
-        fill_height = (self.current_value + 1.0) / 2.0 * slider_height
+        fill_height = (self.model.current_value + 1.0) / 2.0 * slider_height
         fill_rect = QRectF(slider_x, slider_y + slider_height - fill_height, slider_width, fill_height)
         painter.setBrush(QBrush(QColor("#00FF00")))
         painter.setPen(Qt.NoPen)
         painter.drawRect(fill_rect)
 
-        ppm_value = int(1500 + self.current_value * 500)
+        ppm_value = self.model.ppm_value
         painter.setPen(QPen(QColor("#E0E0E0")))
         painter.drawText(QPointF(15, self.height - 15), f"{ppm_value} µs")
 
     def mousePressEvent(self, event):
         # Handle clicks on our manually drawn checkbox
         if self.checkbox_rect.contains(event.pos()):
-            self.inverted = not self.inverted
+            self.model.inverted = not self.model.inverted
+            self.params_changed()
             self.update() # Trigger a repaint to show the new check state
-            self.set_value(self.raw_input_value) # Recalculate output
+            self.set_value(self.model.inputs[0]) # Recalculate output
             event.accept()
             return
         # Pass other clicks to the base class for dragging
@@ -84,31 +85,25 @@ class PPMChannelNode(BaseNode):
         return [QRectF(scene_pos.x() - 5, scene_pos.y() - 5, 10, 10)]
 
     def set_value(self, value, input_index=0):
-        val = float(value)
-        self.raw_input_value = val
+        self.model.set_input(input_index, value)
+        self.refresh()
 
-        if self.inverted:
-            val = -val
-
-        self.current_value = max(-1.0, min(1.0, val))
+    def refresh(self):
         self.update()
-
-        ppm_value = int(1500 + self.current_value * 500)
-        command = f"{self.channel_number}={ppm_value}"
         if self.serial_manager:
-            self.serial_manager.send_command(command)
+            self.serial_manager.set_channel(self.channel_number, self.model.ppm_value, latency.current_origin())
 
     def get_state(self):
         """Returns a dictionary of data to be saved."""
         state = super().get_state()
-        state['inverted'] = self.inverted
+        state['channel_number'] = self.channel_number
+        state.update(self.model.get_params())
         return state
 
     def set_state(self, data):
         """Restores node state from a dictionary."""
         super().set_state(data)
         if 'inverted' in data:
-            is_inverted = data.get('inverted', False)
-            self.inverted = is_inverted
+            self.model.set_params(data)
             # Trigger a repaint to ensure the manually drawn checkbox shows the correct state
             self.update()
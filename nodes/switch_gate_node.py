@@ -2,6 +2,7 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLabel, QWidget, QVBoxLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen
+from engine import SwitchGateModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class SwitchGateNode(BaseNode):
@@ -9,14 +10,11 @@ class SwitchGateNode(BaseNode):
     Selects between two inputs (A or B) based on a third switch input.
     """
     def __init__(self, x=0, y=0, parent=None):
-        super().__init__(title="Switch Gate", x=x, y=y, w=220, h=180, parent=parent)
+        super().__init__(title="Switch Gate", x=x, y=y, w=220, h=180, parent=parent, model=SwitchGateModel())
         self.inputs = 3
         self.inputs_occupied = [False] * self.inputs
         self.output_signals = [NodeSignalEmitter()]
 
-        # [Switch, Input A, Input B]
-        self.input_values = [-1.0, 0.0, 0.0]
-
         # --- UI Elements (at the top) ---
         self.status_label = QLabel("PASSING A")
         self.status_label.setAlignment(Qt.AlignCenter)
@@ -43,22 +41,14 @@ class SwitchGateNode(BaseNode):
         self._update_ui() # Set initial UI state
 
     def set_value(self, value, input_index=0):
-        if input_index < len(self.input_values):
-            self.input_values[input_index] = float(value)
-            self._recalculate_output()
-
-    def _recalculate_output(self):
-        switch_state = self.input_values[0]
-        input_a = self.input_values[1]
-        input_b = self.input_values[2]
-
-        output_value = input_b if switch_state > 0 else input_a
+        self.emit_outputs(self.model.set_input(input_index, value))
+        self._update_ui()
 
-        self.output_signals[0].output_signal.emit(output_value, 0)
+    def refresh(self):
         self._update_ui()
 
     def _update_ui(self):
-        switch_state = self.input_values[0]
+        switch_state = self.model.inputs[0]
         if switch_state > 0:
             self.status_label.setText("PASSING B")
             self.status_label.setStyleSheet("font-size: 22px; font-weight: bold; color: #FFFFFF; background-color: #4CAF50; border-radius: 5px; padding: 5px;")
@@ -0,0 +1,111 @@
+# nodes/telemetry_node.py
+from PyQt5.QtWidgets import QGraphicsProxyWidget, QLineEdit, QLabel, QWidget, QGridLayout
+from PyQt5.QtCore import QRectF, QPointF, Qt
+from PyQt5.QtGui import QColor, QPen
+from engine import TelemetryModel
+from .base_node import BaseNode, NodeSignalEmitter
+
+class TelemetryNode(BaseNode):
+    """
+    Source node for telemetry parsed from the serial link (see telemetry.py).
+    Each output follows one named field, e.g. 'rssi' or 'vbat', and carries
+    its raw value; an output only emits when its field is updated.
+    """
+    NUM_OUTPUTS = TelemetryModel.NUM_OUTPUTS
+
+    def __init__(self, x=0, y=0, parent=None, serial_manager=None):
+        super().__init__(title="Telemetry", x=x, y=y, w=250, h=270, parent=parent, model=TelemetryModel())
+        self.serial_manager = serial_manager
+        self.inputs = 0
+        self.inputs_occupied = []
+        self.output_signals = [NodeSignalEmitter() for _ in range(self.NUM_OUTPUTS)]
+
+        # UI Elements
+        widget = QWidget()
+        layout = QGridLayout(widget)
+        layout.setContentsMargins(10, 5, 10, 5)
+        self.field_edits = []
+        for i, name in enumerate(self.model.fields):
+            layout.addWidget(QLabel(f"Output {i + 1} field:"), i, 0)
+            edit = QLineEdit(name)
+            edit.editingFinished.connect(self._update_settings)
+            layout.addWidget(edit, i, 1)
+            self.field_edits.append(edit)
+
+        proxy = QGraphicsProxyWidget(self)
+        proxy.setWidget(widget)
+        proxy.setPos(5, 30)
+        proxy.resize(self.width - 10, 120)
+
+        # Connection dots at the bottom
+        y_start = 170
+        line_height = 25
+        self.output_rects = [QRectF(self.width - 5, y_start + i * line_height - 5, 10, 10)
+                             for i in range(self.NUM_OUTPUTS)]
+
+        if self.serial_manager:
+            self.serial_manager.telemetry_updated.connect(self.on_telemetry)
+
+    def cleanup(self):
+        if self.serial_manager:
+            try:
+                self.serial_manager.telemetry_updated.disconnect(self.on_telemetry)
+            except TypeError:
+                pass # Already disconnected
+        super().cleanup()
+
+    def _update_settings(self):
+        self.model.set_params({'fields': [edit.text() for edit in self.field_edits]})
+        self.params_changed()
+        self._show_fields()
+
+    def _show_fields(self):
+        for edit, name in zip(self.field_edits, self.model.fields):
+            edit.setText(name)
+        self.update()
+
+    def get_state(self):
+        state = super().get_state()
+        state.update(self.model.get_params())
+        return state
+
+    def set_state(self, data):
+        super().set_state(data)
+        if 'fields' in data:
+            self.model.set_params(data)
+            self._show_fields()
+
+    def on_telemetry(self, values):
+        changed = self.model.apply_values(values)
+        if changed:
+            self.emit_outputs(changed)
+            self.update()
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+        painter.setPen(QPen(QColor("#E0E0E0")))
+        painter.setBrush(QColor("#E0E0E0"))
+        model = self.model
+        for rect, name, value, received in zip(self.output_rects, model.fields, model.outputs, model.received):
+            if not name:
+                continue
+            text = f"{name}: {f'{value:g}' if received else '--'}"
+            painter.drawText(QPointF(15, rect.center().y() + 5), text)
+            painter.drawEllipse(rect.center(), 5, 5)
+
+    def get_hotspot_rects(self):
+        return list(self.output_rects)
+
+    def get_output_dot_positions(self):
+        return [self.mapToScene(rect.center()) for rect in self.output_rects]
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            for i, rect in enumerate(self.output_rects):
+                output_hotspot = QRectF(self.width - 10, rect.y(), 10, 10)
+                if output_hotspot.contains(event.pos()):
+                    pos = self.mapToScene(rect.center())
+                    self.scene().start_connection_drag(pos, self, i)
+                    event.accept()
+                    return
+        super().mousePressEvent(event)
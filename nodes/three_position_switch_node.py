@@ -2,20 +2,18 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLabel, QWidget, QVBoxLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen
+from engine import ThreePositionSwitchModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class ThreePositionSwitchNode(BaseNode):
     def __init__(self, x=0, y=0, parent=None):
-        super().__init__(title="3-Position Switch", x=x, y=y, w=220, h=160, parent=parent)
+        super().__init__(title="3-Position Switch", x=x, y=y, w=220, h=160, parent=parent,
+                         model=ThreePositionSwitchModel())
         self.inputs = 2
-        self.output_value = 0.000001
         self.inputs_occupied = [False] * self.inputs
         self.output_signal = NodeSignalEmitter()
         self.output_signals = [self.output_signal]
 
-        self.current_position = 1
-        self.last_input_states = [0.0, 0.0]
-
         # UI element at the top
         self.status_label = QLabel("MIDDLE")
         self.status_label.setAlignment(Qt.AlignCenter)
@@ -41,35 +39,27 @@ class ThreePositionSwitchNode(BaseNode):
         self._update_output_and_ui()
 
     def set_value(self, value, input_index=0):
-        current_input_value = float(value)
-        state_changed = False
-        if current_input_value > 0.5 and self.last_input_states[input_index] < 0.5:
-            if input_index == 0:
-                if self.current_position < 2:
-                    self.current_position += 1
-                    state_changed = True
-            elif input_index == 1:
-                if self.current_position > 0:
-                    self.current_position -= 1
-                    state_changed = True
-        self.last_input_states[input_index] = current_input_value
-        if state_changed:
+        if self.model.set_input(input_index, value):
             self._update_output_and_ui()
 
     def _update_output_and_ui(self):
-        if self.current_position == 0:
-            self.output_value = -1.0
+        self._update_ui()
+        self.emit_outputs(self.model.all_outputs)
+
+    def refresh(self):
+        self._update_ui()
+
+    def _update_ui(self):
+        position = self.model.current_position
+        if position == 0:
             self.status_label.setText("DOWN")
             self.status_label.setStyleSheet("font-size: 22px; font-weight: bold; color: #FFFFFF; background-color: #D32F2F; border-radius: 5px; padding: 5px;")
-        elif self.current_position == 1:
-            self.output_value = 0.000001
+        elif position == 1:
             self.status_label.setText("MIDDLE")
             self.status_label.setStyleSheet("font-size: 22px; font-weight: bold; color: #FFFFFF; background-color: #FBC02D; border-radius: 5px; padding: 5px;")
         else:
-            self.output_value = 1.0
             self.status_label.setText("UP")
             self.status_label.setStyleSheet("font-size: 22px; font-weight: bold; color: #FFFFFF; background-color: #4CAF50; border-radius: 5px; padding: 5px;")
-        self.output_signal.output_signal.emit(self.output_value, 0)
         self.update()
 
     def get_hotspot_rects(self):
@@ -2,18 +2,16 @@
 from PyQt5.QtWidgets import QGraphicsProxyWidget, QLabel, QWidget, QVBoxLayout
 from PyQt5.QtCore import QRectF, QPointF, Qt
 from PyQt5.QtGui import QColor, QPen
+from engine import ToggleModel
 from .base_node import BaseNode, NodeSignalEmitter
 
 class ToggleNode(BaseNode):
     def __init__(self, x=0, y=0, parent=None):
-        super().__init__(title="Toggle Switch", x=x, y=y, w=180, h=140, parent=parent)
+        super().__init__(title="Toggle Switch", x=x, y=y, w=180, h=140, parent=parent, model=ToggleModel())
         self.inputs = 1
-        self.output_value = -1.0
         self.inputs_occupied = [False]
         self.output_signal = NodeSignalEmitter()
         self.output_signals = [self.output_signal]
-        self.is_on = False
-        self.last_input_state = 0.0
 
         # UI Element at the top
         self.status_label = QLabel("OFF")
@@ -36,26 +34,27 @@ class ToggleNode(BaseNode):
         self._update_output_and_ui()
 
     def set_value(self, value, input_index=0):
-        current_input_value = float(value)
-        if current_input_value > 0.5 and self.last_input_state < 0.5:
-            self.is_on = not self.is_on
+        if self.model.set_input(input_index, value):
             self._update_output_and_ui()
-        self.last_input_state = current_input_value
 
     def _update_output_and_ui(self):
-        if self.is_on:
-            self.output_value = 1.0
+        self._update_ui()
+        self.emit_outputs(self.model.all_outputs)
+
+    def refresh(self):
+        self._update_ui()
+
+    def _update_ui(self):
+        if self.model.is_on:
             self.status_label.setText("ON")
             self.status_label.setStyleSheet(
                 "font-size: 24px; font-weight: bold; color: #FFFFFF; background-color: #4CAF50; border-radius: 5px; padding: 5px;"
             )
         else:
-            self.output_value = -1.0
             self.status_label.setText("OFF")
             self.status_label.setStyleSheet(
                 "font-size: 24px; font-weight: bold; color: #FFFFFF; background-color: #D32F2F; border-radius: 5px; padding: 5px;"
             )
-        self.output_signal.output_signal.emit(self.output_value, 0)
         self.update()
 
     def get_hotspot_rects(self):
@@ -0,0 +1,108 @@
+# receive_buffer.py
+import os
+
+
+class ReceiveRingBuffer:
+    """
+    Fixed-size ring buffer for bytes received from the adapter.
+
+    read_from_fd() reads straight into the free space with os.readv, so
+    receiving allocates nothing. Readers look at the buffered bytes through
+    views() (one or two memoryviews, the second one when the data wraps) and
+    release them with consume(). When more data arrives than fits, the
+    oldest bytes are discarded and counted in `overruns`, and `overrun` is
+    set: the buffered bytes may then start in the middle of a frame, so a
+    reader should skip to the next frame boundary and clear it.
+    """
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._size = 0
+        self.overruns = 0
+        self.overrun = False
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+        self.overrun = False
+
+    def _free_views(self):
+        end = (self._start + self._size) % self.capacity
+        free = self.capacity - self._size
+        first = min(free, self.capacity - end)
+        if first < free:
+            return [self._view[end:end + first], self._view[:free - first]]
+        return [self._view[end:end + first]]
+
+    def _make_room(self, byte_count):
+        excess = byte_count - (self.capacity - self._size)
+        if excess > 0:
+            self.consume(excess)
+            self.overruns += excess
+            self.overrun = True
+
+    def read_from_fd(self, fd):
+        """
+        Reads whatever the (non-blocking) descriptor has ready and returns the
+        number of bytes read, 0 if nothing was ready. A tty opened with
+        VMIN=0/VTIME=0 (as pyserial does) reads 0 bytes rather than failing
+        with EAGAIN, so 0 does not mean the device is gone; errors such as
+        EIO or ENODEV from an unplugged device are raised as OSError.
+        """
+        if self._size == self.capacity:
+            self._make_room(self.capacity // 2)
+        try:
+            byte_count = os.readv(fd, self._free_views())
+        except BlockingIOError:
+            return 0
+        self._size += byte_count
+        return byte_count
+
+    def write(self, data):
+        """Copies data in, for transports without a readable file descriptor."""
+        data = memoryview(data)
+        if len(data) > self.capacity:
+            self.overruns += len(data) - self.capacity
+            self.overrun = True
+            data = data[-self.capacity:]
+        self._make_room(len(data))
+        offset = 0
+        for view in self._free_views():
+            chunk = min(len(view), len(data) - offset)
+            view[:chunk] = data[offset:offset + chunk]
+            offset += chunk
+        self._size += len(data)
+        return len(data)
+
+    def views(self):
+        """Returns the buffered bytes, oldest first, as one or two memoryviews."""
+        first = min(self._size, self.capacity - self._start)
+        views = [self._view[self._start:self._start + first]]
+        if first < self._size:
+            views.append(self._view[:self._size - first])
+        return views
+
+    def contiguous(self):
+        """
+        Returns (buffer, start, end) such that buffer[start:end] holds the
+        buffered bytes in one piece, so parsers can use bytearray.find on them.
+        Wrapped data is rotated to the front of the buffer first.
+        """
+        if self._start + self._size > self.capacity:
+            self._buffer[:] = self._buffer[self._start:] + self._buffer[:self._start]
+            self._start = 0
+        return self._buffer, self._start, self._start + self._size
+
+    def peek(self):
+        """Returns a copy of all buffered bytes."""
+        return b"".join(self.views())
+
+    def consume(self, byte_count):
+        byte_count = min(byte_count, self._size)
+        self._start = (self._start + byte_count) % self.capacity
+        self._size -= byte_count
@@ -1,40 +1,115 @@
 import serial
 import serial.tools.list_ports
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer, Qt, QSocketNotifier
+import os
+import threading
 import time
+from array import array
+from frame_encoders import AsciiFrameEncoder, create_frame_encoder
+from transmit_thread import ChannelDoubleBuffer, TransmitThread
+from latency import LatencyTracker
+from transport_stats import TransportStats
+from receive_buffer import ReceiveRingBuffer
+from telemetry import TelemetryParser, create_telemetry_grammar
 
 class SerialManager(QObject):
     connection_status_changed = pyqtSignal(bool)
     log_message = pyqtSignal(str, bool)
     sps_updated = pyqtSignal(int) # New signal for the SPS value
+    sps_detail_updated = pyqtSignal(int, int) # (changed, keepalive) commands per second
+    transmit_error = pyqtSignal(str)
+    latency_updated = pyqtSignal(object) # LatencyTracker.summary(), once per second
+    stats_updated = pyqtSignal(object) # TransportStats snapshot dict, once per second
+    telemetry_updated = pyqtSignal(object) # {field: value}, at most once per transmit period
+
+    TRANSMIT_MODES = ("thread", "timer")
+    DEFAULT_CHANNEL_COUNT = 8
+    MAX_CHANNEL_COUNT = 64
+    MIN_TRANSMIT_RATE_HZ = 25
+    MAX_TRANSMIT_RATE_HZ = 500
+    BAUD_RATES = (9600, 19200, 38400, 57600, 115200, 230400, 460800, 921600)
+    # Fraction of the link's byte capacity frames may use; the rest is slack for jitter
+    WIRE_BUDGET_HEADROOM = 0.9
 
     def __init__(self):
         super().__init__()
         self.ser = None
+        self.fd = None # The port's descriptor, if it has one (not on Windows)
         self.port_name = None
         self.baud_rate = 115200
         self.is_raw_mode = False
 
-        self.channel_values = {i: 1500 for i in range(1, 9)}
+        # Channel N lives at index N - 1, in microseconds
+        self.channel_values = array('H', [1500] * self.DEFAULT_CHANNEL_COUNT)
         self.raw_log_batch = []
-        self.sps_counter = 0 # Counter for signals per second
+        self.stats = TransportStats()
+
+        # Whole frames are built by a pluggable encoder and sent with a single write
+        self.frame_encoder = AsciiFrameEncoder()
+        self._last_encoder_allocations = 0
+
+        # By default frames are sent from a dedicated real-time thread that reads the
+        # channel values through a double buffer; "timer" mode uses the GUI thread QTimer.
+        self.transmit_mode = "thread"
+        self.transmit_thread = None
+        self._channel_buffer = ChannelDoubleBuffer(self.channel_values)
+        self._transmit_failed = False
+        self.transmit_error.connect(self._on_transmit_error)
+
+        # Backpressure: frames are only written once the previous ones have drained
+        # to at most max_out_waiting bytes; the unwritten rest of a partial write is kept here
+        self.max_out_waiting = 0
+        self._pending_tail = bytearray()
+
+        # Delta mode only sends channels flagged in the dirty bitmap (bit N-1 = channel N),
+        # plus a full keepalive frame every keepalive_interval_ms.
+        self.delta_mode = False
+        self.keepalive_interval_ms = 500
+        self._dirty_mask = 0
+        self._dirty_lock = threading.Lock()
+        self._last_full_frame_ns = 0
 
-        # Timer for sending PPM data (50 Hz)
+        # Input-to-wire latency: the source timestamp of each channel's latest value
+        # (0 once taken for a frame) and rolling per-channel histograms of the measured
+        # latency. Origins are guarded by _dirty_lock and handed over with the dirty bits.
+        self._channel_origins = array('q', [0] * self.DEFAULT_CHANNEL_COUNT)
+        self.latency = LatencyTracker(self.DEFAULT_CHANNEL_COUNT)
+
+        # Output rate, checked against what the baud rate can carry (see wire_budget)
+        self.transmit_rate_hz = 50
+        self.requested_transmit_rate_hz = 50
+        self.auto_cap_rate = True
+
+        # Timer for sending PPM data in "timer" mode
         self.transmit_timer = QTimer(self)
+        self.transmit_timer.setTimerType(Qt.PreciseTimer)
         self.transmit_timer.setInterval(20)
         self.transmit_timer.timeout.connect(self._transmit_channel_data)
 
-        # Timer for reading incoming data
+        # Incoming data is read when the port's file descriptor becomes readable
+        # (read_notifier); the polling read_timer is only a fallback for ports without one
+        self.receive_buffer = ReceiveRingBuffer()
+        self.read_notifier = None
         self.read_timer = QTimer(self)
         self.read_timer.setInterval(50)
         self.read_timer.timeout.connect(self._read_serial_data)
 
+        # Received bytes are parsed into telemetry fields in place; unrecognised bytes
+        # go to the console. Updates are published at most once per transmit period.
+        self.telemetry_parser = TelemetryParser()
+        self._receive_pending = 0
+        self._receive_overruns = 0 # receive_buffer.overruns already reported
+        self._last_telemetry_ns = 0
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.setSingleShot(True)
+        self.telemetry_timer.timeout.connect(self._publish_telemetry)
+
         # New timer to batch log updates (5 Hz)
         self.log_update_timer = QTimer(self)
         self.log_update_timer.setInterval(200)
         self.log_update_timer.timeout.connect(self._emit_batched_logs)
 
-        # New timer to report the SPS count once per second
+        # Timer to aggregate and report the transport statistics once per second
         self.sps_timer = QTimer(self)
         self.sps_timer.setInterval(1000)
         self.sps_timer.timeout.connect(self._report_sps)
@@ -47,13 +122,22 @@ class SerialManager(QObject):
         if self.ser and self.ser.is_open:
             self.disconnect()
         try:
-            self.ser = serial.Serial(port_name, self.baud_rate, timeout=0)
+            self.ser = serial.Serial(port_name, self.baud_rate, timeout=0, write_timeout=0)
+            try:
+                self.fd = self.ser.fileno()
+            except (AttributeError, OSError, serial.SerialException):
+                self.fd = None
+            self._pending_tail = bytearray()
             self.port_name = port_name
             self.connection_status_changed.emit(True)
             self.log_message.emit(f"Connected to {port_name} at {self.baud_rate} baud.", False)
-            self.read_timer.start()
-            self.transmit_timer.start()
+            self.receive_buffer.clear()
+            self._receive_pending = 0
+            self._receive_overruns = self.receive_buffer.overruns
+            self._start_reader()
+            self._start_transmitter()
             self.log_update_timer.start()
+            self.stats.reset()
             self.sps_timer.start() # Start the SPS timer
             return True
         except serial.SerialException as e:
@@ -62,8 +146,9 @@ class SerialManager(QObject):
             return False
 
     def disconnect(self):
-        self.transmit_timer.stop()
-        self.read_timer.stop()
+        self._stop_transmitter()
+        self._stop_reader()
+        self.telemetry_timer.stop()
         self.log_update_timer.stop()
         self.sps_timer.stop() # Stop the SPS timer
         self.sps_updated.emit(0) # Reset SPS display to 0
@@ -73,51 +158,436 @@ class SerialManager(QObject):
             self.log_message.emit("Disconnected.", False)
             self.connection_status_changed.emit(False)
         self.ser = None
+        self.fd = None
+
+    def _start_reader(self):
+        if self.fd is None:
+            self.read_timer.start()
+            return
+        self.read_notifier = QSocketNotifier(self.fd, QSocketNotifier.Read, self)
+        self.read_notifier.activated.connect(self._read_serial_data)
+
+    def _stop_reader(self):
+        self.read_timer.stop()
+        if self.read_notifier:
+            self.read_notifier.setEnabled(False)
+            self.read_notifier.deleteLater()
+            self.read_notifier = None
+
+    def _start_transmitter(self):
+        self._transmit_failed = False
+        if self.transmit_mode == "thread":
+            self._channel_buffer.publish(self.channel_values)
+            self.transmit_thread = TransmitThread(self._transmit_from_thread, 1000.0 / self.transmit_rate_hz)
+            self.transmit_thread.start()
+        else:
+            self.transmit_timer.start()
+
+    def _stop_transmitter(self):
+        self.transmit_timer.stop()
+        if self.transmit_thread:
+            self.transmit_thread.stop()
+            self.transmit_thread = None
+
+    def set_transmit_mode(self, mode):
+        """Selects the transmit driver: the real-time "thread" or the GUI "timer"."""
+        if mode not in self.TRANSMIT_MODES:
+            self.log_message.emit(f"Unknown transmit mode: {mode}", False)
+            return
+        is_running = self.ser is not None and self.ser.is_open
+        if is_running:
+            self._stop_transmitter()
+        self.transmit_mode = mode
+        if is_running:
+            self._start_transmitter()
+        self.log_message.emit(f"Transmit mode set to '{mode}'.", False)
+
+    def set_delta_mode(self, enabled):
+        """Enables change-only transmission with a periodic full keepalive frame."""
+        self.delta_mode = bool(enabled)
+        self._last_full_frame_ns = 0 # Start with a full frame
+        state = "enabled" if self.delta_mode else "disabled"
+        self.log_message.emit(f"Delta transmission {state} (keepalive every {self.keepalive_interval_ms} ms).", False)
+
+    def set_keepalive_interval(self, interval_ms):
+        self.keepalive_interval_ms = max(1, int(interval_ms))
+
+    def wire_budget(self, rate_hz=None):
+        """
+        Compares the bytes a full frame needs at rate_hz (default: the current rate)
+        with the link's capacity (baud / 10 for 8N1). Delta frames are smaller,
+        but keepalive frames are full, so the full frame is the budget.
+        """
+        rate_hz = rate_hz or self.transmit_rate_hz
+        bytes_per_frame = self.frame_encoder.frame_size(len(self.channel_values))
+        capacity = self.baud_rate / 10.0
+        return {
+            "rate_hz": rate_hz,
+            "bytes_per_frame": bytes_per_frame,
+            "bytes_per_s": bytes_per_frame * rate_hz,
+            "capacity_bytes_per_s": capacity,
+            "utilization": bytes_per_frame * rate_hz / capacity,
+            "max_rate_hz": int(capacity * self.WIRE_BUDGET_HEADROOM / bytes_per_frame),
+        }
+
+    def set_transmit_rate(self, rate_hz):
+        """
+        Sets the output rate (25-500 Hz). If the link cannot carry it, the rate is
+        capped to the wire budget when auto_cap_rate is set, otherwise a warning
+        is logged and the rate is applied anyway.
+        """
+        self.requested_transmit_rate_hz = max(self.MIN_TRANSMIT_RATE_HZ, min(self.MAX_TRANSMIT_RATE_HZ, int(rate_hz)))
+        self._apply_transmit_rate()
+
+    def set_baud_rate(self, baud_rate):
+        self.baud_rate = int(baud_rate)
+        if self.ser and self.ser.is_open:
+            try:
+                self.ser.baudrate = self.baud_rate
+            except (serial.SerialException, ValueError) as e:
+                self.log_message.emit(f"Error setting baud rate: {e}", False)
+        self.log_message.emit(f"Baud rate set to {self.baud_rate}.", False)
+        self._apply_transmit_rate()
+
+    def set_auto_cap_rate(self, enabled):
+        self.auto_cap_rate = bool(enabled)
+        self._apply_transmit_rate()
+
+    def _apply_transmit_rate(self):
+        """Re-checks the requested rate against the wire budget and applies the result."""
+        rate_hz = self.requested_transmit_rate_hz
+        budget = self.wire_budget(rate_hz)
+        if budget["utilization"] > self.WIRE_BUDGET_HEADROOM:
+            if self.auto_cap_rate:
+                rate_hz = max(self.MIN_TRANSMIT_RATE_HZ, min(rate_hz, budget["max_rate_hz"]))
+                self.log_message.emit(
+                    f"{self.requested_transmit_rate_hz} Hz needs {budget['bytes_per_s']:.0f} B/s but "
+                    f"{self.baud_rate} baud carries {budget['capacity_bytes_per_s']:.0f} B/s; "
+                    f"rate capped to {rate_hz} Hz.", False)
+            else:
+                self.log_message.emit(
+                    f"Warning: {rate_hz} Hz uses {budget['utilization']:.0%} of the {self.baud_rate} baud link "
+                    f"({budget['bytes_per_frame']} B/frame); out_waiting will grow.", False)
+            if self.wire_budget(rate_hz)["utilization"] > 1.0:
+                self.log_message.emit(
+                    f"Warning: even {rate_hz} Hz saturates {self.baud_rate} baud with "
+                    f"{len(self.channel_values)} channels; use a higher baud rate or the binary encoder.", False)
+
+        self.transmit_rate_hz = rate_hz
+        self.transmit_timer.setInterval(max(1, round(1000 / rate_hz)))
+        if self.transmit_thread:
+            self.transmit_thread.period_ns = int(1e9 / rate_hz)
+
+    def set_frame_encoder(self, name):
+        """Switches the wire format used for outgoing frames."""
+        try:
+            self.frame_encoder = create_frame_encoder(name)
+            self._last_encoder_allocations = 0
+            self.log_message.emit(f"Frame encoder set to '{name}'.", False)
+            self._apply_transmit_rate()
+        except ValueError as e:
+            self.log_message.emit(str(e), False)
+
+    def set_channel_count(self, count):
+        """Resizes the channel storage (and therefore every frame) to count channels."""
+        count = max(1, min(self.MAX_CHANNEL_COUNT, int(count)))
+        if count == len(self.channel_values):
+            return
+        is_running = self.ser is not None and self.ser.is_open
+        if is_running:
+            self._stop_transmitter()
+
+        values = self.channel_values[:count]
+        values.extend([1500] * (count - len(values)))
+        self.channel_values = values
+        self._channel_buffer = ChannelDoubleBuffer(values)
+        self._channel_origins = array('q', [0] * count)
+        self.latency.resize(count)
+        with self._dirty_lock:
+            self._dirty_mask = 0
+        self._last_full_frame_ns = 0
+
+        if is_running:
+            self._start_transmitter()
+        self.log_message.emit(f"Channel count set to {count}.", False)
+        self._apply_transmit_rate()
+
+    def set_channel(self, channel, microseconds, origin_ns=0):
+        """
+        Sets a single channel (1-based) to a pulse width in microseconds.
+        origin_ns is the monotonic time the driving input was read, if known.
+        """
+        index = channel - 1
+        if not 0 <= index < len(self.channel_values):
+            return
+        value = max(0, min(0xFFFF, int(microseconds)))
+        if self.channel_values[index] != value:
+            self.channel_values[index] = value
+            self._mark_dirty(1 << index, origin_ns)
+
+    def set_channels(self, channel_slice, values, origin_ns=0):
+        """
+        Sets several channels at once. channel_slice indexes channel_values
+        (channel N is index N - 1), e.g. slice(0, 4) for channels 1-4.
+        """
+        channel_values = self.channel_values
+        mask = 0
+        for index, microseconds in zip(range(*channel_slice.indices(len(channel_values))), values):
+            value = max(0, min(0xFFFF, int(microseconds)))
+            if channel_values[index] != value:
+                channel_values[index] = value
+                mask |= 1 << index
+        if mask:
+            self._mark_dirty(mask, origin_ns)
+
+    def _mark_dirty(self, mask, origin_ns=0):
+        # Publish before flagging, so the thread never sends a dirty channel's old value
+        if self.transmit_thread:
+            self._channel_buffer.publish(self.channel_values)
+        origins = self._channel_origins
+        with self._dirty_lock:
+            self._dirty_mask |= mask
+            while mask:
+                lowest_bit = mask & -mask
+                origins[lowest_bit.bit_length() - 1] = origin_ns
+                mask ^= lowest_bit
 
     def send_command(self, command):
+        """Compatibility shim for 'N=VALUE' strings, e.g. from the debug console."""
         try:
             channel_str, value_str = command.split('=')
-            channel = int(channel_str)
-            value = int(value_str)
-            if 1 <= channel <= 8:
-                self.channel_values[channel] = value
+            self.set_channel(int(channel_str), int(value_str))
         except ValueError:
             self.log_message.emit(f"Invalid command format: {command}", False)
 
+    def _next_frame_channels(self):
+        """
+        Consumes the dirty bitmap and returns (channels, changed, origins), where
+        changed lists the channels modified since the last frame, origins their
+        latency origin timestamps (taken along with the dirty bits), and channels
+        lists the channels for the next frame, or is None for all of them. Only
+        the set bits are visited, so the cost scales with the number of changes.
+        """
+        changed = []
+        origins = []
+        channel_origins = self._channel_origins
+        with self._dirty_lock:
+            mask, self._dirty_mask = self._dirty_mask, 0
+            while mask:
+                lowest_bit = mask & -mask
+                index = lowest_bit.bit_length() - 1
+                changed.append(index + 1)
+                origins.append(channel_origins[index])
+                channel_origins[index] = 0
+                mask ^= lowest_bit
+
+        now = time.monotonic_ns()
+        if not self.delta_mode or now - self._last_full_frame_ns >= self.keepalive_interval_ms * 1_000_000:
+            self._last_full_frame_ns = now
+            return None, changed, origins
+        return changed, changed, origins
+
     def _transmit_channel_data(self):
+        """QTimer tick: encodes and sends the current values on the GUI thread."""
         if self.ser and self.ser.is_open:
-            try:
-                for channel, value in self.channel_values.items():
-                    command_str = f"{channel}={value}"
-                    self.ser.write(command_str.encode())
-                    self.sps_counter += 1 # Increment for each command sent
+            values = self.channel_values
+            self._transmit(lambda encoder, channels, changed: encoder.encode(values, channels, changed))
+
+    def _transmit_from_thread(self):
+        """TransmitThread tick: encodes a consistent snapshot from the double buffer."""
+        ser = self.ser
+        if ser and ser.is_open and not self._transmit_failed:
+            buffer = self._channel_buffer
+            self._transmit(lambda encoder, channels, changed: buffer.read_with(
+                lambda values: encoder.encode(values, channels, changed)))
+
+    def _transmit(self, encode):
+        channels, changed, origins = self._next_frame_channels()
+        if channels == []:
+            return
+        try:
+            if self._link_is_backlogged():
+                self._drop_frame(channels, changed, origins)
+                return
+            encoder = self.frame_encoder
+            frame = encode(encoder, channels, changed)
+            command_count = len(self.channel_values) if channels is None else len(channels)
+            self._write_frame(encoder, frame, command_count, changed, origins)
+        except serial.SerialException as e:
+            # Only report once; the GUI thread tears the connection down
+            if not self._transmit_failed:
+                self._transmit_failed = True
+                self.transmit_error.emit(str(e))
+
+    def _link_is_backlogged(self):
+        """
+        Pushes out the rest of a partially written frame and reports whether the
+        link is still busy with earlier data (more than max_out_waiting bytes queued).
+        """
+        if self._pending_tail:
+            write_start_ns = time.monotonic_ns()
+            written = self._write(self._pending_tail)
+            self.stats.record_write(written, write_start_ns, time.monotonic_ns())
+            del self._pending_tail[:written]
+            if self._pending_tail:
+                return True
+        try:
+            waiting = self.ser.out_waiting
+        except (OSError, AttributeError, NotImplementedError):
+            waiting = 0
+        self.stats.sample_out_waiting(waiting)
+        return waiting > self.max_out_waiting
+
+    def _drop_frame(self, channels, changed, origins):
+        """
+        Skips this tick's frame instead of queueing it behind a backlog (latest wins).
+        Its changes are flagged dirty again, so the next frame carries the freshest
+        values for them; a skipped keepalive is retried on the next tick.
+        """
+        if changed:
+            channel_origins = self._channel_origins
+            with self._dirty_lock:
+                for channel, origin_ns in zip(changed, origins):
+                    bit = 1 << (channel - 1)
+                    if not self._dirty_mask & bit: # Otherwise a newer value brought its own origin
+                        self._dirty_mask |= bit
+                        channel_origins[channel - 1] = origin_ns
+        if channels is None:
+            self._last_full_frame_ns = 0
+        self.stats.record_drop(coalesced=bool(changed))
+
+    def _write(self, data):
+        """
+        Writes as much of data as the OS takes right now and returns the byte count.
+        pyserial opens the port non-blocking, so os.write() returns a short count
+        (or raises BlockingIOError) on a full buffer. pyserial's own write() would
+        instead spin until everything is written, even with write_timeout=0, so it
+        is only used for ports without a descriptor (Windows).
+        """
+        if self.fd is None:
+            return self.ser.write(data) or 0
+        try:
+            return os.write(self.fd, data)
+        except BlockingIOError:
+            return 0
+        except OSError as e:
+            raise serial.SerialException(f"write failed: {e}") from e
+
+    def _write_frame(self, encoder, frame, command_count, changed, origins):
+        write_start_ns = time.monotonic_ns()
+        written = self._write(frame)
+        written_ns = time.monotonic_ns()
+        if written < len(frame):
+            # Non-blocking write: the rest must go out before any other frame
+            self._pending_tail = bytearray(frame[written:])
+            self.stats.partial_writes += 1
+        self.stats.record_frame(written, command_count, len(changed), write_start_ns, written_ns)
+        for channel, origin_ns in zip(changed, origins):
+            if origin_ns:
+                self.latency.record(channel, written_ns - origin_ns)
+
+        if self.is_raw_mode:
+            self.raw_log_batch.append(f"Sent: {encoder.describe(frame)}")
 
-                    if self.is_raw_mode:
-                        self.raw_log_batch.append(f"Sent: {command_str}")
-            except serial.SerialException as e:
-                self.log_message.emit(f"Error sending data: {e}", False)
-                self.disconnect()
+    def _on_transmit_error(self, message):
+        self.log_message.emit(f"Error sending data: {message}", False)
+        self.disconnect()
 
     def _read_serial_data(self):
-        if self.ser and self.ser.is_open and self.ser.in_waiting > 0:
-            data = self.ser.read_all()
-            if self.is_raw_mode:
-                self.raw_log_batch.append(f"Received (raw): {data}")
+        if not (self.ser and self.ser.is_open):
+            return
+        try:
+            if self.read_notifier:
+                # self.fd, not read_notifier.socket(): PyQt5 returns that as a sip.voidptr
+                byte_count = self.receive_buffer.read_from_fd(self.fd)
+                if not byte_count:
+                    # A spurious wakeup, or a hung-up (unplugged) tty, which reads 0 bytes
+                    # forever; ioctls on the latter fail with EIO, so this raises OSError
+                    self.ser.in_waiting
+            elif self.ser.in_waiting > 0:
+                byte_count = self.receive_buffer.write(self.ser.read(self.ser.in_waiting))
             else:
-                try:
-                    decoded_data = data.decode('utf-8', errors='ignore').strip()
-                    if decoded_data:
-                        self.log_message.emit(f"Received: {decoded_data}", False)
-                except UnicodeDecodeError:
-                    self.log_message.emit(f"Received (raw): {data}", True)
+                return
+        except (serial.SerialException, OSError) as e:
+            # Without this the notifier would keep firing on the dead descriptor
+            self.log_message.emit(f"Error reading data: {e}", False)
+            self.disconnect()
+            return
+        if byte_count:
+            self.stats.record_read(byte_count)
+            self._process_received()
+
+    def _process_received(self):
+        overruns = self.receive_buffer.overruns
+        if overruns != self._receive_overruns:
+            self.log_message.emit(f"Receive buffer overrun: {overruns - self._receive_overruns} bytes dropped.", False)
+            self._receive_overruns = overruns
+        self.telemetry_parser.feed(self.receive_buffer, self._log_received)
+        if self.telemetry_parser.updated and not self.telemetry_timer.isActive():
+            period_ns = 1_000_000_000 // self.transmit_rate_hz
+            wait_ns = self._last_telemetry_ns + period_ns - time.monotonic_ns()
+            self.telemetry_timer.start(max(0, wait_ns // 1_000_000))
+
+    def _publish_telemetry(self):
+        self._last_telemetry_ns = time.monotonic_ns()
+        self.telemetry_updated.emit(self.telemetry_parser.take_values())
+
+    def _log_received(self, data):
+        if self.is_raw_mode:
+            self.raw_log_batch.append(f"Received (raw): {data}")
+        else:
+            decoded_data = data.decode('utf-8', errors='ignore').strip()
+            if decoded_data:
+                self.log_message.emit(f"Received: {decoded_data}", False)
+
+    def set_telemetry_grammar(self, name):
+        try:
+            self.telemetry_parser.grammar = create_telemetry_grammar(name)
+            self.log_message.emit(f"Telemetry grammar set to '{name}'.", False)
+            return True
+        except ValueError as e:
+            self.log_message.emit(str(e), False)
+            return False
 
     def _emit_batched_logs(self):
+        # An unterminated reply that has not grown since the last batch will not be completed
+        pending = len(self.receive_buffer)
+        if pending and pending == self._receive_pending:
+            self.telemetry_parser.flush(self.receive_buffer, self._log_received)
+            pending = 0
+        self._receive_pending = pending
+
         if self.raw_log_batch:
-            full_log_message = "\n".join(self.raw_log_batch)
+            # Swap rather than clear, the transmit thread may be appending concurrently
+            batch, self.raw_log_batch = self.raw_log_batch, []
+            full_log_message = "\n".join(batch)
             self.log_message.emit(full_log_message, True)
-            self.raw_log_batch.clear()
 
     def _report_sps(self):
-        """Called once per second to report the signal count and reset it."""
-        self.sps_updated.emit(self.sps_counter)
-        self.sps_counter = 0
+        """Called once per second to aggregate and publish the transport statistics."""
+        if self.ser and self.ser.is_open:
+            try:
+                self.stats.sample_out_waiting(self.ser.out_waiting)
+            except (serial.SerialException, OSError):
+                pass
+        snapshot = self.stats.aggregate()
+        snapshot["encoder_allocations_per_s"] = self.frame_encoder.allocations - self._last_encoder_allocations
+        self._last_encoder_allocations = self.frame_encoder.allocations
+        if self.transmit_thread:
+            snapshot["max_lateness_ms"] = self.transmit_thread.max_lateness_ns / 1e6
+            snapshot["missed_deadlines"] = self.transmit_thread.missed_deadlines
+            self.transmit_thread.max_lateness_ns = 0
+
+        self.sps_updated.emit(round(snapshot["commands_per_s"]))
+        self.sps_detail_updated.emit(round(snapshot["changed_commands_per_s"]),
+                                     round(snapshot["keepalive_commands_per_s"]))
+        self.stats_updated.emit(snapshot)
+        self.latency_updated.emit(self.latency.summary())
+
+        if self.is_raw_mode and snapshot["frames_per_s"]:
+            self.raw_log_batch.append(
+                f"TX/s [{self.frame_encoder.name}]: {snapshot['frames_per_s']:.0f} frames, "
+                f"{snapshot['write_calls_per_s']:.0f} writes, {snapshot['bytes_written_per_s']:.0f} bytes, "
+                f"{snapshot['commands_per_s']:.0f} commands ({snapshot['changed_commands_per_s']:.0f} changed, "
+                f"{snapshot['keepalive_commands_per_s']:.0f} keepalive), "
+                f"{snapshot['encoder_allocations_per_s']} buffer allocations")
@@ -0,0 +1,153 @@
+# telemetry.py
+"""
+Streaming parser for telemetry sent back by the adapter or receiver
+(link quality, RSSI, battery voltage, ...).
+
+The parser works directly on the ReceiveRingBuffer: each grammar finds
+complete frames in the buffered bytes and parses them into named float
+fields. The latest value of every field is kept in TelemetryParser.values.
+Bytes that no grammar recognises are handed back to the caller so they
+can still be shown in the console.
+"""
+
+
+class KeyValueLineGrammar:
+    """
+    Newline-terminated lines of 'KEY=VALUE' or 'KEY:VALUE' pairs separated by
+    spaces, commas or semicolons, e.g. b"RSSI=-67 LQ=100 VBAT=11.92\\r\\n".
+    Keys are lower-cased. A line is only recognised if every token parses.
+    Purely numeric keys are rejected, so 'N=VALUE' channel commands echoed
+    back by the adapter are not mistaken for telemetry.
+    """
+    name = "keyvalue"
+
+    def frame_end(self, buffer, start, end):
+        newline = buffer.find(b"\n", start, end)
+        return -1 if newline < 0 else newline + 1
+
+    def parse(self, buffer, start, end, fields):
+        tokens = bytes(buffer[start:end]).replace(b",", b" ").replace(b";", b" ").split()
+        if not tokens:
+            return False
+        parsed = []
+        for token in tokens:
+            key, separator, value = token.partition(b"=")
+            if not separator:
+                key, separator, value = token.partition(b":")
+            if not separator or not key or key.isdigit():
+                return False
+            try:
+                parsed.append((key.decode("ascii").lower(), float(value)))
+            except (UnicodeDecodeError, ValueError):
+                return False
+        fields.update(parsed)
+        return True
+
+
+class CsvLineGrammar:
+    """
+    Newline-terminated lines of comma-separated numbers with a fixed field
+    order, e.g. CsvLineGrammar(("rssi", "lq", "vbat")) for b"-67,100,11.92\\n".
+    """
+    name = "csv"
+
+    def __init__(self, field_names=("rssi", "lq", "vbat")):
+        self.field_names = tuple(field_names)
+
+    def frame_end(self, buffer, start, end):
+        newline = buffer.find(b"\n", start, end)
+        return -1 if newline < 0 else newline + 1
+
+    def parse(self, buffer, start, end, fields):
+        values = bytes(buffer[start:end]).split(b",")
+        if len(values) != len(self.field_names):
+            return False
+        try:
+            parsed = [float(value) for value in values]
+        except ValueError:
+            return False
+        fields.update(zip(self.field_names, parsed))
+        return True
+
+
+TELEMETRY_GRAMMARS = {
+    KeyValueLineGrammar.name: KeyValueLineGrammar,
+    CsvLineGrammar.name: CsvLineGrammar,
+}
+
+
+def create_telemetry_grammar(name):
+    """Creates a telemetry grammar by its registered name (see TELEMETRY_GRAMMARS)."""
+    try:
+        return TELEMETRY_GRAMMARS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown telemetry grammar: {name}") from None
+
+
+class TelemetryParser:
+    """
+    Incremental frame parser over a ReceiveRingBuffer.
+
+    A grammar provides frame_end(buffer, start, end), returning the end of the
+    next complete frame or -1 if it is still incomplete, and
+    parse(buffer, start, end, fields), which stores the frame's fields in the
+    given dict and returns whether it recognised the frame. An incomplete
+    frame longer than MAX_FRAME bytes is given up on and reported as unparsed.
+    After the ring buffer overran, the bytes up to the end of the first
+    frame are only a fragment of one: they are reported as unparsed (and
+    counted in bytes_skipped) without going through the grammar, so a cut
+    line like b"SI=-60" never becomes a field.
+    """
+    MAX_FRAME = 256
+
+    def __init__(self, grammar=None):
+        self.grammar = grammar or KeyValueLineGrammar()
+        self.values = {}
+        self.updated = False
+        self.frames_parsed = 0
+        self.bytes_unparsed = 0
+        self.bytes_skipped = 0
+
+    def feed(self, ring_buffer, on_unparsed):
+        """Parses every complete frame in ring_buffer and consumes it; on_unparsed(bytes) gets the rest."""
+        buffer, start, end = ring_buffer.contiguous()
+        grammar = self.grammar
+        position = start
+        if ring_buffer.overrun and position < end:
+            # Resynchronise: drop the fragment up to the next frame boundary
+            frame_end = grammar.frame_end(buffer, position, end)
+            skipped_end = end if frame_end < 0 else frame_end
+            self.bytes_skipped += skipped_end - position
+            self._unparsed(buffer, position, skipped_end, on_unparsed)
+            position = skipped_end
+            ring_buffer.overrun = frame_end < 0
+        while position < end:
+            frame_end = grammar.frame_end(buffer, position, end)
+            if frame_end < 0:
+                if end - position > self.MAX_FRAME:
+                    self._unparsed(buffer, position, end, on_unparsed)
+                    position = end
+                break
+            if grammar.parse(buffer, position, frame_end, self.values):
+                self.frames_parsed += 1
+                self.updated = True
+            else:
+                self._unparsed(buffer, position, frame_end, on_unparsed)
+            position = frame_end
+        ring_buffer.consume(position - start)
+
+    def flush(self, ring_buffer, on_unparsed):
+        """Hands an incomplete trailing frame to on_unparsed, e.g. once the line has gone quiet."""
+        buffer, start, end = ring_buffer.contiguous()
+        if end > start:
+            self._unparsed(buffer, start, end, on_unparsed)
+            ring_buffer.consume(end - start)
+
+    def _unparsed(self, buffer, start, end, on_unparsed):
+        self.bytes_unparsed += end - start
+        on_unparsed(bytes(buffer[start:end]))
+
+    def take_values(self):
+        """Returns a copy of the latest field values and clears the updated flag."""
+        self.updated = False
+        return dict(self.values)
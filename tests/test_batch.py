@@ -0,0 +1,121 @@
+# tests/test_batch.py
+"""
+Evaluates layout.json over one scripted input trace in every mode (the
+editor's signal order, tick, compiled and batch) and checks that they
+produce the same PPM channel values.
+"""
+import json
+import os
+
+import pytest
+
+from engine import Graph, Evaluator, CompiledGraph, JoystickModel
+
+np = pytest.importorskip("numpy")
+from engine.batch import evaluate_batch, source_ports  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE_HZ = 50.0
+LOGITECH = "Logitech Extreme 3D"
+
+
+def load_layout():
+    with open(os.path.join(ROOT, "layout.json")) as f:
+        return Graph.from_layout(json.load(f))
+
+
+def scripted_trace(ports, count=800):
+    """Axes sweep on a 1/64 grid; buttons are pressed and held for different times."""
+    t = np.arange(count) / SAMPLE_RATE_HZ
+    columns = []
+    for k, (model, output_index) in enumerate(ports):
+        if output_index < model.num_axes:
+            column = np.round(np.sin(t * (0.7 + 0.3 * k) + k) * 64) / 64
+        else:
+            period = 1.0 + 0.8 * k # Seconds; some presses outlast the boost time
+            column = np.where((t % period) < period * (0.3 + 0.1 * (k % 4)), 1.0, 0.0)
+        columns.append(column)
+    return np.column_stack(columns)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ModeRunner:
+    """Feeds one row of source values at a time to an Evaluator or a CompiledGraph."""
+    def __init__(self, mode):
+        self.mode = mode
+        self.graph = load_layout()
+        self.clock = FakeClock()
+        self.joysticks = {model.title: model for model in self.graph.nodes_of_type(JoystickModel)}
+        if mode == "compiled":
+            self.engine = CompiledGraph(self.graph, clock=self.clock)
+        else:
+            self.engine = Evaluator(self.graph, clock=self.clock, mode=mode)
+        self.last_row = None
+
+    def step(self, sample_index, titled_ports, row):
+        self.clock.now = sample_index / SAMPLE_RATE_HZ
+        engine = self.engine
+        if self.mode != "compiled":
+            engine.advance()
+        for column, (title, output_index) in enumerate(titled_ports):
+            if self.last_row is None or row[column] != self.last_row[column]:
+                source = self.joysticks[title]
+                if self.mode == "compiled":
+                    source.set_output(output_index, row[column])
+                else:
+                    engine.set_source(source, output_index, row[column])
+        self.last_row = row
+        if self.mode == Evaluator.MODE_TICK:
+            engine.flush()
+        elif self.mode == "compiled":
+            engine.run()
+        return dict(engine.channel_values)
+
+
+def run_modes(ports, inputs, modes=(Evaluator.MODE_IMMEDIATE, Evaluator.MODE_TICK, "compiled")):
+    """Returns {mode: [channel values after each row of inputs]}; each mode runs on its own copy of the layout."""
+    titled_ports = [(model.title, output_index) for model, output_index in ports]
+    runners = [ModeRunner(mode) for mode in modes]
+    results = {mode: [] for mode in modes}
+    for sample_index, row in enumerate(inputs.tolist()):
+        for runner in runners:
+            results[runner.mode].append(runner.step(sample_index, titled_ports, row))
+    return results
+
+
+def assert_modes_match_batch(results, traces):
+    for mode, values in results.items():
+        for channel, trace in traces.items():
+            per_sample = np.array([sample.get(channel, trace[0]) for sample in values])
+            mismatches = np.flatnonzero(per_sample != trace)
+            assert not len(mismatches), (f"{mode} differs from batch on channel {channel} from sample "
+                                         f"{mismatches[0]}: {per_sample[mismatches[0]]} != {trace[mismatches[0]]}")
+
+
+def test_all_modes_agree_on_layout_json():
+    graph = load_layout()
+    ports = source_ports(graph)
+    inputs = scripted_trace(ports)
+    traces = evaluate_batch(graph, inputs, sample_rate_hz=SAMPLE_RATE_HZ)
+
+    assert sorted(traces) == list(range(1, 9))
+    assert len(np.unique(traces[1])) > 10 # The trace moves the pedals, the boost and the switch gate
+    assert_modes_match_batch(run_modes(ports, inputs), traces)
+
+
+def test_modes_agree_with_a_disconnected_controller():
+    graph = load_layout()
+    ports = [(model, output_index) for model, output_index in source_ports(graph) if model.title == LOGITECH]
+    inputs = scripted_trace(ports, count=200)
+    traces = evaluate_batch(graph, inputs, sample_rate_hz=SAMPLE_RATE_HZ, ports=ports)
+
+    assert_modes_match_batch(run_modes(ports, inputs), traces)
+    # The silent controller's pedals pass nothing on: no half brake from its default outputs, only the boost
+    assert (traces[1].min(), traces[1].max()) == (1500, 1600)
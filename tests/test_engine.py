@@ -0,0 +1,269 @@
+# tests/test_engine.py
+"""Unit tests for the Qt-free engine: node models, the graph and the evaluator."""
+import json
+import os
+
+import pytest
+
+from engine import (Graph, Evaluator, CompiledGraph, compile_formula, JoystickModel, PPMChannelModel,
+                    CustomLogicModel, BoostControlModel, ToggleModel, ThreePositionSwitchModel,
+                    ChannelConfigModel, MixerModel, AxisToButtonsModel, SwitchGateModel, PedalControlModel)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUTTON = 4 # First button output of a default joystick (4 axes)
+
+
+def load_graph(name):
+    with open(os.path.join(ROOT, name)) as f:
+        return Graph.from_layout(json.load(f))
+
+
+def joystick(graph, title):
+    return next(model for model in graph.nodes_of_type(JoystickModel) if model.title == title)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+# Models
+
+def test_channel_config_curve():
+    model = ChannelConfigModel()
+    model.expo_amount = 0.5
+    model.weight = 50.0
+    model.offset_us = 100
+    assert model.curve(0.0) == pytest.approx(0.2)
+    assert model.curve(1.0) == pytest.approx(0.7)
+    model.weight = 300.0
+    assert model.curve(1.0) == 1.0 # Clamped
+
+
+def test_mixer_weights_and_clamp():
+    model = MixerModel()
+    model.weights = {'A1': 50, 'B1': 50, 'A2': 100, 'B2': -100}
+    model.inputs[:] = [0.4, 0.8]
+    assert model.evaluate() == (0, 1)
+    assert model.outputs == pytest.approx([0.6, -0.4])
+    model.inputs[:] = [1.0, -1.0]
+    model.evaluate()
+    assert model.outputs == pytest.approx([0.0, 1.0])
+
+
+def test_pedal_control_brake_wins():
+    model = PedalControlModel()
+    model.evaluate()
+    assert model.outputs[0] == 0.0 # Both pedals released: center
+    model.set_input(0, 1.0)
+    assert model.outputs[0] == pytest.approx(1.0)
+    model.set_input(1, 0.0) # Half brake overrides the throttle
+    assert model.outputs[0] == pytest.approx(-0.5)
+    model.center_us = 1600
+    model.throttle_limit = 50
+    model.set_input(1, -1.0)
+    assert model.outputs[0] * 500 + 1500 == pytest.approx(1600 + 0.5 * 400)
+
+
+def test_switch_gate_and_axis_to_buttons():
+    gate = SwitchGateModel()
+    gate.inputs[1:] = [0.25, -0.75]
+    gate.evaluate()
+    assert gate.outputs[0] == 0.25
+    gate.set_input(0, 1.0)
+    assert gate.outputs[0] == -0.75
+
+    buttons = AxisToButtonsModel()
+    assert buttons.set_input(0, 0.5) == [0]
+    assert buttons.outputs == [1.0, -1.0]
+    assert buttons.set_input(0, 0.6) == [] # Nothing changed
+    assert buttons.set_input(0, -0.5) == [0, 1]
+    assert buttons.outputs == [-1.0, 1.0]
+
+
+def test_toggle_flips_on_rising_edges_only():
+    model = ToggleModel()
+    assert model.outputs[0] == -1.0
+    assert model.set_input(0, 1.0) == (0,)
+    assert model.outputs[0] == 1.0
+    assert model.set_input(0, 1.0) == () # Held
+    model.set_input(0, 0.0)
+    model.set_input(0, 1.0)
+    assert model.outputs[0] == -1.0
+
+
+def test_three_position_switch_steps_and_stops_at_the_ends():
+    model = ThreePositionSwitchModel()
+    positions = []
+    for input_index in (0, 0, 1, 1, 1):
+        model.set_input(input_index, 1.0)
+        model.set_input(input_index, 0.0)
+        positions.append(model.current_position)
+    assert positions == [2, 2, 1, 0, 0]
+    assert model.outputs[0] == -1.0
+
+
+def test_boost_control_phases():
+    clock = FakeClock()
+    model = BoostControlModel(clock=clock)
+    model.boost_amount_us = 200
+    model.set_input(0, 0.2)
+    assert model.outputs[0] == pytest.approx(0.2)
+    model.set_input(1, 1.0)
+    assert model.state == model.STATE_BOOSTING
+    assert model.outputs[0] == pytest.approx(0.6)
+
+    assert model.advance(clock.now + 1.0) == ()
+    model.advance(clock.now + model.boost_duration_s) # Held past the boost time
+    assert model.state == model.STATE_COOLDOWN
+    assert model.outputs[0] == pytest.approx(0.2)
+
+    model.set_input(1, 0.0)
+    model.set_input(1, 1.0) # Ignored during the cooldown
+    assert model.state == model.STATE_COOLDOWN
+    model.set_input(1, 0.0)
+    model.advance(clock.now + model.boost_duration_s + model.cooldown_duration_s)
+    assert model.state == model.STATE_READY
+
+
+def test_ppm_channel_inverts_and_clamps():
+    model = PPMChannelModel(3)
+    model.set_input(0, 0.5)
+    assert model.ppm_value == 1750
+    model.inverted = True
+    model.set_input(0, 2.0)
+    assert model.ppm_value == 1000
+
+
+def test_custom_logic_formula_and_errors(capsys):
+    model = CustomLogicModel(inputs=2)
+    model.formula = "Y = clamp(X1 * 2) - expo(X2, 1)"
+    model.inputs[:] = [0.75, 0.5]
+    model.evaluate()
+    assert model.outputs[0] == pytest.approx(1.0 - 0.125)
+
+    model.formula = "Y = X1 / X2"
+    model.inputs[:] = [1.0, 0.0]
+    model.evaluate()
+    assert model.outputs[0] == 0.0
+    assert model.error
+    model.evaluate()
+    assert capsys.readouterr().out.count("Error evaluating") == 1 # Reported once
+
+    model.formula = "Y = __import__('os')"
+    assert model.function is None
+    assert model.error
+
+
+@pytest.mark.parametrize("formula", [
+    "Y = X1.real", "Y = 'a'", "Y = [X1 for X1 in (1,)]", "Y = open('x')", "Y = X3", "Y = X1 +",
+])
+def test_compile_formula_rejects(formula):
+    with pytest.raises(ValueError):
+        compile_formula(formula, 2)
+
+
+# Graph
+
+def test_graph_refuses_bad_and_cyclic_connections():
+    graph = Graph()
+    a = graph.add_node(ChannelConfigModel())
+    b = graph.add_node(ChannelConfigModel())
+    graph.connect(a, 0, b, 0)
+    with pytest.raises(ValueError, match="cycle"):
+        graph.connect(b, 0, a, 0)
+    with pytest.raises(ValueError, match="already connected"):
+        graph.connect(a, 0, b, 0)
+    with pytest.raises(ValueError):
+        graph.connect(a, 1, b, 0)
+    assert graph.topological_order() == [a, b]
+
+
+def test_from_layout_skips_unknown_node_types():
+    graph = load_graph("layout_presets/layoutFPV.json")
+    types = {type(model) for model in graph.nodes.values()}
+    assert types == {JoystickModel, PPMChannelModel, ToggleModel, ThreePositionSwitchModel}
+    assert len(graph.nodes_of_type(PPMChannelModel)) == 8
+
+
+# Evaluating layouts
+
+def test_fpv_preset():
+    graph = load_graph("layout_presets/layoutFPV.json")
+    evaluator = Evaluator(graph)
+    stick = joystick(graph, "Logitech Extreme 3D")
+    evaluator.apply_changes(stick, [(1, 0.5), (2, -1.0), (3, 0.25)])
+    assert evaluator.channel_values == {2: 1750, 4: 1000, 3: 1625}
+
+    evaluator.apply_changes(stick, [(10, 1.0), (10, 0.0)]) # Button 6: toggle on
+    assert evaluator.channel_values[5] == 2000
+    evaluator.apply_changes(stick, [(9, 1.0), (9, 0.0)]) # Button 5: switch up
+    assert evaluator.channel_values[6] == 2000
+    evaluator.apply_changes(stick, [(7, 1.0), (7, 0.0), (7, 1.0)]) # Button 3 twice: down, down
+    assert evaluator.channel_values[6] == 1000
+
+
+def test_rc_car_preset_boost():
+    clock = FakeClock()
+    graph = load_graph("layout_presets/layoutRCCarWithBoost.json")
+    evaluator = Evaluator(graph, clock=clock)
+    stick = joystick(graph, "Logitech Extreme 3D")
+    evaluator.apply_changes(stick, [(0, -0.5), (3, 0.2)])
+    assert evaluator.channel_values == {2: 1250, 1: 1600}
+
+    evaluator.set_source(stick, BUTTON, 1.0)
+    assert evaluator.channel_values[1] == 2000 # 1600 + 500, clamped
+    clock.now += 2.0
+    evaluator.advance()
+    assert evaluator.channel_values[1] == 1600 # Boost time is up
+
+
+@pytest.mark.parametrize("mode", Evaluator.MODES)
+def test_tick_mode_evaluates_each_node_once(mode):
+    graph = Graph()
+    stick = graph.add_node(JoystickModel())
+    mixer = graph.add_node(MixerModel())
+    sink = graph.add_node(PPMChannelModel(1))
+    graph.connect(stick, 0, mixer, 0)
+    graph.connect(stick, 1, mixer, 1)
+    graph.connect(mixer, 0, sink, 0)
+    mixer.weights = {'A1': 50, 'B1': 50, 'A2': 0, 'B2': 100}
+    seen = []
+    evaluator = Evaluator(graph, on_channel=lambda channel, value: seen.append(value), mode=mode)
+    evaluator.apply_changes(stick, [(0, 1.0), (1, 1.0)])
+    if mode == Evaluator.MODE_TICK:
+        assert seen == []
+        evaluator.flush()
+        assert seen == [2000] # No half-updated value on the way
+    else:
+        assert seen == [1750, 2000]
+
+
+
+def test_compiled_graph_reports_the_nodes_it_changed():
+    graph = Graph()
+    stick = graph.add_node(JoystickModel())
+    config = graph.add_node(ChannelConfigModel())
+    toggle = graph.add_node(ToggleModel())
+    sinks = [graph.add_node(PPMChannelModel(channel)) for channel in (1, 2)]
+    graph.connect(stick, 0, config, 0)
+    graph.connect(stick, BUTTON, toggle, 0)
+    graph.connect(config, 0, sinks[0], 0)
+    graph.connect(toggle, 0, sinks[1], 0)
+    stick.set_output(0, 0.5)
+    stick.set_output(BUTTON, 0.0)
+    compiled = CompiledGraph(graph)
+    assert set(compiled.run(0.0)) == {config, sinks[0], sinks[1]} # The toggle's input is unchanged
+    assert compiled.run(0.0) == []
+
+    stick.set_output(BUTTON, 1.0)
+    assert set(compiled.run(0.0)) == {toggle, sinks[1]}
+    assert compiled.channel_values == {1: 1750, 2: 2000}
+
+    assert not compiled.is_stale()
+    config.weight = 50.0
+    graph.params_changed()
+    assert compiled.is_stale()
@@ -0,0 +1,117 @@
+# tests/test_evdev_input.py
+"""
+Drives the evdev backend with a virtual joystick created through uinput:
+axis, button and hat decoding against the ranges the kernel reports, and
+hotplug. Needs write access to /dev/uinput and read access to the event
+node udev creates for it; skipped otherwise.
+"""
+import fcntl
+import os
+import time
+
+import pytest
+
+from evdev_input import (EvdevInputBackend, UInputJoystick, JOYDEVICEADDED, JOYDEVICEREMOVED,
+                         JOYAXISMOTION, JOYBUTTONDOWN, JOYBUTTONUP, JOYHATMOTION, EVIOCGABS, _ABSINFO)
+
+pytestmark = pytest.mark.skipif(not os.access(UInputJoystick.UINPUT_PATH, os.W_OK),
+                                reason="needs write access to /dev/uinput")
+
+NAME = "QtPye Test Joystick"
+
+
+def wait_for(backend, predicate, timeout_s=3.0, on_timeout=pytest.fail):
+    """Collects the backend's events until predicate(events) holds."""
+    events = []
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        events += backend.get_events()
+        if predicate(events):
+            return events
+        time.sleep(0.01)
+    on_timeout(f"timed out; events seen: {events}")
+
+
+def of_type(events, event_type):
+    return [event for event in events if event.type == event_type]
+
+
+@pytest.fixture
+def backend():
+    backend = EvdevInputBackend()
+    backend.start()
+    backend.set_motion_events(True)
+    yield backend
+    backend.stop()
+
+
+@pytest.fixture
+def device(backend):
+    with UInputJoystick(NAME, num_axes=3, num_buttons=4, num_hats=1) as device:
+        events = wait_for(backend, lambda events: of_type(events, JOYDEVICEADDED), 5.0, pytest.skip)
+        joystick = backend.open(of_type(events, JOYDEVICEADDED)[-1].device_index)
+        if joystick.name != NAME:
+            pytest.skip("another input device appeared at the same time")
+        yield device, joystick
+
+
+def test_hotplug_adds_and_removes_the_device(backend):
+    count = backend.get_count()
+    device = UInputJoystick(NAME)
+    try:
+        events = wait_for(backend, lambda events: of_type(events, JOYDEVICEADDED), 5.0, pytest.skip)
+        assert backend.get_count() == count + 1
+        joystick = backend.open(of_type(events, JOYDEVICEADDED)[-1].device_index)
+        assert joystick.get_name() == NAME
+        assert (joystick.get_numaxes(), joystick.get_numbuttons(), joystick.get_numhats()) == (4, 12, 1)
+    finally:
+        device.close()
+    events = wait_for(backend, lambda events: of_type(events, JOYDEVICEREMOVED))
+    assert of_type(events, JOYDEVICEREMOVED)[-1].instance_id == joystick.get_instance_id()
+    assert backend.get_count() == count
+    assert joystick.fd is None
+
+
+def test_axes_are_scaled_with_the_kernel_reported_range(backend, device):
+    device, joystick = device
+    absinfo = bytearray(_ABSINFO.size)
+    fcntl.ioctl(joystick.fd, EVIOCGABS(0), absinfo)
+    minimum, maximum = _ABSINFO.unpack(absinfo)[1:3]
+    assert (minimum, maximum) == (UInputJoystick.AXIS_MIN, UInputJoystick.AXIS_MAX)
+
+    for value in (-1.0, 0.5, 1.0):
+        device.set_axis(1, value)
+        events = wait_for(backend, lambda events: of_type(events, JOYAXISMOTION))
+        event = of_type(events, JOYAXISMOTION)[-1]
+        assert event.axis == 1
+        assert event.value == pytest.approx(value, abs=2.0 / (maximum - minimum))
+        assert joystick.get_axis(1) == event.value
+
+
+def test_buttons_and_hats(backend, device):
+    device, joystick = device
+    device.set_button(2, True)
+    events = wait_for(backend, lambda events: of_type(events, JOYBUTTONDOWN))
+    assert of_type(events, JOYBUTTONDOWN)[-1].button == 2
+    assert joystick.get_button(2) == 1
+    device.set_button(2, False)
+    wait_for(backend, lambda events: of_type(events, JOYBUTTONUP))
+    assert joystick.get_button(2) == 0
+
+    device.set_hat(0, 1, 1) # Right and up, in pygame's convention
+    wait_for(backend, lambda events: len(of_type(events, JOYHATMOTION)) >= 2)
+    assert joystick.get_hat(0) == (1, 1)
+
+
+def test_unplug_found_by_pump_is_removed_on_get_events(backend, device):
+    device, joystick = device
+    count = backend.get_count()
+    device.close()
+    deadline = time.monotonic() + 3.0
+    while not backend._unplugged and time.monotonic() < deadline:
+        backend.pump() # As the acquisition thread does: finds the unplug, leaves the device list alone
+        time.sleep(0.01)
+    assert backend.get_count() == count
+    events = wait_for(backend, lambda events: of_type(events, JOYDEVICEREMOVED))
+    assert of_type(events, JOYDEVICEREMOVED)[-1].instance_id == joystick.get_instance_id()
+    assert backend.get_count() == count - 1
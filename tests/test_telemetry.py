@@ -0,0 +1,69 @@
+# tests/test_telemetry.py
+"""Telemetry parsing straight from the receive ring buffer, including after overruns."""
+import os
+
+import pytest
+
+from receive_buffer import ReceiveRingBuffer
+from telemetry import TelemetryParser, CsvLineGrammar
+
+
+def feed(parser, ring_buffer):
+    unparsed = []
+    parser.feed(ring_buffer, unparsed.append)
+    return unparsed
+
+
+def test_key_value_lines_and_echoed_commands():
+    ring_buffer = ReceiveRingBuffer(64)
+    parser = TelemetryParser()
+    ring_buffer.write(b"RSSI=-67 LQ:100;VBAT=11.92\r\n1=1500\nok\npartial=")
+    assert feed(parser, ring_buffer) == [b"1=1500\n", b"ok\n"]
+    assert parser.values == {"rssi": -67.0, "lq": 100.0, "vbat": 11.92}
+    assert ring_buffer.peek() == b"partial="
+
+
+def test_csv_lines():
+    ring_buffer = ReceiveRingBuffer(64)
+    parser = TelemetryParser(CsvLineGrammar(("rssi", "lq")))
+    ring_buffer.write(b"-70,98\n1,2,3\n")
+    assert feed(parser, ring_buffer) == [b"1,2,3\n"]
+    assert parser.take_values() == {"rssi": -70.0, "lq": 98.0}
+    assert not parser.updated
+
+
+def test_truncated_write_never_produces_a_field():
+    ring_buffer = ReceiveRingBuffer(16)
+    parser = TelemetryParser()
+    ring_buffer.write(b"RSSI=-60 LQ=99\r\n")
+    ring_buffer.write(b"VB") # Overruns: the first line loses its start
+    assert ring_buffer.overrun
+    assert feed(parser, ring_buffer) == [b"SI=-60 LQ=99\r\n"]
+    assert parser.values == {}
+    assert parser.bytes_skipped == 14
+    assert not ring_buffer.overrun
+
+    ring_buffer.write(b"AT=11.5\n")
+    assert feed(parser, ring_buffer) == []
+    assert parser.values == {"vbat": 11.5}
+
+
+@pytest.mark.parametrize("line", [b"RSSI=-60 LQ=99\n", b"RSSI=-60 LQ=99 VBAT=12.1 X=1\n"])
+def test_overrun_while_reading_skips_to_the_next_line(line):
+    ring_buffer = ReceiveRingBuffer(16)
+    parser = TelemetryParser()
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    try:
+        for data in (line[:12], line[12:] + b"LQ=98\n"):
+            os.write(write_fd, data)
+            while ring_buffer.read_from_fd(read_fd):
+                pass
+        assert ring_buffer.overruns
+        unparsed = feed(parser, ring_buffer)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    assert set(parser.values) <= {"lq"} # Never a field cut from the first line
+    assert b"".join(unparsed).endswith(b"\n")
+    assert parser.bytes_skipped == len(b"".join(unparsed))
@@ -0,0 +1,40 @@
+# tests/test_transport_stats.py
+"""Transport statistics: partial writes and windows shared with the transmit thread."""
+import threading
+
+from transport_stats import TransportStats
+
+
+def test_tail_writes_count_as_writes():
+    stats = TransportStats()
+    stats.record_frame(6, 3, 1, 0, 2_000)
+    stats.partial_writes += 1
+    stats.record_write(4, 5_000, 13_000)
+    assert (stats.frames, stats.write_calls, stats.bytes_written) == (1, 2, 10)
+    assert (stats.changed_commands, stats.keepalive_commands) == (1, 2)
+
+    snapshot = stats.aggregate()
+    assert snapshot["write_us_mean"] == 5.0
+    assert snapshot["write_us_max"] == 8.0
+    assert stats.aggregate()["write_us_max"] == 0.0 # The next window starts empty
+
+
+def test_samples_recorded_while_aggregating_land_in_one_window():
+    stats = TransportStats()
+    count = 20_000
+    windows = []
+
+    def transmit():
+        for i in range(count):
+            stats.record_frame(1, 1, 0, (i + 1) * 1_000, (i + 1) * 1_000 + 1)
+
+    thread = threading.Thread(target=transmit)
+    thread.start()
+    while thread.is_alive():
+        windows.append(stats._window)
+        stats.aggregate()
+    thread.join()
+    windows.append(stats._window)
+    unique = {id(window): window for window in windows}.values()
+    assert sum(window.write_calls for window in unique) == count
+    assert sum(window.interval_count for window in unique) == count - 1
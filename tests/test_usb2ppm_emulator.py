@@ -0,0 +1,140 @@
+# tests/test_usb2ppm_emulator.py
+"""Round trips through the pty adapter emulator: frame contents, throughput and latency."""
+import os
+import time
+from array import array
+
+import pytest
+
+serial = pytest.importorskip("serial")
+if not hasattr(os, "openpty"):
+    pytest.skip("the emulator needs a pseudo-terminal", allow_module_level=True)
+
+from frame_encoders import create_frame_encoder
+from usb2ppm_emulator import USB2PPMEmulator, run_benchmark
+
+
+def wait_for(condition, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@pytest.fixture
+def emulator():
+    emulator = USB2PPMEmulator(channel_count=8)
+    emulator.start()
+    yield emulator
+    emulator.stop()
+
+
+@pytest.mark.parametrize("encoder_name", ["ascii", "binary"])
+def test_full_and_delta_frames_are_decoded(emulator, encoder_name):
+    encoder = create_frame_encoder(encoder_name)
+    values = array('H', [1000 + channel * 100 for channel in range(1, 9)])
+    with serial.Serial(emulator.port, 115200, timeout=0) as ser:
+        ser.write(encoder.encode(values, None, None))
+        assert wait_for(lambda: emulator.channel_values == list(values))
+
+        values[2] = 1234
+        values[6] = 1987
+        ser.write(encoder.encode(values, [3, 7], [3, 7]))
+        assert wait_for(lambda: emulator.channel_values == list(values))
+
+    assert emulator.commands_received == 10
+    assert emulator.parse_errors == 0
+    assert emulator.checksum_errors == 0
+
+
+def test_binary_checksum_errors_are_counted_and_skipped(emulator):
+    encoder = create_frame_encoder("binary")
+    values = array('H', [1600] * 8)
+    frame = bytearray(encoder.encode(values, None, None))
+    frame[-1] ^= 0xFF
+    with serial.Serial(emulator.port, 115200, timeout=0) as ser:
+        ser.write(frame)
+        ser.write(encoder.encode(array('H', [1700] * 8), None, None))
+        assert wait_for(lambda: emulator.channel_values == [1700] * 8)
+    assert emulator.checksum_errors >= 1
+
+
+def test_echo_reaches_the_host():
+    emulator = USB2PPMEmulator(echo=True)
+    emulator.start()
+    try:
+        with serial.Serial(emulator.port, 115200, timeout=1.0) as ser:
+            ser.write(b"1=1500")
+            assert ser.read(6) == b"1=1500"
+    finally:
+        emulator.stop()
+
+
+@pytest.mark.parametrize("encoder_name", ["ascii", "binary"])
+def test_benchmark_throughput_and_latency(encoder_name):
+    result = run_benchmark(encoder_name, rate_hz=100, duration_s=0.5)
+    assert result["checksum_errors"] == 0
+    assert result["parse_errors"] == 0
+    assert result["commands_decoded"] == result["frames_sent"] * 8
+    assert result["frames_per_s"] > 50
+    assert result["latency_ms_p50"] < 50
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    QtCore = pytest.importorskip("PyQt5.QtCore")
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def run_event_loop(ms):
+    from PyQt5.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+@pytest.mark.parametrize("delta", [False, True], ids=["full", "delta"])
+@pytest.mark.parametrize("transmit_mode", ["thread", "timer"])
+@pytest.mark.parametrize("encoder_name", ["ascii", "binary"])
+def test_serial_manager_round_trip(qt_app, emulator, encoder_name, transmit_mode, delta):
+    from serial_manager import SerialManager
+    manager = SerialManager()
+    manager.set_frame_encoder(encoder_name)
+    manager.set_transmit_mode(transmit_mode)
+    manager.set_delta_mode(delta)
+    telemetry = []
+    manager.telemetry_updated.connect(telemetry.append)
+    assert manager.connect(emulator.port)
+    try:
+        expected = [1000 + channel * 100 for channel in range(1, 9)]
+        for channel, value in enumerate(expected, 1):
+            manager.set_channel(channel, value, time.monotonic_ns())
+        run_event_loop(150)
+        assert emulator.channel_values == expected
+
+        emulator.send(b"RSSI=-67 LQ=100 VBAT=11.92\r\n1=1500 2=1500\r\n")
+        run_event_loop(150)
+        assert manager.ser is not None # Still connected
+        assert telemetry and telemetry[-1] == {"rssi": -67.0, "lq": 100.0, "vbat": 11.92}
+        # One latency sample per channel that changed (channel 5 stays at 1500)
+        assert manager.latency.summary()["all"]["samples"] == sum(value != 1500 for value in expected)
+    finally:
+        manager.disconnect()
+    assert emulator.parse_errors == 0
+    assert emulator.checksum_errors == 0
+
+
+def test_serial_manager_disconnects_when_the_adapter_goes_away(qt_app):
+    from serial_manager import SerialManager
+    emulator = USB2PPMEmulator()
+    manager = SerialManager()
+    assert manager.connect(emulator.start())
+    run_event_loop(50)
+    manager._read_serial_data() # A wakeup without data keeps the port
+    assert manager.ser is not None
+
+    emulator.stop() # Hangs up the pty
+    run_event_loop(200)
+    assert manager.ser is None
@@ -0,0 +1,89 @@
+# transmit_thread.py
+import sys
+import threading
+import time
+from array import array
+
+
+class ChannelDoubleBuffer:
+    """
+    Hands channel values from the GUI thread to the transmit thread without locks.
+
+    The writer fills the inactive slot and then flips the front index. A
+    sequence counter around each publish makes this a seqlock: it is odd
+    while a publish is in progress and advances by 2 per publish. The reader
+    retries if it started during a publish, or if a second publish started
+    while it was reading (the first one only writes the other slot). A retry
+    calls the consumer again with the newer values, so consumers must be safe
+    to repeat. typecode selects the array type of the slots ('H' for channel
+    microseconds).
+    """
+    def __init__(self, initial_values, typecode='H'):
+        self._slots = [array(typecode, initial_values), array(typecode, initial_values)]
+        self._front = 0
+        self.sequence = 0
+
+    def publish(self, values):
+        self.sequence += 1 # Odd: a publish is in progress
+        back = self._front ^ 1
+        self._slots[back][:] = values
+        self._front = back
+        self.sequence += 1
+
+    def read_with(self, consumer):
+        """Calls consumer(values) on a consistent snapshot and returns its result."""
+        while True:
+            sequence = self.sequence
+            if sequence & 1:
+                time.sleep(0) # Let the writer finish
+                continue
+            result = consumer(self._slots[self._front])
+            # One publish only writes the slot we are not reading; a second one may write ours
+            if self.sequence - sequence <= 2:
+                return result
+
+
+class TransmitThread(threading.Thread):
+    """
+    Calls tick() on fixed time.monotonic_ns() deadlines, independent of the Qt
+    event loop. A late tick does not shift the schedule; if a whole period was
+    missed the schedule is re-anchored instead of sending a burst of frames.
+    """
+    # Keeps long runs of GUI bytecode from holding the GIL for the default 5 ms
+    SWITCH_INTERVAL_S = 0.0005
+
+    def __init__(self, tick, interval_ms, name="PPMTransmit"):
+        super().__init__(name=name, daemon=True)
+        self.tick = tick
+        self.period_ns = int(interval_ms * 1_000_000)
+        self.max_lateness_ns = 0
+        self.missed_deadlines = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=1.0)
+
+    def run(self):
+        previous_switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(previous_switch_interval, self.SWITCH_INTERVAL_S))
+        try:
+            deadline = time.monotonic_ns() + self.period_ns
+            while not self._stop_event.is_set():
+                remaining = deadline - time.monotonic_ns()
+                if remaining > 0:
+                    time.sleep(remaining / 1e9)
+                if self._stop_event.is_set():
+                    break
+
+                now = time.monotonic_ns()
+                self.max_lateness_ns = max(self.max_lateness_ns, now - deadline)
+                self.tick()
+
+                deadline += self.period_ns
+                if now > deadline:
+                    self.missed_deadlines += 1
+                    deadline = now + self.period_ns
+        finally:
+            sys.setswitchinterval(previous_switch_interval)
@@ -0,0 +1,153 @@
+# transport_stats.py
+import math
+import threading
+import time
+
+
+class _StatsWindow:
+    """Running sums of one aggregation window; replaced as a whole by aggregate()."""
+    def __init__(self):
+        self.write_calls = 0
+        self.write_ns_sum = 0
+        self.write_ns_max = 0
+        self.interval_count = 0
+        self.interval_sum = 0
+        self.interval_sum_sq = 0
+        self.interval_min = 0
+        self.interval_max = 0
+        self.out_waiting_max = 0
+
+
+class TransportStats:
+    """
+    Statistics for the serial transport.
+
+    The record_* methods run on the transmit path and only bump counters and
+    running sums. aggregate() is called once per second to turn them into a
+    plain dict snapshot (per-second rates, write durations, inter-frame
+    jitter, out_waiting backlog, dropped/coalesced frames), which is kept
+    as `latest`.
+
+    The per-window sums (write durations, frame intervals, out_waiting
+    maximum) live in a _StatsWindow that aggregate() swaps for a fresh one.
+    record_write(), record_frame() and sample_out_waiting() update it under
+    the same lock, so every sample lands in exactly one window and a
+    window's min/max/stddev never mix two windows. The totals are only ever
+    incremented; aggregate() reports the difference to the previous call,
+    read under that lock as well, so the rates agree with the window.
+    """
+    TOTALS = ("frames", "commands", "changed_commands", "keepalive_commands",
+              "bytes_written", "write_calls", "bytes_read",
+              "frames_dropped", "frames_coalesced", "partial_writes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.TOTALS:
+                setattr(self, name, 0)
+            self._previous_totals = dict.fromkeys(self.TOTALS, 0)
+            self._previous_aggregate_ns = time.monotonic_ns()
+            self._last_write_ns = 0
+            self._window = _StatsWindow()
+            self.out_waiting = 0
+            self.latest = self._empty_snapshot()
+
+    def _record_write(self, window, byte_count, write_start_ns, write_end_ns):
+        self.write_calls += 1
+        self.bytes_written += byte_count
+        window.write_calls += 1
+        write_ns = write_end_ns - write_start_ns
+        window.write_ns_sum += write_ns
+        if write_ns > window.write_ns_max:
+            window.write_ns_max = write_ns
+
+    def record_write(self, byte_count, write_start_ns, write_end_ns):
+        """A write that is not the start of a frame, e.g. the rest of a partially written one."""
+        with self._lock:
+            self._record_write(self._window, byte_count, write_start_ns, write_end_ns)
+
+    def record_frame(self, byte_count, command_count, changed_count, write_start_ns, write_end_ns):
+        """A frame's first write; byte_count is what that write took."""
+        with self._lock:
+            window = self._window
+            self.frames += 1
+            self.commands += command_count
+            self.changed_commands += changed_count
+            self.keepalive_commands += command_count - changed_count
+            self._record_write(window, byte_count, write_start_ns, write_end_ns)
+
+            if self._last_write_ns:
+                interval = write_start_ns - self._last_write_ns
+                if not window.interval_count or interval < window.interval_min:
+                    window.interval_min = interval
+                if interval > window.interval_max:
+                    window.interval_max = interval
+                window.interval_count += 1
+                window.interval_sum += interval
+                window.interval_sum_sq += interval * interval
+            self._last_write_ns = write_start_ns
+
+    def record_drop(self, coalesced):
+        """A frame was skipped because the link was backlogged; coalesced if its changes carry over."""
+        self.frames_dropped += 1
+        if coalesced:
+            self.frames_coalesced += 1
+
+    def record_read(self, byte_count):
+        self.bytes_read += byte_count
+
+    def sample_out_waiting(self, byte_count):
+        with self._lock:
+            self.out_waiting = byte_count
+            window = self._window
+            if byte_count > window.out_waiting_max:
+                window.out_waiting_max = byte_count
+
+    def _empty_snapshot(self):
+        snapshot = {f"{name}_per_s": 0.0 for name in self.TOTALS}
+        snapshot.update({
+            "write_us_mean": 0.0, "write_us_max": 0.0,
+            "interval_ms_min": 0.0, "interval_ms_mean": 0.0,
+            "interval_ms_max": 0.0, "interval_ms_stddev": 0.0,
+            "out_waiting": 0, "out_waiting_max": 0,
+        })
+        return snapshot
+
+    def aggregate(self):
+        """Rolls the last window into a snapshot dict, stores it as `latest` and returns it."""
+        with self._lock:
+            now = time.monotonic_ns()
+            window, self._window = self._window, _StatsWindow()
+            totals = {name: getattr(self, name) for name in self.TOTALS}
+            out_waiting = self.out_waiting
+        elapsed_s = max(1e-9, (now - self._previous_aggregate_ns) / 1e9)
+        self._previous_aggregate_ns = now
+
+        snapshot = self._empty_snapshot()
+        for name, total in totals.items():
+            snapshot[f"{name}_per_s"] = (total - self._previous_totals[name]) / elapsed_s
+        self._previous_totals = totals
+
+        if window.write_calls:
+            snapshot["write_us_mean"] = window.write_ns_sum / window.write_calls / 1e3
+            snapshot["write_us_max"] = window.write_ns_max / 1e3
+        count = window.interval_count
+        if count:
+            mean = window.interval_sum / count
+            variance = max(0.0, window.interval_sum_sq / count - mean * mean)
+            snapshot["interval_ms_min"] = window.interval_min / 1e6
+            snapshot["interval_ms_mean"] = mean / 1e6
+            snapshot["interval_ms_max"] = window.interval_max / 1e6
+            snapshot["interval_ms_stddev"] = math.sqrt(variance) / 1e6
+        snapshot["out_waiting"] = out_waiting
+        snapshot["out_waiting_max"] = window.out_waiting_max
+
+        self.latest = snapshot
+        return snapshot
+
+    def snapshot(self):
+        """Returns a copy of the most recent aggregated statistics."""
+        return dict(self.latest)
@@ -0,0 +1,238 @@
+# usb2ppm_emulator.py
+"""
+Emulates a PiKoder USB2PPM adapter on a Linux pseudo-terminal so the
+serial path can be exercised and benchmarked without hardware.
+
+    python usb2ppm_emulator.py             # print the port and the decoded channels
+    python usb2ppm_emulator.py --bench     # measure throughput and latency
+
+The emulator's port can be passed to SerialManager.connect() like any
+real serial device (or start the app with `python main.py --emulator`).
+"""
+import argparse
+import os
+import select
+import threading
+import time
+import tty
+
+from frame_encoders import BinaryFrameEncoder
+
+
+class USB2PPMEmulator:
+    """
+    Decodes 'N=VALUE' commands (4-digit values, optionally separated by
+    whitespace) and binary frames (see BinaryFrameEncoder) written to the
+    pty and keeps the resulting channel state.
+
+    Throughput is limited like the real link: every byte costs one UART
+    character time at the configured baud rate (10 bits) plus the
+    adapter's per-byte processing time.
+    """
+    def __init__(self, channel_count=8, baud_rate=115200, byte_processing_us=0.0, echo=False,
+                 on_command=None):
+        self.channel_values = [1500] * channel_count
+        self.baud_rate = baud_rate
+        self.byte_processing_us = byte_processing_us
+        self.echo = echo
+        self.on_command = on_command # Called as on_command(channel, value, timestamp_ns)
+
+        self.bytes_received = 0
+        self.commands_received = 0
+        self.frames_received = 0
+        self.checksum_errors = 0
+        self.parse_errors = 0
+
+        self.master_fd = None
+        self.slave_fd = None
+        self.port = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._pending = bytearray()
+
+    def start(self):
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="USB2PPMEmulator", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self.master_fd = self.slave_fd = None
+
+    def send(self, data):
+        """Sends bytes to the host, as if the adapter had replied."""
+        os.write(self.master_fd, data)
+
+    def _run(self):
+        seconds_per_byte = 10.0 / self.baud_rate + self.byte_processing_us / 1e6
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([self.master_fd], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                data = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            if not data:
+                continue
+            started = time.monotonic()
+            self.bytes_received += len(data)
+            self._pending += data
+            self._parse()
+            if self.echo:
+                self.send(data)
+            # Hold the line for as long as the real adapter would need for these bytes
+            remaining = len(data) * seconds_per_byte - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _apply(self, channel, value, timestamp_ns):
+        if 1 <= channel <= len(self.channel_values):
+            self.channel_values[channel - 1] = value
+            self.commands_received += 1
+            if self.on_command:
+                self.on_command(channel, value, timestamp_ns)
+        else:
+            self.parse_errors += 1
+
+    def _parse(self):
+        buf = self._pending
+        timestamp_ns = time.monotonic_ns()
+        pos = 0
+        while pos < len(buf):
+            byte = buf[pos]
+            if byte == BinaryFrameEncoder.SYNC:
+                if pos + 2 > len(buf):
+                    break
+                count = buf[pos + 1]
+                end = pos + 3 + count * 3
+                if end > len(buf):
+                    break
+                checksum = 0
+                for b in buf[pos + 1:end - 1]:
+                    checksum ^= b
+                if checksum != buf[end - 1]:
+                    self.checksum_errors += 1
+                    pos += 1 # Resynchronise on the next sync byte
+                    continue
+                for entry in range(pos + 2, end - 1, 3):
+                    self._apply(buf[entry], buf[entry + 1] | (buf[entry + 2] << 8), timestamp_ns)
+                self.frames_received += 1
+                pos = end
+            elif 48 <= byte <= 57:
+                equals = buf.find(b'=', pos)
+                if equals < 0:
+                    break
+                if equals + 5 > len(buf):
+                    break
+                channel_text = bytes(buf[pos:equals])
+                value_text = bytes(buf[equals + 1:equals + 5])
+                if not channel_text.isdigit() or not value_text.isdigit():
+                    self.parse_errors += 1
+                    pos += 1
+                    continue
+                self._apply(int(channel_text), int(value_text), timestamp_ns)
+                pos = equals + 5
+                # A frame ends where the stream goes quiet; count each parsed burst once
+                if pos == len(buf):
+                    self.frames_received += 1
+            elif byte in b" \r\n\t":
+                pos += 1
+            else:
+                self.parse_errors += 1
+                pos += 1
+        del buf[:pos]
+
+
+def run_benchmark(encoder_name="ascii", rate_hz=50, duration_s=5.0, baud_rate=115200, channel_count=8):
+    """Sends frames through the emulator with pyserial and reports throughput and latency."""
+    import serial
+    from array import array
+    from frame_encoders import create_frame_encoder
+
+    sent_at = {}
+    latencies_ns = []
+
+    def on_command(channel, value, timestamp_ns):
+        if channel == 1 and value in sent_at:
+            latencies_ns.append(timestamp_ns - sent_at.pop(value))
+
+    emulator = USB2PPMEmulator(channel_count=channel_count, baud_rate=baud_rate, on_command=on_command)
+    port = emulator.start()
+    ser = serial.Serial(port, baud_rate, timeout=0)
+    encoder = create_frame_encoder(encoder_name)
+    values = array('H', [1500] * channel_count)
+
+    period_ns = int(1e9 / rate_hz)
+    frames = 0
+    bytes_sent = 0
+    start = time.monotonic_ns()
+    deadline = start
+    while time.monotonic_ns() - start < duration_s * 1e9:
+        # Channel 1 carries a rolling marker value to match writes with decoded commands
+        values[0] = 1000 + frames % 1000
+        frame = encoder.encode(values, None, [1])
+        sent_at[values[0]] = time.monotonic_ns()
+        ser.write(frame)
+        frames += 1
+        bytes_sent += len(frame)
+        deadline += period_ns
+        remaining = deadline - time.monotonic_ns()
+        if remaining > 0:
+            time.sleep(remaining / 1e9)
+    time.sleep(0.2)
+    ser.close()
+    emulator.stop()
+
+    elapsed_s = (time.monotonic_ns() - start) / 1e9
+    latencies_ns.sort()
+    result = {
+        "encoder": encoder_name,
+        "frames_sent": frames,
+        "bytes_sent": bytes_sent,
+        "commands_decoded": emulator.commands_received,
+        "frames_per_s": frames / elapsed_s,
+        "checksum_errors": emulator.checksum_errors,
+        "parse_errors": emulator.parse_errors,
+    }
+    if latencies_ns:
+        result["latency_ms_p50"] = latencies_ns[len(latencies_ns) // 2] / 1e6
+        result["latency_ms_max"] = latencies_ns[-1] / 1e6
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PiKoder USB2PPM adapter emulator")
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--byte-processing-us", type=float, default=0.0)
+    parser.add_argument("--echo", action="store_true", help="echo received bytes back to the host")
+    parser.add_argument("--bench", action="store_true", help="run a throughput/latency benchmark and exit")
+    parser.add_argument("--encoder", default="ascii")
+    parser.add_argument("--rate", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.bench:
+        for key, value in run_benchmark(args.encoder, args.rate, args.duration, args.baud, args.channels).items():
+            print(f"{key}: {value}")
+    else:
+        emulator = USB2PPMEmulator(args.channels, args.baud, args.byte_processing_us, args.echo)
+        print(f"USB2PPM emulator listening on {emulator.start()}")
+        try:
+            while True:
+                time.sleep(1.0)
+                print(f"{emulator.channel_values} ({emulator.commands_received} commands, "
+                      f"{emulator.parse_errors} parse errors, {emulator.checksum_errors} checksum errors)")
+        except KeyboardInterrupt:
+            emulator.stop()
@@ -0,0 +1,278 @@
+# virtual_joystick.py
+"""
+Scriptable virtual joysticks, so layouts can be run and load-tested on
+machines without a controller (build machines, CI).
+
+A VirtualJoystick is created with any number of axes, buttons and hats and
+an optional GUID and name, so it can impersonate a device saved in
+layout.json and connect its JoystickNodes instead of leaving them
+"(Disconnected)". Every output can be driven by a script: any callable
+taking the time in seconds, e.g. one of the waveforms below.
+
+    backend = VirtualInputBackend(time_step_s=0.01)
+    stick = backend.add_device(num_axes=4, num_buttons=12, num_hats=1, guid="0300...")
+    stick.drive_axis(0, sine(0.5))
+    stick.drive_button(0, square(1.0))
+    stick.drive_axis(1, random_walk(0.05, seed=1))
+
+    python main.py --input-backend virtual      # animate the joysticks of layout.json
+    python virtual_joystick.py layout_presets/layoutFPV.json --seconds 60
+"""
+import argparse
+import json
+import math
+import random
+import time
+from types import SimpleNamespace
+import pygame
+from input_recording import ReplayJoystick, benchmark_backend
+
+
+# --- Waveforms: callables mapping a time in seconds to an output value ---
+
+def constant(value):
+    return lambda t: value
+
+
+def sine(frequency_hz, amplitude=1.0, offset=0.0, phase=0.0):
+    return lambda t: offset + amplitude * math.sin(2 * math.pi * (frequency_hz * t + phase))
+
+
+def square(frequency_hz, low=0.0, high=1.0, duty=0.5, phase=0.0):
+    return lambda t: high if (frequency_hz * t + phase) % 1.0 < duty else low
+
+
+def triangle(frequency_hz, amplitude=1.0, offset=0.0, phase=0.0):
+    return lambda t: offset + amplitude * (1.0 - 4.0 * abs((frequency_hz * t + phase + 0.25) % 1.0 - 0.5))
+
+
+def sawtooth(frequency_hz, amplitude=1.0, offset=0.0, phase=0.0):
+    return lambda t: offset + amplitude * (2.0 * ((frequency_hz * t + phase) % 1.0) - 1.0)
+
+
+def steps(points, initial=0.0):
+    """Step input: [(time_s, value), ...] sorted by time; holds each value until the next step."""
+    points = sorted(points)
+
+    def value_at(t):
+        value = initial
+        for step_time, step_value in points:
+            if step_time > t:
+                break
+            value = step_value
+        return value
+    return value_at
+
+
+def random_walk(step_size, rate_hz=100.0, low=-1.0, high=1.0, start=0.0, seed=None):
+    """
+    Random walk that moves by up to step_size rate_hz times a second, limited
+    to low..high. Seeded and driven by the time only, so a run repeats exactly.
+    """
+    state = {}
+
+    def reset():
+        state.update(random=random.Random(seed), steps=0, value=start)
+
+    def value_at(t):
+        target_steps = int(t * rate_hz)
+        if target_steps < state["steps"]:
+            reset() # Time went backwards, e.g. the backend was restarted
+        uniform = state["random"].uniform
+        value = state["value"]
+        for _ in range(target_steps - state["steps"]):
+            value = min(high, max(low, value + uniform(-step_size, step_size)))
+        state.update(steps=target_steps, value=value)
+        return value
+    reset()
+    return value_at
+
+
+class VirtualJoystick(ReplayJoystick):
+    """A joystick whose outputs follow scripts; unscripted outputs keep the last value set."""
+    def __init__(self, instance_id, guid, name, num_axes, num_buttons, num_hats):
+        super().__init__(instance_id, guid, name, num_axes, num_buttons, num_hats)
+        self.scripts = {} # output index (JoystickNode order) -> callable(t)
+
+    def drive(self, output_index, script):
+        """Drives an output with script(t), or stops driving it when script is None."""
+        if script is None:
+            self.scripts.pop(output_index, None)
+        else:
+            self.scripts[output_index] = script
+
+    def drive_axis(self, axis, script):
+        self.drive(axis, script)
+
+    def drive_button(self, button, script):
+        self.drive(len(self.axes) + button, script)
+
+    def drive_hat(self, hat, x_script=None, y_script=None):
+        base = len(self.axes) + len(self.buttons) + hat * 2
+        self.drive(base, x_script)
+        self.drive(base + 1, y_script)
+
+    def set_axis(self, axis, value, events=None):
+        self.set_output(axis, value, events)
+
+    def set_button(self, button, pressed, events=None):
+        self.set_output(len(self.axes) + button, 1 if pressed else 0, events)
+
+    def set_hat(self, hat, x, y, events=None):
+        base = len(self.axes) + len(self.buttons) + hat * 2
+        self.set_output(base, x, events)
+        self.set_output(base + 1, y, events)
+
+    def update(self, t, events=None):
+        """Evaluates every script at time t and applies the outputs that changed."""
+        num_axes = len(self.axes)
+        num_inputs = num_axes + len(self.buttons)
+        for output_index, script in self.scripts.items():
+            value = script(t)
+            if output_index < num_axes:
+                value = min(1.0, max(-1.0, float(value)))
+                current = self.axes[output_index]
+            elif output_index < num_inputs:
+                value = 1 if value > 0.5 else 0
+                current = self.buttons[output_index - num_axes]
+            else:
+                hat, is_y = divmod(output_index - num_inputs, 2)
+                value = max(-1, min(1, round(value)))
+                current = self.hats[hat][is_y]
+            if value != current:
+                self.set_output(output_index, value, events)
+
+    def animate(self, seed=0):
+        """Drives every output with a slow, distinct waveform; for demos and soak tests."""
+        for axis in range(len(self.axes)):
+            self.drive_axis(axis, sine(0.1 + 0.07 * axis, phase=0.13 * seed))
+        for button in range(len(self.buttons)):
+            self.drive_button(button, square(0.2 + 0.05 * button, duty=0.3))
+        for hat in range(len(self.hats)):
+            self.drive_hat(hat, steps([(2, 1), (4, 0), (6, -1), (8, 0)]), steps([(3, 1), (5, 0)]))
+
+
+class VirtualInputBackend:
+    """
+    Input backend whose devices are VirtualJoysticks.
+
+    With time_step_s=None the scripts run on the wall clock. With a time step
+    every pump() advances the script time by exactly that step, so a run
+    gives the same output sequence on every machine regardless of its speed.
+    Devices added or removed after start() produce the usual hotplug events.
+    """
+    name = "virtual"
+    PUMP_FROM_ANY_THREAD = True
+
+    def __init__(self, time_step_s=None):
+        self.time_step_s = time_step_s
+        self.joysticks = []
+        self.motion_events = False
+        self.started = False
+        self.time_s = 0.0
+        self._events = []
+        self._next_instance_id = 0
+        self._started_s = time.monotonic()
+
+    @classmethod
+    def from_layout(cls, layout, animate=False, time_step_s=None):
+        """Creates a backend with one device impersonating each JoystickNode of a layout dict."""
+        backend = cls(time_step_s)
+        seen = set()
+        for node in layout.get("nodes", []):
+            if node.get("type") != "JoystickNode":
+                continue
+            name = node.get("name") or node.get("title")
+            identity = node.get("guid") or name
+            if identity in seen:
+                continue # Several nodes showing the same device
+            seen.add(identity)
+            joystick = backend.add_device(
+                node.get("num_axes", 4), node.get("num_buttons", 12), node.get("num_hats", 1),
+                guid=node.get("guid"), name=name)
+            if animate:
+                joystick.animate(len(seen))
+        return backend
+
+    def add_device(self, num_axes=4, num_buttons=12, num_hats=1, guid=None, name=None):
+        instance_id = self._next_instance_id
+        self._next_instance_id += 1
+        joystick = VirtualJoystick(instance_id, guid or f"virtual{instance_id:024x}",
+                                   name or f"Virtual Joystick {instance_id}", num_axes, num_buttons, num_hats)
+        self.joysticks.append(joystick)
+        if self.started:
+            self._events.append(SimpleNamespace(type=pygame.JOYDEVICEADDED,
+                                                device_index=len(self.joysticks) - 1))
+        return joystick
+
+    def remove_device(self, joystick):
+        self.joysticks.remove(joystick)
+        if self.started:
+            self._events.append(SimpleNamespace(type=pygame.JOYDEVICEREMOVED, instance_id=joystick.instance_id))
+
+    def start(self):
+        self.started = True
+        self.time_s = 0.0
+        self._started_s = time.monotonic()
+
+    def stop(self):
+        self.started = False
+
+    def get_count(self):
+        return len(self.joysticks)
+
+    def open(self, device_index):
+        return self.joysticks[device_index]
+
+    def set_motion_events(self, enabled):
+        self.motion_events = enabled
+
+    def pump(self):
+        if self.time_step_s is None:
+            self.time_s = time.monotonic() - self._started_s
+        else:
+            self.time_s += self.time_step_s
+        events = self._events if self.motion_events else None
+        for joystick in self.joysticks:
+            joystick.update(self.time_s, events)
+
+    def get_events(self, pump=True):
+        if pump:
+            self.pump()
+        events, self._events = self._events, []
+        return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test layouts with animated virtual joysticks")
+    parser.add_argument("layouts", nargs="+", help="layout files, e.g. layout.json or layout_presets/*.json")
+    parser.add_argument("--seconds", type=float, default=60.0, help="simulated input time per layout")
+    parser.add_argument("--time-step-ms", type=float, default=1.0, help="simulated time per input tick")
+    parser.add_argument("--realtime", action="store_true", help="run on the wall clock through the normal timers")
+    parser.add_argument("--emulator", action="store_true",
+                        help="transmit to the built-in USB2PPM adapter emulator and report latency (Linux only)")
+    parser.add_argument("--evaluation", nargs="+", choices=("signals", "tick", "compiled"), default=["signals"],
+                        help="evaluate the graph through Qt signals, once per tick in topological order or as "
+                             "compiled code; several modes are run one after the other for comparison")
+    args = parser.parse_args()
+
+    emulator = None
+    port = None
+    if args.emulator:
+        from serial_manager import SerialManager
+        from usb2ppm_emulator import USB2PPMEmulator
+        emulator = USB2PPMEmulator(channel_count=SerialManager.MAX_CHANNEL_COUNT)
+        port = emulator.start()
+
+    for layout_path in args.layouts:
+        with open(layout_path) as f:
+            layout = json.load(f)
+        for evaluation in args.evaluation:
+            backend = VirtualInputBackend.from_layout(
+                layout, animate=True, time_step_s=None if args.realtime else args.time_step_ms / 1000)
+            result = benchmark_backend(layout_path, backend, lambda: backend.time_s >= args.seconds,
+                                       realtime=args.realtime, port=port, evaluation=evaluation)
+            result["devices"] = [joystick.name for joystick in backend.joysticks]
+            print(json.dumps(result, indent=4))
+    if emulator:
+        emulator.stop()